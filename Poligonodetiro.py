@@ -1,68 +1,9 @@
-from PIL import Image
-import numpy as np
-import matplotlib.pyplot as plt
+# === SIMULACIÓN 5G - POLÍGONO DE TIRO ===
+# Parámetros del modelo CI, nodos y zonas prohibidas en config_sedes/Poligonodetiro.json.
+# El plano (Poligonodetiro.png) se busca en el directorio de planos
+# (opción --planos o variable de entorno PLANOS_5G).
+import sys
 
-# === PARÁMETROS DEL MODELO CI ===
-f_mhz = 3500               # Frecuencia en MHz
-Pt_dBm = 33                # Potencia de transmisión (dBm)
-N = 2.5                    # Exponente de pérdida (outdoor)
-f_hz = f_mhz * 1e6         # Frecuencia en Hz
-d0 = 1                     # Distancia de referencia en metros
-c = 3e8                    # Velocidad de la luz (m/s)
+from simular_sedes import main
 
-# === CÁLCULO DE PÉRDIDA A 1 METRO (FSPL) ===
-FSPL_d0 = 20 * np.log10(4 * np.pi * d0 * f_hz / c)
-
-# === ESCALA REAL DE LA IMAGEN (ajustar según el plano) ===
-# Por ejemplo, 250 píxeles = 50 metros reales
-pixeles_medidos = 250
-metros_reales = 50
-px_to_m = metros_reales / pixeles_medidos
-
-# === CARGA DEL PLANO ===
-image_path = r'C:\Users\Vera Asilvera\Pictures\Screenshots\Poligonodetiro.png'
-img = Image.open(image_path).convert('L')
-width, height = img.size
-xx, yy = np.meshgrid(np.arange(width), np.arange(height))
-
-# === UBICACIÓN DE LAS SMALL CELLS ===
-small_cells = [(250, 200), (450, 200)]
-
-# === CÁLCULO DEL HEATMAP EN dBm ===
-heatmap = np.full((height, width), -150.0, dtype=float)
-for (cx, cy) in small_cells:
-    dx = (xx - cx) * px_to_m
-    dy = (yy - cy) * px_to_m
-    d_metros = np.sqrt(dx**2 + dy**2)
-    d_metros[d_metros < 1] = 1  # evita log(0)
-    PL = FSPL_d0 + 10 * N * np.log10(d_metros / d0)
-    Pr_dBm = Pt_dBm - PL
-    heatmap = np.maximum(heatmap, Pr_dBm)
-
-# === ESCALA AUTOMÁTICA ===
-vmin_dbm = np.min(heatmap)
-vmax_dbm = np.max(heatmap)
-
-# === VISUALIZACIÓN ===
-plt.figure(figsize=(10, 6))
-plt.imshow(img, cmap='gray', extent=(0, width, height, 0))
-img_plot = plt.imshow(heatmap, cmap='jet', alpha=0.5,
-                      extent=(0, width, height, 0),
-                      vmin=vmin_dbm, vmax=vmax_dbm)
-
-# === DIBUJAR SMALL CELLS ===
-for (cx, cy) in small_cells:
-    plt.plot(cx, cy, 'wo', markersize=10, markeredgecolor='k', label='Small Cell (33 dBm)')
-
-plt.title("Simulación 5G - Polígono de Tiro")
-plt.xlabel("Pixels (X)")
-plt.ylabel("Pixels (Y)")
-plt.legend()
-
-# === BARRA DE COLOR ===
-cbar = plt.colorbar(img_plot)
-cbar.set_label("Nivel de señal [dBm]")
-
-plt.tight_layout()
-plt.savefig("poligono_tiro_simulacion_CI_dbm.png", dpi=300, bbox_inches="tight")
-plt.show()
+main(["Poligonodetiro", "--mostrar"] + sys.argv[1:])
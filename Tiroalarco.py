@@ -1,60 +1,9 @@
-from PIL import Image
-import numpy as np
-import matplotlib.pyplot as plt
+# === SIMULACIÓN 5G - TIRO AL ARCO ===
+# Parámetros del modelo CI, nodos y zonas prohibidas en config_sedes/Tiroalarco.json.
+# El plano (TiroalArco.png) se busca en el directorio de planos
+# (opción --planos o variable de entorno PLANOS_5G).
+import sys
 
-# === PARÁMETROS DEL MODELO ITU-R M.2412 (CI para outdoor) ===
-f_mhz = 3500               # Frecuencia de operación en MHz
-Pt_dBm = 33                # Potencia de transmisión (small cell)
-N = 2.5                    # Exponente de pérdida para entorno outdoor urbano
-f_hz = f_mhz * 1e6         # Frecuencia en Hz
-d0 = 1                     # Distancia de referencia en metros (modelo CI)
+from simular_sedes import main
 
-# === CARGA DEL PLANO ===
-image_path = r'C:\Users\Vera Asilvera\Pictures\Screenshots\TiroalArco.png'
-img = Image.open(image_path).convert('L')
-width, height = img.size
-xx, yy = np.meshgrid(np.arange(width), np.arange(height))
-
-# === UBICACIÓN DE LAS SMALL CELLS ===
-small_cells = [(600, 480)]  # Coordenadas en píxeles
-
-# === CONSTANTE DEL MODELO CI ===
-c = 3e8  # Velocidad de la luz (m/s)
-FSPL_d0 = 20 * np.log10(4 * np.pi * d0 * f_hz / c) # Ecuacion de Friis
-
-# === CÁLCULO DEL HEATMAP EN dBm ===
-heatmap = np.full((height, width), -150.0, dtype=float)
-for (cx, cy) in small_cells:
-    d = np.sqrt((xx - cx)**2 + (yy - cy)**2)
-    d[d < 1] = 1  # evita log(0)
-    PL = FSPL_d0 + 10 * N * np.log10(d / d0)    #Modelo de propagacion Close-in
-    Pr_dBm = Pt_dBm - PL
-    heatmap = np.maximum(heatmap, Pr_dBm)
-
-# === ESCALA AUTOMÁTICA ===
-vmin_dbm = np.min(heatmap)
-vmax_dbm = np.max(heatmap)
-
-# === GRAFICAR MAPA DE CALOR ===
-plt.figure(figsize=(10, 6))
-plt.imshow(img, cmap='gray', extent=(0, width, height, 0))
-img_plot = plt.imshow(heatmap, cmap='jet', alpha=0.5,
-                      extent=(0, width, height, 0),
-                      vmin=vmin_dbm, vmax=vmax_dbm)
-
-# === SMALL CELLS ===
-for (cx, cy) in small_cells:
-    plt.plot(cx, cy, 'wo', markersize=10, markeredgecolor='k', label='Small Cell (33 dBm)')
-
-plt.title("Simulación 5G - Tiro al Arco")
-plt.xlabel("Pixels (X)")
-plt.ylabel("Pixels (Y)")
-plt.legend()
-
-# === BARRA DE COLOR ===
-cbar = plt.colorbar(img_plot)
-cbar.set_label("Nivel de señal [dBm]")
-
-plt.tight_layout()
-plt.savefig("tiroal_arco_simulacion_dBm_real_outdoor.png", dpi=300, bbox_inches="tight")
-plt.show()
+main(["Tiroalarco", "--mostrar"] + sys.argv[1:])
@@ -0,0 +1,275 @@
+import numpy as np
+
+# === EVALUACIÓN ADAPTATIVA (DE GRUESO A FINO) ===
+# Lejos de los transmisores el mapa en dBm es suave: basta evaluar el
+# modelo CI en las esquinas de bloques grandes e interpolar. Cada bloque
+# lleva una cota a priori del error de interpolación bilineal,
+#
+#     |e| <= (hx² + hy²) / 8 · max |∂²f|,
+#
+# con la curvatura acotada desde la distancia mínima del bloque a cada
+# transmisor (u = Pt - FSPL - 10 N log10(r) => |∂²u| <= 10 N / ln 10 / r²).
+# Los bloques cuya cota supera la tolerancia se parten en cuatro; al llegar
+# a PASO_MINIMO píxeles de lado se evalúan exactamente, píxel a píxel.
+#
+# Mejor servidor: en cada bloque se descartan los transmisores que no
+# pueden ganar (su máximo posible < el mínimo seguro del mejor) y se
+# interpola cada candidato por separado antes de tomar el máximo, así que
+# los bordes entre servidores no obligan a refinar (max es 1-Lipschitz).
+# Un transmisor descartado en un bloque tampoco gana en sus hijos: cada
+# bloque hereda la lista de candidatos de su padre.
+#
+# Suma: en cada bloque se descartan los transmisores más débiles mientras
+# la suma de sus aportes máximos (en mW, desde la distancia mínima) no
+# supere FRACCION_DESCARTE de la tolerancia frente al mínimo seguro del
+# dominante. Lo descartado se arrastra a los hijos, así que el error de
+# descartar, 10 log10(1 + descartado / mínimo), se suma a la cota de
+# interpolación (y es la cota de los bloques exactos). Cerca de los
+# transmisores casi todo se evalúa exacto.
+#
+# Cuándo conviene: interpolar cuesta por píxel más o menos lo mismo que
+# evaluar unos pocos transmisores, así que el método solo gana cuando el
+# cálculo exacto tiene muchos términos por píxel y la fracción exacta
+# estimada (fraccion_exacta_estimada) es chica; si no, mapa_cobertura usa
+# el cálculo exacto (conviene_adaptativo). Medido con tolerancia 0,5 dB,
+# un proceso: con "mejor" frente a la tabla de pérdidas, COParena y
+# PolideportivoCEO (37-38 nodos) son más lentos que el exacto en todo
+# tamaño (x2,5 a 820x640, x1,1-1,4 a 3280x2560) y CentroAcuatico (73
+# nodos) gana un 10-15 % desde 1640x1280; con "suma" frente a la suma
+# exacta por franjas, CentroAcuatico a 3280x2560 baja de 27,9 s a 2,2 s y
+# a 1280x720 empata.
+PASO_INICIAL = 32
+PASO_MINIMO = 4
+TOLERANCIA_DB = 0.5
+MAX_CANDIDATOS = 8
+FRACCION_DESCARTE = 0.25
+FRACCION_EXACTA_MAX = 0.05
+TRANSMISORES_MIN_MEJOR = 64     # con menos, la tabla de pérdidas exacta es más rápida
+ELEMENTOS_POR_LOTE = 1 << 22
+
+
+def _nivel(r_px, pt, fspl, N, d0, m_por_px):
+    """Nivel CI en dBm a r_px píxeles (con d < d0 recortado a d0, como la fórmula original)."""
+    d = np.maximum(r_px * m_por_px, d0)
+    return pt - fspl - 10 * N * np.log10(d / d0)
+
+
+def _cotas_bloques(x0, x1, y0, y1, tx, ty):
+    """Distancias mínima y máxima (B, K) en píxeles de cada bloque a cada transmisor.
+
+    tx, ty: (K,) comunes a todos los bloques o (B, K) por bloque.
+    """
+    dx_min = np.maximum(0, np.maximum(x0[:, None] - tx, tx - x1[:, None]))
+    dy_min = np.maximum(0, np.maximum(y0[:, None] - ty, ty - y1[:, None]))
+    dx_max = np.maximum(np.abs(tx - x0[:, None]), np.abs(tx - x1[:, None]))
+    dy_max = np.maximum(np.abs(ty - y0[:, None]), np.abs(ty - y1[:, None]))
+    return np.hypot(dx_min, dy_min), np.hypot(dx_max, dy_max)
+
+
+def _esquinas(x0, x1, y0, y1):
+    """Coordenadas (B, 4) de las esquinas en orden (y0, x0), (y0, x1), (y1, x0), (y1, x1)."""
+    xs = np.stack([x0, x1, x0, x1], axis=1).astype(np.float64)
+    ys = np.stack([y0, y0, y1, y1], axis=1).astype(np.float64)
+    return xs, ys
+
+
+def fraccion_exacta_estimada(n_transmisores, ancho, alto, N, agregacion="suma",
+                             tolerancia_db=TOLERANCIA_DB, m_por_px=1.0, d0=1.0):
+    """Fracción de píxeles que se evaluarían exactamente, estimada antes de empezar.
+
+    Los bloques de PASO_MINIMO px se evalúan exactos cuando su cota supera
+    la parte de la tolerancia que queda para interpolar, es decir a menos
+    de r_e píxeles de un transmisor: r_e² = h² · max |∂²f| · r² / tolerancia.
+    Cada transmisor aporta un disco de radio r_e con (PASO_MINIMO + 1)²
+    puntos por bloque de PASO_MINIMO².
+    """
+    c_curv = 10 * N / np.log(10)
+    if agregacion == "suma":
+        curvatura = c_curv + np.log(10) / 10 * c_curv ** 2
+        tolerancia_db = tolerancia_db * (1 - FRACCION_DESCARTE)
+    else:
+        curvatura = c_curv
+    h2 = 2 * PASO_MINIMO ** 2 / 8
+    r2 = max(h2 * curvatura / tolerancia_db, (d0 / m_por_px) ** 2)
+    por_bloque = ((PASO_MINIMO + 1) / PASO_MINIMO) ** 2
+    return min(1.0, n_transmisores * np.pi * r2 * por_bloque / max(ancho * alto, 1))
+
+
+def conviene_adaptativo(n_transmisores, ancho, alto, N, agregacion="suma",
+                        tolerancia_db=TOLERANCIA_DB, m_por_px=1.0, d0=1.0):
+    """Si el método adaptativo debería ser más rápido que el cálculo exacto (ver arriba)."""
+    if agregacion == "mejor" and n_transmisores < TRANSMISORES_MIN_MEJOR:
+        return False
+    return fraccion_exacta_estimada(n_transmisores, ancho, alto, N, agregacion, tolerancia_db,
+                                    m_por_px, d0) <= FRACCION_EXACTA_MAX
+
+
+def mapa_adaptativo(pos, pt, ancho, f0, f1, salida, N, fspl, d0, m_por_px, piso_dbm,
+                    agregacion="mejor", tolerancia_db=TOLERANCIA_DB, paso=PASO_INICIAL,
+                    informe=None):
+    """Escribe en salida (f1 - f0, ancho) el mapa CI de las filas f0:f1 con error <= tolerancia_db.
+
+    pos: (T, 2) en píxeles; pt: (T,) en dBm; fspl: FSPL a d0.
+    agregacion: "mejor" (recortado a piso_dbm) o "suma" (potencia total).
+    informe: dict opcional donde se acumulan (entre llamadas, p. ej. por
+    capas y teselas) "cota_db" (mayor cota de error de los bloques
+    interpolados), "evaluaciones" (puntos donde se evaluó el modelo),
+    "pixeles" y "fraccion_exacta" (evaluaciones / píxeles).
+    """
+    c_curv = 10 * N / np.log(10)          # |∂²u| <= c_curv / r²
+    a_log = np.log(10) / 10               # dB -> neperios
+    r0_px = d0 / m_por_px                 # dentro de r0 el nivel es constante
+
+    def ejes(n, inicio):
+        e = np.unique(np.r_[np.arange(inicio, inicio + n, paso), inicio + n - 1])
+        return (e[:-1], e[1:]) if len(e) > 1 else (e, e)
+
+    cx0, cx1 = ejes(ancho, 0)
+    cy0, cy1 = ejes(f1 - f0, f0)
+    x0 = np.tile(cx0, len(cy0)); x1 = np.tile(cx1, len(cy0))
+    y0 = np.repeat(cy0, len(cx0)); y1 = np.repeat(cy1, len(cx0))
+
+    # Candidatos de cada bloque (B, K): índices en pos, -1 = ninguno
+    lista = np.broadcast_to(np.arange(len(pos)), (len(x0), len(pos)))
+    # Suma: cota en mW de lo ya descartado en cada bloque (heredada de los padres)
+    descarte = np.zeros(len(x0))
+    margen_descarte = 10 ** (FRACCION_DESCARTE * tolerancia_db / 10) - 1
+
+    cota_max, evaluaciones = 0.0, 0
+    while len(x0):
+        hx, hy = x1 - x0, y1 - y0
+        valido = lista >= 0
+        rmin, rmax = _cotas_bloques(x0, x1, y0, y1, pos[lista, 0], pos[lista, 1])
+        pt_lista = pt[lista]
+        lo = np.where(valido, _nivel(rmax, pt_lista, fspl, N, d0, m_por_px), -np.inf)
+        hi = _nivel(rmin, pt_lista, fspl, N, d0, m_por_px)
+        if agregacion == "mejor":
+            candidatos = valido & (hi >= lo.max(axis=1, keepdims=True))
+            error_descarte = np.zeros(len(x0))
+        else:
+            # Los más débiles primero: se descarta el mayor prefijo que entra en el margen
+            minimo_mw = 10 ** (lo.max(axis=1) / 10)
+            hi_mw = np.where(valido, 10 ** (hi / 10), np.inf)
+            orden = np.argsort(hi_mw, axis=1, kind="stable")
+            acumulado = np.cumsum(np.take_along_axis(hi_mw, orden, axis=1), axis=1)
+            descartable = acumulado + descarte[:, None] <= margen_descarte * minimo_mw[:, None]
+            n_descarte = descartable.sum(axis=1)
+            candidatos = valido.copy()
+            np.put_along_axis(candidatos, orden, valido & ~descartable, axis=1)
+            if n_descarte.any():
+                descarte = descarte + np.where(
+                    descartable, np.take_along_axis(hi_mw, orden, axis=1), 0).sum(axis=1)
+            error_descarte = 10 * np.log10(1 + descarte / minimo_mw)
+
+        # Bloques que cruzan el radio d0 tienen un quiebre: no se interpolan
+        quiebre = (rmin < r0_px) & (rmax > r0_px)
+        plano = (rmax <= r0_px) | ~candidatos
+        curv = np.where(plano, 0.0, c_curv / np.maximum(rmin, r0_px) ** 2)
+        curv[quiebre & candidatos] = np.inf
+        h2 = (hx.astype(np.float64) ** 2 + hy.astype(np.float64) ** 2) / 8
+        if agregacion == "mejor":
+            cota = h2 * curv.max(axis=1)
+        else:
+            # log Σ exp: |∂²f| <= max |∂²u_j| + a·max |∂u_j|², con |∂u_j| <= c_curv / r_j
+            grad = np.where(plano, 0.0, c_curv / np.maximum(rmin, r0_px)).max(axis=1)
+            cota = h2 * (curv.max(axis=1) + a_log * grad ** 2) + error_descarte
+        n_cand = candidatos.sum(axis=1)
+        # Candidatos al frente de la lista; se recorta al mayor número
+        orden = np.argsort(~candidatos, axis=1, kind="stable")[:, :max(int(n_cand.max()), 1)]
+        lista = np.where(np.take_along_axis(candidatos, orden, axis=1),
+                         np.take_along_axis(lista, orden, axis=1), -1)
+
+        interpola = (cota <= tolerancia_db) & ((n_cand <= MAX_CANDIDATOS) | (agregacion != "mejor"))
+        exacto = ~interpola & (hx <= PASO_MINIMO) & (hy <= PASO_MINIMO)
+        acepta = interpola | exacto
+        if interpola.any():
+            cota_max = max(cota_max, float(cota[interpola].max()))
+        if exacto.any():
+            cota_max = max(cota_max, float(error_descarte[exacto].max()))
+        evaluaciones += 4 * int(interpola.sum()) + int(((hx + 1) * (hy + 1))[exacto].sum())
+
+        # === RELLENO DE LOS BLOQUES ACEPTADOS, AGRUPADOS POR TAMAÑO Y CANDIDATOS ===
+        idx = np.flatnonzero(acepta)
+        grupos = np.stack([hx[idx], hy[idx], n_cand[idx], exacto[idx]], axis=1)
+        for fx, fy, k, exactos in np.unique(grupos, axis=0):
+            grupo = idx[(grupos == (fx, fy, k, exactos)).all(axis=1)]
+            lote = max(1, ELEMENTOS_POR_LOTE // ((fx + 1) * (fy + 1)))
+            for i in range(0, len(grupo), lote):
+                b = grupo[i:i + lote]
+                _rellenar(salida, f0, x0[b], x1[b], y0[b], y1[b], pos, pt, fspl, N, d0,
+                          m_por_px, lista[b, :k], agregacion, bool(exactos))
+
+        # === SUBDIVISIÓN DEL RESTO ===
+        resto = ~acepta
+        x0, x1, y0, y1, hx, hy = x0[resto], x1[resto], y0[resto], y1[resto], hx[resto], hy[resto]
+        xm = np.where(hx > 1, (x0 + x1) // 2, x1)
+        ym = np.where(hy > 1, (y0 + y1) // 2, y1)
+        hijos = [(x0, xm, y0, ym), (xm, x1, y0, ym), (x0, xm, ym, y1), (xm, x1, ym, y1)]
+        partir_x, partir_y = hx > 1, hy > 1
+        validos = [np.ones(len(x0), bool), partir_x, partir_y, partir_x & partir_y]
+        x0, x1, y0, y1 = (np.concatenate([h[j][v] for h, v in zip(hijos, validos)])
+                          for j in range(4))
+        lista = np.concatenate([lista[resto][v] for v in validos])
+        descarte = np.concatenate([descarte[resto][v] for v in validos])
+
+    if agregacion == "mejor":
+        np.maximum(salida, piso_dbm, out=salida)
+    if informe is not None:
+        informe["cota_db"] = max(informe.get("cota_db", 0.0), cota_max)
+        informe["evaluaciones"] = informe.get("evaluaciones", 0) + evaluaciones
+        informe["pixeles"] = informe.get("pixeles", 0) + (f1 - f0) * ancho
+        informe["fraccion_exacta"] = min(1.0, informe["evaluaciones"] / max(informe["pixeles"], 1))
+    return salida
+
+
+def _rellenar(salida, f0, x0, x1, y0, y1, pos, pt, fspl, N, d0, m_por_px, candidatos,
+              agregacion="mejor", exacto=False):
+    """Rellena un lote de bloques del mismo tamaño.
+
+    candidatos: (B, k) índices de los transmisores de cada bloque: los que
+    pueden ser mejor servidor ("mejor") o los que no se descartaron
+    ("suma"). Interpolación bilineal desde las esquinas o, con
+    exacto=True, el modelo evaluado en cada píxel.
+    """
+    fx, fy = int(x1[0] - x0[0]), int(y1[0] - y0[0])
+    filas = y0[:, None, None] + np.arange(fy + 1)[None, :, None]
+    columnas = x0[:, None, None] + np.arange(fx + 1)[None, None, :]
+    if exacto:
+        xs, ys = columnas.astype(np.float64), filas.astype(np.float64)
+    else:
+        xs, ys = _esquinas(x0, x1, y0, y1)
+        xs, ys = xs[:, :, None], ys[:, :, None]       # (B, 4, 1)
+    wx = np.arange(fx + 1) / max(fx, 1)
+    wy = (np.arange(fy + 1) / max(fy, 1))[:, None]
+
+    def interpolar(v):
+        """(B, 4, 1) en las esquinas -> (B, fy + 1, fx + 1) bilineal."""
+        v = v[:, :, 0]
+        arriba = v[:, 0, None] + (v[:, 1, None] - v[:, 0, None]) * wx      # (B, fx+1)
+        abajo = v[:, 2, None] + (v[:, 3, None] - v[:, 2, None]) * wx
+        return arriba[:, None, :] + (abajo - arriba)[:, None, :] * wy
+
+    suma = agregacion != "mejor"
+    if suma:
+        # mW = 10^((Pt - FSPL) / 10) · (d² / d0²)^(-N / 2): una potencia por punto
+        ganancia = 10 ** ((pt - fspl) / 10)
+        d02_px = (d0 / m_por_px) ** 2
+    valores = None
+    for j in candidatos.T:
+        dx, dy = xs - pos[j, 0, None, None], ys - pos[j, 1, None, None]
+        if suma:
+            d2 = np.maximum(dx * dx + dy * dy, d02_px)
+            v = np.power(d2 / d02_px, -N / 2)
+            v *= ganancia[j, None, None]
+            valores = v if valores is None else np.add(valores, v, out=valores)
+        else:
+            v = _nivel(np.hypot(dx, dy), pt[j, None, None], fspl, N, d0, m_por_px)
+            # Cada candidato se interpola por separado y después se toma el máximo
+            if not exacto:
+                v = interpolar(v)
+            valores = v if valores is None else np.maximum(valores, v, out=valores)
+    if suma:
+        valores = 10 * np.log10(valores)
+        if not exacto:
+            valores = interpolar(valores)
+    salida[filas - f0, columnas] = valores
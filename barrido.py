@@ -0,0 +1,312 @@
+"""Barridos de parámetros del modelo CI: N, potencia y frecuencia.
+
+En el modelo Close-In
+
+    Pr = Pt - FSPL_d0(f) - 10 N log10(d / d0)
+
+Pt y FSPL_d0 son desplazamientos aditivos y N escala log10(d / d0). Con
+una potencia común por capa el mejor servidor es el nodo más cercano para
+cualquier (N, Pt, f), así que la geometría (log10 de la distancia al nodo
+más cercano) se calcula una sola vez por capa y todos los escenarios salen
+de una operación con broadcasting (S, 1, 1) x (alto, ancho). Un barrido de
+50 escenarios cuesta una simulación más 50 operaciones afines sobre el
+plano. Sumar potencias (entre capas o entre todos los nodos) no es afín
+en N: esa parte se calcula una vez por valor distinto de N, y Pt y f
+siguen siendo desplazamientos.
+
+Con los N ordenados, 10^(-N L) sale del término del N anterior
+multiplicando por 10^(-ΔN L), así que "capas" no evalúa una potencia por
+N sobre el plano: quedan una multiplicación por capa, un log10 y el
+desplazamiento de cada escenario. "suma" no puede reducirse al nodo más
+cercano y sigue costando una multiplicación y una suma por transmisor, N
+y píxel (T · S · alto · ancho): con 38 nodos y 50 N a 1280x720 es unas
+catorce simulaciones, frente a unas tres de "capas" y "mejor", cuyo piso
+es escribir los S mapas.
+
+Uso:
+    python barrido.py PolideportivoCEO --N 2:4:0.25 --pt 23,30,33 --f 3300,3500,3800
+    python barrido.py CentroAcuatico --N 2,2.5,3 --mapas barridos/   # (S, alto, ancho) .npy
+"""
+import argparse
+import itertools
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+from cobertura import ELEMENTOS_POR_BLOQUE, eje_coordenadas, fspl_d0
+from sedes import DIRECTORIO_SEDES, cargar_sede, posiciones_capa
+from teselas import reservar_mapa
+from zonas import cobertura_fuera_de_zonas, mascara_zonas
+
+AGREGACIONES_BARRIDO = ("capas", "mejor", "suma")
+
+
+def escenarios(N, Pt_dBm, f_mhz):
+    """Producto cartesiano de los valores -> {"N": (S,), "Pt_dBm": (S,), "f_mhz": (S,)}.
+
+    El orden es el de itertools.product(N, Pt_dBm, f_mhz): la frecuencia
+    varía más rápido.
+    """
+    combinaciones = np.array(list(itertools.product(np.atleast_1d(N), np.atleast_1d(Pt_dBm),
+                                                    np.atleast_1d(f_mhz))), dtype=np.float64)
+    return {"N": combinaciones[:, 0], "Pt_dBm": combinaciones[:, 1],
+            "f_mhz": combinaciones[:, 2]}
+
+
+def _franjas(ancho, f0, f1, filas_por_bloque=None):
+    filas_por_bloque = filas_por_bloque or max(1, ELEMENTOS_POR_BLOQUE // max(ancho, 1))
+    for r0 in range(f0, f1, filas_por_bloque):
+        yield r0, min(f1, r0 + filas_por_bloque)
+
+
+def log_distancia(transmisores, ancho, alto, d0=1.0, m_por_px=1.0, filas=None):
+    """log10(d / d0) al transmisor más cercano (d < d0 recortado a d0), (f1 - f0, ancho).
+
+    Es la única parte del mapa de mejor servidor que depende de la
+    geometría; se acumula el mínimo de d² por franjas de filas y se toma
+    un solo log10 por píxel.
+    """
+    f0, f1 = filas if filas is not None else (0, alto)
+    pos = np.asarray(transmisores, dtype=np.float64).reshape(-1, 2)
+    salida = np.empty((f1 - f0, ancho), dtype=np.float64)
+    xs = eje_coordenadas(ancho)[None, :]
+    for r0, r1 in _franjas(ancho, f0, f1):
+        ys = eje_coordenadas(alto)[r0:r1, None]
+        d2 = salida[r0 - f0:r1 - f0]
+        d2.fill(np.inf)
+        for cx, cy in pos:
+            np.minimum(d2, (xs - cx) ** 2 + (ys - cy) ** 2, out=d2)
+    salida *= m_por_px ** 2
+    np.maximum(salida, d0 ** 2, out=salida)
+    salida /= d0 ** 2
+    np.log10(salida, out=salida)
+    salida *= 0.5
+    return salida
+
+
+def suma_ganancias(transmisores, ancho, alto, exponentes, d0=1.0, m_por_px=1.0, filas=None,
+                   dtype=np.float64):
+    """Σ_j (d_j / d0)^-N para cada N de exponentes -> (len(exponentes), f1 - f0, ancho).
+
+    Es el término geométrico de la suma de potencias (mismo Pt para todos):
+    Pr_total = Pt - FSPL_d0 + 10 log10(Σ_j (d_j / d0)^-N). Se recorre el
+    plano una vez, con todos los transmisores de una franja apilados: con
+    los N ordenados cada término sale del anterior multiplicando por
+    (d_j / d0)^-ΔN, y con N equiespaciados (p. ej. un linspace) basta un
+    exp por franja para el primer N y otro para el paso. dtype: precisión
+    de los términos y de la salida (float32 alcanza mientras
+    N log10(d / d0) no pase de ~38).
+    """
+    f0, f1 = filas if filas is not None else (0, alto)
+    pos = np.asarray(transmisores, dtype=np.float64).reshape(-1, 2)
+    exponentes = np.asarray(exponentes, dtype=np.float64)
+    tipo = np.dtype(dtype).type
+    orden = np.argsort(exponentes)
+    pasos = np.round(np.diff(exponentes[orden]), 12)
+    salida = np.empty((len(exponentes), f1 - f0, ancho), dtype=dtype)
+    xs = eje_coordenadas(ancho)[None, None, :]
+    cx, cy = pos[:, 0, None, None], pos[:, 1, None, None]
+    # Franjas de ELEMENTOS_POR_BLOQUE términos (transmisores x píxeles) para seguir en caché
+    filas_por_bloque = max(1, ELEMENTOS_POR_BLOQUE // max(ancho * len(pos), 1))
+    for r0, r1 in _franjas(ancho, f0, f1, filas_por_bloque):
+        ys = eje_coordenadas(alto)[None, r0:r1, None]
+        d2 = ((xs - cx) ** 2 + (ys - cy) ** 2) * (m_por_px / d0) ** 2
+        ln_d = (0.5 * np.log(np.maximum(d2, 1.0))).astype(dtype, copy=False)
+        termino = np.exp(tipo(-exponentes[orden[0]]) * ln_d)
+        termino.sum(axis=0, out=salida[orden[0], r0 - f0:r1 - f0])
+        previo = None
+        for k, paso in zip(orden[1:], pasos):
+            if paso != previo:
+                factor, previo = np.exp(tipo(-paso) * ln_d), paso
+            termino *= factor
+            termino.sum(axis=0, out=salida[k, r0 - f0:r1 - f0])
+    return salida
+
+
+def barrer_capas(capas, ancho, alto, N, f_mhz, d0=1.0, m_por_px=1.0, piso_dbm=-150.0,
+                 agregacion="mejor", dtype=np.float32, salida=None, filas=None):
+    """Mapas (S, f1 - f0, ancho) en dBm de S escenarios sobre varias capas de nodos.
+
+    capas: lista de (transmisores, Pt_dBm) con Pt_dBm (S,), la potencia de
+    la capa en cada escenario; N y f_mhz: (S,). agregacion:
+    - "mejor": mejor servidor entre todos los nodos.
+    - "capas": mejor servidor por capa y suma de potencias entre capas.
+    - "suma": potencia total de todos los nodos.
+
+    La geometría de cada capa se calcula una vez (log_distancia, o
+    suma_ganancias por N distinto con "suma"). El mapa relativo, sin Pt
+    ni FSPL de la primera capa, depende solo de N y de la diferencia de
+    potencia entre capas: se calcula una vez por cada combinación distinta
+    y cada escenario es ese mapa más un desplazamiento.
+    """
+    if agregacion not in AGREGACIONES_BARRIDO:
+        raise ValueError(f"agregación desconocida: {agregacion!r}")
+    N = np.asarray(N, dtype=np.float64)
+    f_mhz = np.broadcast_to(np.asarray(f_mhz, dtype=np.float64), N.shape)
+    f0, f1 = filas if filas is not None else (0, alto)
+    if salida is None:
+        salida = np.empty((len(N), f1 - f0, ancho), dtype=dtype)
+    capas = [(t, np.broadcast_to(np.asarray(Pt, dtype=np.float64), N.shape))
+             for t, Pt in capas if len(t)]
+    if not capas:
+        salida.fill(piso_dbm)
+        return salida
+
+    exponentes, indice_N = np.unique(N, return_inverse=True)
+    # Los escenarios se calculan en la precisión de salida (float32 por defecto)
+    tipo = np.result_type(salida.dtype, np.float32)
+    if agregacion == "suma":
+        geometria = [suma_ganancias(t, ancho, alto, exponentes, d0, m_por_px, filas, tipo)
+                     for t, _ in capas]
+    else:
+        geometria = [log_distancia(t, ancho, alto, d0, m_por_px, filas).astype(tipo, copy=False)
+                     for t, _ in capas]
+    desplazamiento = capas[0][1] - np.array([fspl_d0(float(f), d0) for f in f_mhz])
+    diferencias = np.stack([Pt - capas[0][1] for _, Pt in capas], axis=1)     # (S, capas)
+
+    claves = np.column_stack([N, diferencias])
+    terminos, n_previo, paso_previo = None, None, None
+    # np.unique ordena las claves por N: con "capas" cada 10^(-N L) de una
+    # capa sale del del N anterior multiplicando por 10^(-ΔN L)
+    for clave in np.unique(claves, axis=0):
+        grupo = np.flatnonzero((claves == clave).all(axis=1))
+        k = indice_N[grupo[0]]
+        n, delta = clave[0], clave[1:]
+        if agregacion == "capas" and n != n_previo:
+            if terminos is None:
+                terminos = [np.power(tipo.type(10), tipo.type(-n) * L) for L in geometria]
+            else:
+                paso = round(n - n_previo, 12)
+                if paso != paso_previo:
+                    factores = [np.power(tipo.type(10), tipo.type(-paso) * L) for L in geometria]
+                    paso_previo = paso
+                for termino, factor in zip(terminos, factores):
+                    termino *= factor
+            n_previo = n
+        if agregacion == "mejor":
+            relativo = delta[0] - 10 * n * geometria[0]
+            for dc, L in zip(delta[1:], geometria[1:]):
+                np.maximum(relativo, dc - 10 * n * L, out=relativo)
+        else:
+            lineal = 0.0
+            for dc, termino in zip(delta, [g[k] for g in geometria] if agregacion == "suma"
+                                   else terminos):
+                lineal = lineal + tipo.type(10 ** (dc / 10)) * termino
+            relativo = 10 * np.log10(lineal)
+        relativo = relativo.astype(salida.dtype, copy=False)
+        for s in grupo:
+            np.add(relativo, desplazamiento[s], out=salida[s], casting="unsafe")
+            if agregacion != "suma":
+                np.maximum(salida[s], piso_dbm, out=salida[s])
+    return salida
+
+
+def barrer_cobertura(transmisores, ancho, alto, N, Pt_dBm, f_mhz, d0=1.0, m_por_px=1.0,
+                     piso_dbm=-150.0, agregacion="mejor", dtype=np.float32, salida=None,
+                     filas=None):
+    """Mapas (S, f1 - f0, ancho) en dBm de los S escenarios (N[s], Pt_dBm[s], f_mhz[s]).
+
+    N, Pt_dBm y f_mhz: arrays (S,) (p. ej. de escenarios()); Pt_dBm es la
+    potencia común de todos los transmisores en cada escenario.
+    agregacion: "mejor" o "suma" (ver barrer_capas). salida: array
+    (S, f1 - f0, ancho) preasignado, que puede ser un np.memmap.
+    """
+    N, Pt_dBm, f_mhz = np.broadcast_arrays(*(np.asarray(v, dtype=np.float64)
+                                             for v in (N, Pt_dBm, f_mhz)))
+    return barrer_capas([(transmisores, Pt_dBm)], ancho, alto, N, f_mhz, d0, m_por_px,
+                        piso_dbm, agregacion, dtype, salida, filas)
+
+
+def barrer_sede(sede, width, height, N=None, Pt_dBm=None, f_mhz=None, agregacion="capas",
+                dtype=np.float32, salida=None):
+    """Barrido del mapa combinado de una sede sobre el producto N x Pt_dBm x f_mhz.
+
+    Cada parámetro es una lista de valores o None (el de la sede: N y
+    f_mhz de la sede, Pt_dBm de cada capa). agregacion combina las capas
+    como en sedes.simular_sede: "capas", "mejor" o "suma". El barrido
+    trabaja a la resolución del plano y sin ventanas ni muros.
+
+    Devuelve {"escenarios": dict de escenarios(), "mapas": (S, height,
+    width) en salida si se da, small_cells, rrus y mascara_zonas}.
+    """
+    tabla = escenarios(sede["N"] if N is None else N, 0.0 if Pt_dBm is None else Pt_dBm,
+                       sede["f_mhz"] if f_mhz is None else f_mhz)
+    zonas = sede["zonas_prohibidas"]
+    mascara = mascara_zonas(zonas, width, height)
+    resultado = {"escenarios": tabla, "mascara_zonas": mascara}
+    capas = []
+    for capa in ("small_cells", "rrus"):
+        resultado[capa] = []
+        if capa not in sede:
+            continue
+        posiciones = posiciones_capa(sede[capa], width, height, zonas, mascara)
+        resultado[capa] = posiciones
+        capas.append((posiciones, tabla["Pt_dBm"] if Pt_dBm is not None
+                      else sede[capa].get("Pt_dBm", 33)))
+    resultado["mapas"] = barrer_capas(capas, width, height, tabla["N"], tabla["f_mhz"],
+                                      sede["d0"], sede["m_por_px"], sede["piso_dbm"],
+                                      agregacion, dtype, salida)
+    return resultado
+
+
+# === LÍNEA DE COMANDOS ===
+def valores(texto):
+    """"2,2.5,3" -> [2, 2.5, 3]; "2:4:0.5" -> 2, 2.5, ..., 4 (inicio:fin:paso, fin incluido)."""
+    if ":" in texto:
+        inicio, fin, paso = map(float, texto.split(":"))
+        return list(np.round(np.arange(inicio, fin + paso / 2, paso), 10))
+    return [float(v) for v in texto.split(",") if v]
+
+
+def main(argv=None):
+    from simular_sedes import DIRECTORIO_PLANOS, UMBRAL_COBERTURA_DBM
+
+    parser = argparse.ArgumentParser(description="Barrido de N, potencia y frecuencia de una sede.")
+    parser.add_argument("sede")
+    parser.add_argument("--config", default=DIRECTORIO_SEDES)
+    parser.add_argument("--planos", default=DIRECTORIO_PLANOS)
+    parser.add_argument("--N", type=valores, default=None, metavar="VALORES",
+                        help="exponentes de pérdida, p. ej. 2:4:0.25 o 2,3.2")
+    parser.add_argument("--pt", type=valores, default=None, metavar="DBM",
+                        help="potencias comunes a todos los nodos, p. ej. 23,30,33")
+    parser.add_argument("--f", type=valores, default=None, metavar="MHZ",
+                        help="frecuencias, p. ej. 3300,3500,3800")
+    parser.add_argument("--agregacion", choices=AGREGACIONES_BARRIDO, default="capas")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_COBERTURA_DBM, metavar="DBM")
+    parser.add_argument("--mapas", default=None, metavar="DIR",
+                        help="guardar los mapas como <sede>_barrido.npy (S, alto, ancho) "
+                             "con los escenarios en <sede>_barrido.json")
+    args = parser.parse_args(argv)
+
+    sede = cargar_sede(args.sede, args.config)
+    with Image.open(os.path.join(args.planos, sede["plano"])) as img:
+        width, height = img.size
+    n_escenarios = len(escenarios(args.N or sede["N"], args.pt or 0.0,
+                                  args.f or sede["f_mhz"])["N"])
+    salida = None
+    if args.mapas:
+        os.makedirs(args.mapas, exist_ok=True)
+        salida = reservar_mapa((n_escenarios, height, width), np.float32,
+                               os.path.join(args.mapas, f"{sede['clave']}_barrido.npy"))
+    resultado = barrer_sede(sede, width, height, args.N, args.pt, args.f, args.agregacion,
+                            salida=salida)
+    tabla = resultado["escenarios"]
+    cobertura = [cobertura_fuera_de_zonas(m, resultado["mascara_zonas"], args.umbral)
+                 for m in resultado["mapas"]]
+    print(f"{'N':>6} {'Pt [dBm]':>9} {'f [MHz]':>8}  >= {args.umbral:g} dBm")
+    for N, Pt, f, c in zip(tabla["N"], tabla["Pt_dBm"], tabla["f_mhz"], cobertura):
+        Pt = f"{Pt:9g}" if args.pt else f"{'sede':>9}"
+        print(f"{N:6g} {Pt} {f:8g}  {c:6.1f} %")
+    if args.mapas:
+        resultado["mapas"].flush()
+        with open(os.path.join(args.mapas, f"{sede['clave']}_barrido.json"), "w",
+                  encoding="utf-8") as f:
+            json.dump({"sede": sede["clave"], "agregacion": args.agregacion,
+                       "escenarios": {k: v.tolist() for k, v in tabla.items()},
+                       "Pt_sede": not args.pt, "cobertura": cobertura}, f, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Benchmark del cálculo de cobertura: bucle original vs. motor de cobertura.py.
+
+Para cada sede mide tiempo de pared y pico de memoria (tracemalloc, que
+registra las asignaciones de NumPy) del bucle por transmisor de los scripts
+originales y de cobertura.mapa_cobertura en float64 y float32.
+
+Uso: python benchmark_cobertura.py [sedes...] [--planos DIR] [--repeticiones 3]
+                                  [--metodo lut|kernel|log|adaptativo]
+"""
+import argparse
+import os
+import time
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+
+from cobertura import fspl_d0, mapa_cobertura
+from sedes import cargar_sede, listar_sedes, posiciones_capa
+from simular_sedes import DIRECTORIO_PLANOS
+
+# Tamaño aproximado de cada plano (px) cuando no está disponible en --planos
+TAMANOS_APROX = {
+    "Atletismo": (1000, 600), "BMX_FS": (800, 500), "BMX_Race": (800, 450),
+    "COParena": (820, 640), "CentroAcuatico": (820, 460), "Hockey": (550, 500),
+    "Patinodromo": (700, 550), "Polideportivo3x3": (500, 300),
+    "PolideportivoCEO": (720, 300), "PolideportivoUrbano": (650, 550),
+    "Poligonodetiro": (700, 400), "Pynandi": (650, 600), "Rugby": (600, 550),
+    "Skatepark": (900, 500), "Tiroalarco": (700, 550), "Tirodeportivo": (500, 300),
+    "Velodromo": (620, 400),
+}
+
+
+def tamano_plano(sede, directorio_planos):
+    ruta = os.path.join(directorio_planos, sede["plano"])
+    if os.path.exists(ruta):
+        with Image.open(ruta) as img:
+            return img.size
+    return TAMANOS_APROX.get(sede["clave"], (800, 600))
+
+
+def transmisores_sede(sede, width, height):
+    """Posiciones y potencias de todas las capas de la sede."""
+    tx, pt = [], []
+    for capa in ("small_cells", "rrus"):
+        if capa in sede:
+            pos = posiciones_capa(sede[capa], width, height, sede["zonas_prohibidas"])
+            tx += pos
+            pt += [sede[capa].get("Pt_dBm", 33)] * len(pos)
+    return tx, np.array(pt, dtype=float)
+
+
+# === IMPLEMENTACIÓN ORIGINAL (bucle de los scripts) ===
+def mapa_cobertura_original(transmisores, width, height, N, Pt_dBm, f_mhz=3500, d0=1):
+    FSPL_d0 = fspl_d0(f_mhz, d0)
+    xx, yy = np.meshgrid(np.arange(width), np.arange(height))
+    heatmap = np.full((height, width), -150.0)
+    for (cx, cy), Pt in zip(transmisores, np.broadcast_to(Pt_dBm, (len(transmisores),))):
+        d = np.sqrt((xx - cx)**2 + (yy - cy)**2)
+        d[d < d0] = d0
+        PL = FSPL_d0 + 10 * N * np.log10(d / d0)
+        Pr_dBm = Pt - PL
+        heatmap = np.maximum(heatmap, Pr_dBm)
+    return heatmap
+
+
+def medir(funcion, repeticiones):
+    """Devuelve (mejor tiempo en s, pico de memoria en MB, resultado)."""
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        resultado = funcion()
+        mejor = min(mejor, time.perf_counter() - t0)
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mejor, pico / 2**20, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sedes", nargs="*", help="claves de sede (por defecto todas)")
+    parser.add_argument("--planos", default=DIRECTORIO_PLANOS)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--metodo", choices=("lut", "kernel", "log", "adaptativo"), default="lut")
+    args = parser.parse_args()
+
+    print(f"{'Sede':<20} {'TX':>3} {'antes [s]':>10} {'MB':>7} "
+          f"{'f64 [s]':>9} {'MB':>6} {'f32 [s]':>9} {'MB':>6} {'x':>6} {'err [dB]':>9}")
+    total_antes = total_despues = 0.0
+    for nombre in args.sedes or listar_sedes():
+        sede = cargar_sede(nombre)
+        width, height = tamano_plano(sede, args.planos)
+        tx, pt = transmisores_sede(sede, width, height)
+        N = sede["N"]
+        t_a, m_a, ref = medir(lambda: mapa_cobertura_original(tx, width, height, N, pt),
+                              args.repeticiones)
+        t_64, m_64, res = medir(lambda: mapa_cobertura(tx, width, height, N, pt,
+                                                     metodo=args.metodo),
+                                args.repeticiones)
+        t_32, m_32, _ = medir(lambda: mapa_cobertura(tx, width, height, N, pt,
+                                                     dtype=np.float32,
+                                                     metodo=args.metodo),
+                              args.repeticiones)
+        total_antes += t_a
+        total_despues += t_32
+        err = np.max(np.abs(res - ref))
+        print(f"{nombre:<20} {len(tx):>3} {t_a:>10.4f} {m_a:>7.1f} "
+              f"{t_64:>9.4f} {m_64:>6.1f} {t_32:>9.4f} {m_32:>6.1f} "
+              f"{t_a / t_32:>6.1f} {err:>9.1e}")
+    print(f"{'TOTAL':<20} {'':>3} {total_antes:>10.4f} {'':>7} {'':>9} {'':>6} "
+          f"{total_despues:>9.4f} {'':>6} {total_antes / total_despues:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from sedes import posiciones_capa
+from zonas import mascara_zonas
+
+# === CACHÉ EN DISCO DE LOS MAPAS SIMULADOS ===
+# Cada resultado de simular_sede se guarda en un .npz comprimido cuyo nombre
+# es el hash de todo lo que lo determina: bytes del plano, transmisores
+# (posiciones y potencias), parámetros del modelo CI y opciones de cálculo.
+# Volver a graficar o exportar una sede sin cambios no vuelve a simular.
+DIRECTORIO_CACHE = os.environ.get("CACHE_5G", ".cache_5g")
+TAMANO_MAX_CACHE = 1 << 30      # 1 GB; se desalojan los menos usados (LRU)
+
+# Versión del formato / del motor: cambiarla invalida todas las entradas
+VERSION_CACHE = 1
+
+_hashes_planos = {}
+
+
+def hash_archivo(ruta):
+    """SHA-256 del contenido del archivo (se recuerda por ruta, tamaño y fecha)."""
+    st = os.stat(ruta)
+    clave = (os.path.abspath(ruta), st.st_size, st.st_mtime_ns)
+    if clave not in _hashes_planos:
+        h = hashlib.sha256()
+        with open(ruta, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 20), b""):
+                h.update(bloque)
+        _hashes_planos[clave] = h.hexdigest()
+    return _hashes_planos[clave]
+
+
+def clave_sede(ruta_plano, sede, width, height, **opciones):
+    """Hash de los datos que determinan los mapas de una sede.
+
+    opciones: argumentos de simular_sede que cambian el resultado (dtype,
+    metodo, ventanas, agregacion, ...).
+    """
+    mascara = mascara_zonas(sede["zonas_prohibidas"], width, height)
+    capas = {}
+    for capa in ("small_cells", "rrus"):
+        if capa in sede:
+            capas[capa] = {
+                "posiciones": [list(map(float, p)) for p in
+                               posiciones_capa(sede[capa], width, height,
+                                               sede["zonas_prohibidas"], mascara)],
+                "Pt_dBm": sede[capa].get("Pt_dBm", 33),
+                "radio_px": sede[capa].get("radio_px"),
+            }
+    modelo = {k: sede.get(k) for k in ("N", "f_mhz", "d0", "m_por_px", "resolucion_m",
+                                       "piso_dbm", "sensibilidad_dbm", "ruido_dbm",
+                                       "ancho_banda_mhz", "figura_ruido_db", "zonas_prohibidas",
+                                       "muros")}
+    datos = {"version": VERSION_CACHE, "plano": hash_archivo(ruta_plano),
+             "tamano": [width, height], "capas": capas, "modelo": modelo,
+             "opciones": {k: str(v) for k, v in sorted(opciones.items())}}
+    texto = json.dumps(datos, sort_keys=True, default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheMapas:
+    """Caché de resultados de simular_sede en archivos .npz, con desalojo LRU por tamaño."""
+
+    def __init__(self, directorio=DIRECTORIO_CACHE, tamano_max=TAMANO_MAX_CACHE):
+        self.directorio = directorio
+        self.tamano_max = tamano_max
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, clave + ".npz")
+
+    def cargar(self, clave):
+        """Resultado guardado o None. Un acierto marca la entrada como usada."""
+        ruta = self._ruta(clave)
+        try:
+            with np.load(ruta, allow_pickle=False) as datos:
+                resultado = {k: datos[k] for k in datos.files if k != "_meta"}
+                meta = json.loads(str(datos["_meta"]))
+        except (OSError, KeyError, ValueError):
+            return None
+        os.utime(ruta)
+        for capa, posiciones in meta["posiciones"].items():
+            resultado[capa] = [tuple(p) for p in posiciones]
+        for clave_mapa in meta["nulos"]:
+            resultado[clave_mapa] = None
+        resultado.update(meta["extra"])
+        return resultado
+
+    def guardar(self, clave, resultado):
+        """Guarda los mapas (arrays) y las posiciones de un resultado de simular_sede."""
+        arrays, meta = {}, {"posiciones": {}, "nulos": [], "extra": {}}
+        for k, v in resultado.items():
+            if isinstance(v, np.ndarray):
+                arrays[k] = np.asarray(v)
+            elif v is None:
+                meta["nulos"].append(k)
+            elif isinstance(v, list):
+                meta["posiciones"][k] = [list(p) for p in v]
+            else:
+                meta["extra"][k] = v
+        ruta = self._ruta(clave)
+        temporal = ruta + ".tmp.npz"
+        np.savez_compressed(temporal, _meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(temporal, ruta)
+        self.desalojar()
+
+    def desalojar(self):
+        """Borra las entradas usadas hace más tiempo hasta quedar bajo tamano_max."""
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".npz") and not nombre.endswith(".tmp.npz"):
+                st = os.stat(os.path.join(self.directorio, nombre))
+                entradas.append((st.st_mtime, st.st_size, nombre))
+        total = sum(tamano for _, tamano, _ in entradas)
+        for _, tamano, nombre in sorted(entradas):
+            if total <= self.tamano_max:
+                break
+            os.remove(os.path.join(self.directorio, nombre))
+            total -= tamano
@@ -0,0 +1,347 @@
+"""Capacidad por píxel: SINR -> eficiencia espectral -> throughput con carga por celda.
+
+Etapa posterior a la SINR (agregacion="sinr" de sedes.simular_sede o el
+estado de incremental.CoberturaIncremental):
+
+1. Eficiencia espectral: la SINR se lleva a la eficiencia del MCS más alto
+   que la soporta, con la tabla MCS 256QAM de 3GPP TS 38.214 (tabla
+   5.1.3.1-2). Los umbrales de SINR salen de la aproximación de Shannon
+   atenuada SE = α·log2(1 + SINR) (3GPP TR 36.942, anexo A.2). En lugar de
+   comparar cada píxel contra 28 umbrales se precalcula una LUT sobre una
+   grilla de SINR cada PASO_LUT_DB, redondeando hacia abajo (nunca se
+   elige un MCS que la SINR no soporta): un índice entero por píxel.
+2. Usuarios: mapa de usuarios por píxel a partir de la densidad de la sede
+   ("usuarios": {"densidad_m2": ..., "zonas": [...]}); las zonas
+   prohibidas (piletas, pistas) no tienen usuarios salvo que una zona de
+   densidad diga lo contrario.
+3. Carga por celda: cada celda reparte su ancho de banda entre los
+   usuarios de los píxeles que sirve. usuarios y carga por celda salen de
+   un np.bincount por (celda, punto de la grilla de SINR); carga = fracción del tiempo de la
+   celda que hace falta para dar demanda_mbps a cada usuario (> 1: celda
+   saturada).
+4. Throughput por usuario en cada píxel, según el planificador:
+   - "tiempo" (round robin, buffers llenos): cada usuario recibe 1/U del
+     tiempo de su celda -> tasa_pico(píxel) / U.
+   - "caudal" (mismo caudal para todos): cada usuario recibe la demanda,
+     escalada por 1/carga si la celda está saturada.
+
+Todo es aritmética por píxel más un bincount, así que se puede volver a
+evaluar después de cada cambio de ubicación (ModeloCapacidad.evaluar o
+capacidad_incremental sobre el estado incremental).
+
+Uso:
+    python capacidad.py CentroAcuatico --densidad 0.5 --demanda 5
+    python capacidad.py Atletismo --planificador caudal --salida capacidad/
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from cobertura import ruido_termico_dbm
+from sedes import DIRECTORIO_SEDES, cargar_sede, simular_sede
+from zonas import mascara_zonas
+
+# Tabla MCS 256QAM de 3GPP TS 38.214, tabla 5.1.3.1-2: (Qm, R x 1024, eficiencia)
+TABLA_MCS = (
+    (2, 120, 0.2344), (2, 193, 0.3770), (2, 308, 0.6016), (2, 449, 0.8770),
+    (2, 602, 1.1758), (4, 378, 1.4766), (4, 434, 1.6953), (4, 490, 1.9141),
+    (4, 553, 2.1602), (4, 616, 2.4063), (4, 658, 2.5703), (6, 466, 2.7305),
+    (6, 517, 3.0293), (6, 567, 3.3223), (6, 616, 3.6094), (6, 666, 3.9023),
+    (6, 719, 4.2129), (6, 772, 4.5234), (6, 822, 4.8164), (6, 873, 5.1152),
+    (8, 682.5, 5.3320), (8, 711, 5.5547), (8, 754, 5.8906), (8, 797, 6.2266),
+    (8, 841, 6.5703), (8, 885, 6.9141), (8, 916.5, 7.1602), (8, 948, 7.4063),
+)
+FACTOR_SHANNON = 0.75           # α de la Shannon atenuada para los umbrales de SINR
+SOBRECARGA = 0.14               # Overhead de control y referencia en DL, FR1 (TS 38.306)
+PASO_LUT_DB = 0.1
+RANGO_LUT_DB = (-10.0, 40.0)
+DENSIDAD_USUARIOS_M2 = 0.1      # Usuarios activos por m² fuera de las zonas prohibidas
+DEMANDA_MBPS = 5.0              # Caudal pedido por usuario para la carga de la celda
+PLANIFICADORES = ("tiempo", "caudal")
+
+
+def umbrales_mcs(tabla=TABLA_MCS, alfa=FACTOR_SHANNON):
+    """SINR mínima (dB) de cada MCS: SE = α·log2(1 + SINR) despejada."""
+    eficiencia = np.array([fila[2] for fila in tabla])
+    return 10 * np.log10(2 ** (eficiencia / alfa) - 1)
+
+
+def lut_eficiencia(tabla=TABLA_MCS, alfa=FACTOR_SHANNON, paso_db=PASO_LUT_DB,
+                   rango_db=RANGO_LUT_DB):
+    """Eficiencia (bit/s/Hz) del mejor MCS en cada punto de la grilla de SINR.
+
+    La SINR de un píxel se lleva al punto de la grilla inmediatamente
+    inferior, así que el MCS elegido nunca supera al que la SINR soporta.
+    Por debajo del MCS 0 la eficiencia es 0 (sin servicio).
+    """
+    grilla = rango_db[0] + paso_db * np.arange(int(round((rango_db[1] - rango_db[0]) / paso_db)) + 1)
+    eficiencia = np.array([0.0] + [fila[2] for fila in tabla], dtype=np.float32)
+    # Tolerancia para que un umbral que cae justo en la grilla no se pierda por redondeo
+    return eficiencia[np.searchsorted(umbrales_mcs(tabla, alfa), grilla + 1e-9, side="right")]
+
+
+LUT_EFICIENCIA = lut_eficiencia()
+
+
+def indice_lut(sinr_db, n, paso_db=PASO_LUT_DB, rango_db=RANGO_LUT_DB):
+    """Índice en la grilla de SINR (punto inmediatamente inferior, recortado a 0..n-1)."""
+    indice = np.asarray(sinr_db, dtype=np.float32) - np.float32(rango_db[0])
+    indice *= np.float32(1 / paso_db)
+    np.clip(indice, 0, n - 1, out=indice)
+    return indice.astype(np.intp)
+
+
+def eficiencia_espectral(sinr_db, lut=LUT_EFICIENCIA, paso_db=PASO_LUT_DB,
+                         rango_db=RANGO_LUT_DB):
+    """Eficiencia espectral (bit/s/Hz) por píxel: un índice en la LUT, sin ramas."""
+    return lut[indice_lut(sinr_db, len(lut), paso_db, rango_db)]
+
+
+def usuarios_por_pixel(sede, width, height, densidad_m2=None):
+    """Usuarios esperados en cada píxel (float32) según sede["usuarios"].
+
+    "usuarios": {"densidad_m2": 0.1, "zonas": [{"zona": ..., "densidad_m2": 2.0}]}
+    La densidad base cubre el plano fuera de las zonas prohibidas; cada
+    zona (rectángulo o polígono, como las zonas prohibidas) impone su
+    densidad, en orden. densidad_m2 reemplaza la densidad base.
+    """
+    usuarios = sede.get("usuarios") or {}
+    if densidad_m2 is None:
+        densidad_m2 = usuarios.get("densidad_m2", DENSIDAD_USUARIOS_M2)
+    densidad = np.full((height, width), densidad_m2, dtype=np.float32)
+    if sede["zonas_prohibidas"]:
+        densidad[mascara_zonas(sede["zonas_prohibidas"], width, height)] = 0
+    for zona in usuarios.get("zonas", []):
+        densidad[mascara_zonas([zona["zona"]], width, height)] = zona["densidad_m2"]
+    return densidad * np.float32(sede["m_por_px"] ** 2)
+
+
+class ModeloCapacidad:
+    """Usuarios por píxel y parámetros del canal, fijos entre evaluaciones.
+
+    usuarios: mapa (alto, ancho) de usuarios por píxel. Solo los píxeles
+    con usuarios entran en la carga, así que se guardan sus índices para
+    no recorrer el resto del plano en cada evaluación. La tasa pico, su
+    inversa y si hay servicio se precalculan por punto de la grilla de
+    SINR: cada evaluación es un índice por píxel y un bincount.
+    """
+
+    def __init__(self, usuarios, ancho_banda_mhz=100, demanda_mbps=DEMANDA_MBPS,
+                 planificador="tiempo", sobrecarga=SOBRECARGA, lut=LUT_EFICIENCIA):
+        if planificador not in PLANIFICADORES:
+            raise ValueError(f"planificador desconocido: {planificador!r}")
+        self.usuarios = np.asarray(usuarios, dtype=np.float32)
+        self.poblados = np.flatnonzero(self.usuarios)
+        self.n_poblados = self.usuarios.ravel()[self.poblados].astype(np.float64)
+        self.total_usuarios = float(self.n_poblados.sum())
+        self.ancho_banda_mhz = ancho_banda_mhz
+        self.demanda_mbps = demanda_mbps
+        self.planificador = planificador
+        # Mbps de la celda entera para un usuario en cada punto de la grilla
+        self.lut_tasa = (lut * (ancho_banda_mhz * (1 - sobrecarga))).astype(np.float32)
+        self.lut_servicio = (self.lut_tasa > 0).astype(np.float64)
+        self.lut_inversa = np.divide(1.0, self.lut_tasa, out=np.zeros(len(lut)),
+                                     where=self.lut_tasa > 0)
+
+    def evaluar(self, id_servidor, sinr_db, n_celdas, mapas=True):
+        """Carga por celda y throughput por píxel para una asignación de servidores.
+
+        id_servidor: índice de celda por píxel (SIN_SERVIDOR o negativo = sin
+        servidor); sinr_db: SINR del servidor en dB. Devuelve un dict con,
+        por celda, "usuarios", "carga" y "throughput_celda_mbps" (suma de
+        los caudales de sus usuarios) y los totales "usuarios_servidos" y
+        "usuarios_sin_servicio". Con mapas=True también "tasa_pico_mbps"
+        (la celda entera para un usuario) y "throughput_mbps" (esperado por
+        usuario) por píxel; mapas=False evalúa solo los píxeles con usuarios.
+        """
+        resultado = self.evaluar_poblados(np.asarray(id_servidor).ravel()[self.poblados],
+                                          np.asarray(sinr_db).ravel()[self.poblados], n_celdas)
+        if mapas:
+            resultado.update(self.mapas(id_servidor, sinr_db, resultado["reparto"]))
+        return resultado
+
+    def evaluar_poblados(self, ids, sinr_db, n_celdas):
+        """evaluar sin mapas, con id_servidor y SINR ya leídos en self.poblados.
+
+        Un solo bincount arma el histograma de usuarios por (celda, punto de
+        la grilla de SINR); usuarios, carga y throughput por celda salen de
+        multiplicarlo por las LUT, sin recorrer otra vez los píxeles.
+        """
+        largo = len(self.lut_tasa)
+        # Los píxeles sin servidor van a una celda extra (n_celdas) que se descarta
+        clave = ids.astype(np.intp)
+        clave[(clave < 0) | (clave >= n_celdas)] = n_celdas
+        clave *= largo
+        clave += indice_lut(sinr_db, largo)
+        histograma = np.bincount(clave, self.n_poblados, (n_celdas + 1) * largo)
+        histograma = histograma.reshape(n_celdas + 1, largo)[:n_celdas]
+
+        usuarios = histograma @ self.lut_servicio
+        carga = self.demanda_mbps * (histograma @ self.lut_inversa)
+        reparto = self._reparto(usuarios, carga)
+        tasa = self.lut_tasa.astype(np.float64)
+        throughput_celda = (histograma * self._throughput(tasa[None, :], reparto[:, None])).sum(axis=1)
+        servidos = float(usuarios.sum())
+        return {"usuarios": usuarios, "carga": carga, "reparto": reparto,
+                "throughput_celda_mbps": throughput_celda,
+                "usuarios_servidos": servidos,
+                "usuarios_sin_servicio": self.total_usuarios - servidos}
+
+    def _reparto(self, usuarios, carga):
+        """Factor por celda: fracción de tiempo por usuario ("tiempo") o caudal ("caudal")."""
+        if self.planificador == "tiempo":
+            return 1 / np.maximum(usuarios, 1)
+        return self.demanda_mbps / np.maximum(carga, 1)
+
+    def _throughput(self, tasa, reparto):
+        """Throughput por usuario con la tasa pico del píxel y el reparto de su celda."""
+        if self.planificador == "tiempo":
+            return tasa * reparto
+        # Un usuario nunca recibe más que la celda entera para él solo
+        return np.minimum(reparto, tasa)
+
+    def mapas(self, id_servidor, sinr_db, reparto):
+        """Tasa pico y throughput esperado por usuario en cada píxel del plano."""
+        ids = np.asarray(id_servidor).astype(np.intp)
+        tasa = self.lut_tasa[indice_lut(sinr_db, len(self.lut_tasa))]
+        valido = (ids >= 0) & (ids < len(reparto))
+        tasa[~valido] = 0
+        factor = np.zeros(ids.shape, dtype=np.float32)
+        factor[valido] = reparto[ids[valido]]
+        return {"tasa_pico_mbps": tasa, "throughput_mbps": self._throughput(tasa, factor)}
+
+
+def resumen_capacidad(modelo, resultado, percentiles=(5, 50, 95)):
+    """Indicadores de la sede: percentiles del throughput por usuario y celdas saturadas."""
+    resumen = {"usuarios": round(modelo.total_usuarios, 1),
+               "usuarios_sin_servicio": round(resultado["usuarios_sin_servicio"], 1),
+               "celdas_saturadas": int(np.count_nonzero(resultado["carga"] > 1)),
+               "carga_max": round(float(resultado["carga"].max(initial=0)), 3),
+               "throughput_total_mbps": round(float(resultado["throughput_celda_mbps"].sum()), 1)}
+    if "throughput_mbps" in resultado and modelo.total_usuarios > 0:
+        # Percentiles sobre usuarios (cada píxel pesa lo que sus usuarios)
+        valores = resultado["throughput_mbps"].ravel()[modelo.poblados]
+        orden = np.argsort(valores, kind="stable")
+        acumulado = np.cumsum(modelo.n_poblados[orden])
+        for p in percentiles:
+            i = min(int(np.searchsorted(acumulado, acumulado[-1] * p / 100)), len(orden) - 1)
+            resumen[f"throughput_p{p:g}_mbps"] = round(float(valores[orden[i]]), 3)
+    return resumen
+
+
+# === SEDES ===
+def modelo_sede(sede, width, height, densidad_m2=None, demanda_mbps=None, planificador="tiempo"):
+    """ModeloCapacidad con la densidad, la demanda y el ancho de banda de la sede."""
+    usuarios = sede.get("usuarios") or {}
+    if demanda_mbps is None:
+        demanda_mbps = usuarios.get("demanda_mbps", DEMANDA_MBPS)
+    return ModeloCapacidad(usuarios_por_pixel(sede, width, height, densidad_m2),
+                           sede["ancho_banda_mhz"], demanda_mbps, planificador)
+
+
+def capacidad_sede(sede, width, height, modelo=None, dtype=np.float32, **opciones):
+    """Simula la SINR de la sede (agregacion="sinr") y evalúa su capacidad.
+
+    Devuelve el resultado de ModeloCapacidad.evaluar con además
+    "id_servidor", "sinr_db" y "modelo"; opciones va a modelo_sede.
+    """
+    modelo = modelo or modelo_sede(sede, width, height, **opciones)
+    sim = simular_sede(sede, width, height, dtype=dtype, agregacion="sinr")
+    n_celdas = len(sim["small_cells"]) + len(sim["rrus"])
+    resultado = modelo.evaluar(sim["id_servidor"], sim["combined_heatmap_dbm"], n_celdas)
+    resultado.update(id_servidor=sim["id_servidor"], sinr_db=sim["combined_heatmap_dbm"],
+                     modelo=modelo)
+    return resultado
+
+
+def sinr_db(mejor_dbm, potencia_mw, ruido_dbm):
+    """SINR (dB, float32) del mejor servidor con la potencia total en mW: un exp y un log."""
+    mejor = np.asarray(mejor_dbm, dtype=np.float32)
+    interferencia = np.float32(np.log(10) / 10) * mejor
+    np.exp(interferencia, out=interferencia)
+    np.subtract(np.asarray(potencia_mw, dtype=np.float32), interferencia, out=interferencia)
+    np.maximum(interferencia, 0, out=interferencia)
+    interferencia += np.float32(10 ** (ruido_dbm / 10))
+    np.log10(interferencia, out=interferencia)
+    interferencia *= np.float32(10)
+    return np.subtract(mejor, interferencia, out=interferencia)
+
+
+def capacidad_incremental(estado, modelo, ruido_dbm=None, mapas=False):
+    """ModeloCapacidad.evaluar sobre el estado incremental (tras agregar/mover/quitar).
+
+    Las celdas son los identificadores de nodo del estado; por defecto se
+    usa el ruido térmico del ancho de banda del modelo. Sin mapas la SINR
+    se calcula solo en los píxeles con usuarios.
+    """
+    if ruido_dbm is None:
+        ruido_dbm = ruido_termico_dbm(modelo.ancho_banda_mhz * 1e6)
+    n_celdas = max(estado.nodos, default=-1) + 1
+    if mapas:
+        sinr = sinr_db(estado.mejor, estado.potencia_mw, ruido_dbm)
+        return modelo.evaluar(estado.id_mejor, sinr, n_celdas)
+    p = modelo.poblados
+    sinr = sinr_db(estado.mejor.ravel()[p], estado.potencia_mw.ravel()[p], ruido_dbm)
+    return modelo.evaluar_poblados(estado.id_mejor.ravel()[p], sinr, n_celdas)
+
+
+def main(argv=None):
+    from graficos import exportar_superposicion
+    from simular_sedes import DIRECTORIO_PLANOS, cargar_plano
+
+    parser = argparse.ArgumentParser(description="Capacidad por píxel y carga por celda.")
+    parser.add_argument("sede", help="clave de la sede (config_sedes/<sede>.json)")
+    parser.add_argument("--config", default=DIRECTORIO_SEDES)
+    parser.add_argument("--planos", default=DIRECTORIO_PLANOS)
+    parser.add_argument("--densidad", type=float, default=None, metavar="USUARIOS_M2",
+                        help=f"densidad base de usuarios (por defecto {DENSIDAD_USUARIOS_M2:g}/m²)")
+    parser.add_argument("--demanda", type=float, default=None, metavar="MBPS",
+                        help=f"caudal pedido por usuario (por defecto {DEMANDA_MBPS:g} Mbps)")
+    parser.add_argument("--planificador", choices=PLANIFICADORES, default="tiempo")
+    parser.add_argument("--salida", default=None, metavar="DIR",
+                        help="guardar los mapas (.npy), la carga por celda (.json) y el "
+                             "throughput sobre el plano (<sede>_throughput.png)")
+    args = parser.parse_args(argv)
+
+    sede = cargar_sede(args.sede, args.config)
+    if not sede["escala_calibrada"]:
+        print(f"{sede['clave']}: sede sin \"calibracion\" (m_por_px = {sede['m_por_px']:g}); "
+              "la densidad por m² se aplica a cada píxel y la carga de las celdas no es "
+              "representativa")
+    img = cargar_plano(sede, args.planos)
+    width, height = img.size
+    t0 = time.perf_counter()
+    modelo = modelo_sede(sede, width, height, args.densidad, args.demanda, args.planificador)
+    r = capacidad_sede(sede, width, height, modelo)
+    t_sim = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    modelo.evaluar(r["id_servidor"], r["sinr_db"], len(r["usuarios"]))
+    t_eval = time.perf_counter() - t0
+    resumen = resumen_capacidad(modelo, r)
+    print(f"{sede['clave']}: {len(r['usuarios'])} celdas  "
+          + "  ".join(f"{k} {v:g}" for k, v in resumen.items())
+          + f"  sim {t_sim:.2f} s  evaluación {1000 * t_eval:.1f} ms")
+    if args.salida:
+        os.makedirs(args.salida, exist_ok=True)
+        for clave in ("tasa_pico_mbps", "throughput_mbps"):
+            np.save(os.path.join(args.salida, f"{sede['clave']}_{clave}.npy"), r[clave])
+        exportar_superposicion(os.path.join(args.salida, f"{sede['clave']}_throughput.png"),
+                               img, r["throughput_mbps"], vmin=0.0)
+        with open(os.path.join(args.salida, f"{sede['clave']}_capacidad.json"), "w",
+                  encoding="utf-8") as f:
+            json.dump({"sede": sede["clave"], "m_por_px": sede["m_por_px"],
+                       "escala_calibrada": sede["escala_calibrada"],
+                       "planificador": args.planificador,
+                       "demanda_mbps": modelo.demanda_mbps, **resumen,
+                       "celdas": [{"usuarios": round(float(u), 2), "carga": round(float(c), 4),
+                                   "throughput_mbps": round(float(t), 2)}
+                                  for u, c, t in zip(r["usuarios"], r["carga"],
+                                                     r["throughput_celda_mbps"])]},
+                      f, ensure_ascii=False, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,615 @@
+from functools import lru_cache
+
+import numpy as np
+
+from adaptativo import TOLERANCIA_DB, conviene_adaptativo, mapa_adaptativo
+from muros import PERDIDA_MURO_DB, mapa_muros
+
+# === CONSTANTES DEL MODELO CI (ITU-R M.2412) ===
+c = 3e8                  # Velocidad de la luz (m/s)
+PISO_DBM = -150.0        # Valor inicial de los heatmaps en dBm
+
+# === RUIDO TÉRMICO (para la SINR) ===
+KT_DBM_HZ = -174.0           # Densidad de ruido térmico a 290 K (dBm/Hz)
+ANCHO_BANDA_HZ = 100e6       # Canal de 100 MHz en la banda n78 (3.5 GHz)
+FIGURA_RUIDO_DB = 9.0        # Figura de ruido del receptor (UE)
+
+# Tamaño de bloque (en elementos) para recorrer la malla por franjas de filas.
+# ~256k elementos float64 = 2 MB por buffer, cabe en la caché L2/L3.
+ELEMENTOS_POR_BLOQUE = 1 << 18
+
+
+@lru_cache(maxsize=None)
+def fspl_d0(f_mhz=3500, d0=1.0):
+    """Pérdida de espacio libre a la distancia de referencia d0 (Ecuacion de Friis)."""
+    f_hz = f_mhz * 1e6
+    return 20 * np.log10(4 * np.pi * d0 * f_hz / c)
+
+
+def ruido_termico_dbm(ancho_banda_hz=ANCHO_BANDA_HZ, figura_ruido_db=FIGURA_RUIDO_DB):
+    """Potencia de ruido térmico en el ancho de banda del canal: kTB + NF."""
+    return KT_DBM_HZ + 10 * np.log10(ancho_banda_hz) + figura_ruido_db
+
+
+@lru_cache(maxsize=32)
+def eje_coordenadas(n, dtype=np.float64):
+    """np.arange(n) de solo lectura, compartido entre sedes del mismo tamaño."""
+    eje = np.arange(n, dtype=dtype)
+    eje.flags.writeable = False
+    return eje
+
+
+# === TABLA DE PÉRDIDAS POR DISTANCIA AL CUADRADO ===
+# Con transmisores en píxeles enteros, d² es siempre entero, así que la
+# pérdida CI se puede tabular una vez por (N, f, d0, escala) e indexar.
+LUT_MAX_ENTRADAS = 1 << 24      # 16M entradas = 128 MB en float64
+_luts = {}
+
+
+def lut_perdidas(N, f_mhz=3500, d0=1.0, m_por_px=1.0, d2_max=0):
+    """PL[d²] en dB (float64) para d² = 0..d2_max, con la misma fórmula de los scripts.
+
+    Se guarda en caché y se reutiliza (o se amplía) entre sedes con los
+    mismos parámetros del modelo. Devuelve un array de solo lectura.
+    """
+    clave = (float(N), float(f_mhz), float(d0), float(m_por_px))
+    lut = _luts.get(clave)
+    if lut is None or len(lut) <= d2_max:
+        n = max(d2_max + 1, 2 * len(lut) if lut is not None else 0)
+        n = min(n, max(LUT_MAX_ENTRADAS, d2_max + 1))
+        d = np.sqrt(np.arange(n, dtype=np.float64))
+        if m_por_px != 1:
+            d *= m_por_px
+        d[d < d0] = d0
+        lut = fspl_d0(f_mhz, d0) + 10 * N * np.log10(d / d0)
+        lut.flags.writeable = False
+        _luts[clave] = lut
+    return lut
+
+
+_luts_lineales = {}
+
+
+def lut_ganancia_lineal(N, f_mhz=3500, d0=1.0, m_por_px=1.0, d2_max=0):
+    """10**(-PL[d²] / 10) en float32: ganancia lineal para sumar potencias en mW."""
+    clave = (float(N), float(f_mhz), float(d0), float(m_por_px))
+    lut = _luts_lineales.get(clave)
+    if lut is None or len(lut) <= d2_max:
+        perdidas = lut_perdidas(N, f_mhz, d0, m_por_px, d2_max)
+        lut = (10 ** (-perdidas / 10)).astype(np.float32)
+        lut.flags.writeable = False
+        _luts_lineales[clave] = lut
+    return lut
+
+
+# === KERNEL DE GANANCIA TRASLADABLE ===
+# El modelo CI solo depende de la distancia, así que un único kernel
+# -PL(dx, dy) de (2H - 1) x (2W - 1) centrado en (H - 1, W - 1) sirve para
+# cualquier transmisor: basta recortarlo en su posición y "estamparlo".
+# Ocupa ~4 veces el plano, así que en planos grandes se usa la tabla.
+KERNEL_MAX_ELEMENTOS = 1 << 25  # 32M elementos = 256 MB en float64
+_kernels = {}
+
+
+def kernel_cabe(ancho, alto):
+    """True si el kernel para un plano de alto x ancho no supera KERNEL_MAX_ELEMENTOS."""
+    return (2 * alto - 1) * (2 * ancho - 1) <= KERNEL_MAX_ELEMENTOS
+
+
+def kernel_ganancia(N, f_mhz=3500, d0=1.0, m_por_px=1.0, ancho=1, alto=1):
+    """(kernel, fila_centro, col_centro) con -PL en dB para planos de hasta alto x ancho.
+
+    Un kernel más grande sirve para planos más chicos, así que se guarda uno
+    por (N, f, d0, escala) y se reutiliza entre sedes (todas las outdoor
+    comparten N = 2.5 y todas las indoor N = 3.2).
+    """
+    clave = (float(N), float(f_mhz), float(d0), float(m_por_px))
+    guardado = _kernels.get(clave)
+    if guardado is None or guardado[1] < alto - 1 or guardado[2] < ancho - 1:
+        if guardado is not None:
+            alto = max(alto, guardado[1] + 1)
+            ancho = max(ancho, guardado[2] + 1)
+        tabla = lut_perdidas(N, f_mhz, d0, m_por_px, (alto - 1) ** 2 + (ancho - 1) ** 2)
+        dy2 = np.arange(1 - alto, alto, dtype=np.int64) ** 2
+        dx2 = np.arange(1 - ancho, ancho, dtype=np.int64) ** 2
+        kernel = np.negative(tabla[dy2[:, None] + dx2[None, :]])
+        kernel.flags.writeable = False
+        guardado = _kernels[clave] = (kernel, alto - 1, ancho - 1)
+    return guardado
+
+
+_kernels_lineales = {}
+
+
+def kernel_ganancia_lineal(N, f_mhz=3500, d0=1.0, m_por_px=1.0, ancho=1, alto=1):
+    """kernel_ganancia() como ganancia lineal 10**(-PL / 10) en float32."""
+    clave = (float(N), float(f_mhz), float(d0), float(m_por_px))
+    guardado = _kernels_lineales.get(clave)
+    if guardado is None or guardado[1] < alto - 1 or guardado[2] < ancho - 1:
+        kernel, fc, cc = kernel_ganancia(N, f_mhz, d0, m_por_px, ancho, alto)
+        lineal = (10 ** (kernel / 10)).astype(np.float32)
+        lineal.flags.writeable = False
+        guardado = _kernels_lineales[clave] = (lineal, fc, cc)
+    return guardado
+
+
+def mapa_cobertura_referencia(transmisores, ancho, alto, N, Pt_dBm, f_mhz=3500, d0=1.0,
+                              m_por_px=1.0, piso_dbm=PISO_DBM, dtype=np.float64,
+                              radios_px=None):
+    """Fórmula CI directa, transmisor por transmisor (para verificar los otros métodos).
+
+    radios_px: alcance de cada transmisor; fuera de él no aporta señal.
+    """
+    FSPL_d0 = fspl_d0(f_mhz, d0)
+    heatmap = np.full((alto, ancho), piso_dbm, dtype=dtype)
+    pos = np.asarray(transmisores, dtype=np.float64).reshape(-1, 2)
+    pt = np.broadcast_to(np.asarray(Pt_dBm, dtype=np.float64), (len(pos),))
+    radios = np.broadcast_to(np.inf if radios_px is None else radios_px, (len(pos),))
+    xx = np.arange(ancho)[None, :]
+    yy = np.arange(alto)[:, None]
+    for (cx, cy), Pt, r in zip(pos, pt, radios):
+        d_px = np.sqrt((xx - cx)**2 + (yy - cy)**2)
+        d = d_px * m_por_px if m_por_px != 1 else d_px.copy()
+        d[d < d0] = d0
+        PL = FSPL_d0 + 10 * N * np.log10(d / d0)
+        Pr = Pt - PL
+        Pr[d_px > r] = -np.inf
+        heatmap = np.maximum(heatmap, Pr.astype(dtype))
+    return heatmap
+
+
+def mapa_cobertura(transmisores, ancho, alto, N, Pt_dBm, f_mhz=3500, d0=1.0,
+                   m_por_px=1.0, piso_dbm=PISO_DBM, dtype=np.float64,
+                   filas_por_bloque=None, salida=None, filas=None,
+                   metodo="lut", verificar=False, radio_px=None, sensibilidad_dbm=None,
+                   agregacion="mejor", ruido_dbm=None, tolerancia_db=TOLERANCIA_DB,
+                   informe=None, muros=None, perdida_muro_db=PERDIDA_MURO_DB):
+    """Heatmap de potencia recibida (mejor servidor) con el modelo Close-In.
+
+    Equivale al bucle de los scripts originales:
+
+        d = np.sqrt((xx - cx)**2 + (yy - cy)**2); d[d < d0] = d0
+        PL = FSPL_d0 + 10 * N * np.log10(d / d0)
+        heatmap = np.maximum(heatmap, Pt - PL)
+
+    pero sin meshgrid ni temporales de imagen completa por transmisor.
+    Como PL crece con la distancia, el mejor servidor es el que minimiza
+    d² * 10**(-Pt / (5 N)), así que por cada franja de filas se acumula el
+    mínimo de la distancia al cuadrado (escalada) y se convierte a dBm una
+    sola vez al final. Según metodo:
+
+    - "lut" (por defecto): d² se acumula en enteros (por grupo de potencia)
+      y la pérdida se lee de lut_perdidas().
+    - "kernel": sin cálculo de distancias; cada transmisor aporta un
+      recorte de kernel_ganancia() y se toma el máximo.
+    - "log": un único log10 por píxel, 10 N log10(d / d0) = 5 N log10(d² / d0²).
+    - "adaptativo": de grueso a fino (ver adaptativo.py). El modelo se
+      evalúa en las esquinas de bloques que solo se parten donde la cota
+      del error de interpolación supera tolerancia_db; la mayor cota
+      usada, la fracción de píxeles evaluados, etc. se acumulan en el dict
+      informe. Admite "mejor" y "suma", sin modo por ventanas. Si
+      adaptativo.conviene_adaptativo indica que el cálculo exacto es más
+      barato (planos chicos o, con "mejor", pocos nodos) se usa "lut" y el
+      informe cuenta todos los píxeles como evaluados.
+
+    Con muros (máscara (alto, ancho) del plano, ver muros.mascara_muros,
+    o un muros.BarridosMuros que reutiliza los barridos entre llamadas)
+    se resta además perdida_muro_db por cada muro entre el transmisor y el
+    píxel (barrido polar por transmisor, ver muros.py), sea cual sea el
+    metodo salvo "adaptativo". Admite "mejor" y "suma" y el modo por
+    ventanas.
+
+    "lut" y "kernel" requieren transmisores en píxeles enteros dentro del
+    plano (si no, se usa "log") y dan un resultado idéntico bit a bit a la
+    fórmula CI original. En planos donde el kernel no cabe en
+    KERNEL_MAX_ELEMENTOS, "kernel" usa la tabla.
+
+    transmisores: secuencia de (x, y) en píxeles.
+    Pt_dBm: potencia común o una por transmisor.
+    m_por_px: escala del plano, para distancias en metros.
+    salida: array preasignado donde escribir el resultado.
+    filas: (r0, r1) para calcular solo esa franja del plano; la salida
+    tiene entonces forma (r1 - r0, ancho).
+    verificar: compara el resultado con mapa_cobertura_referencia() y
+    lanza AssertionError si no coincide bit a bit (solo con la tabla).
+    radio_px, sensibilidad_dbm: modo por ventanas. Cada transmisor solo se
+    evalúa dentro de su alcance útil (radio_px, o la distancia a la que la
+    señal cae a sensibilidad_dbm, el menor de los dos) y solo se actualiza
+    esa ventana de la salida; el resto queda en piso_dbm. El costo pasa de
+    O(T·W·H) a O(T·r²). radio_px puede ser uno por transmisor.
+    agregacion: "mejor" (mejor servidor, lo anterior), "suma" (potencia
+    total de todos los transmisores) o "sinr" (mejor servidor sobre la suma
+    de los demás más ruido_dbm, en dB; por defecto ruido_termico_dbm(), como
+    en mapas_servidor). "suma" y "sinr" se acumulan en mW en float32 (ver
+    _bloques_lineal) con un único log10 al final; los píxeles sin señal
+    quedan en piso_dbm.
+    """
+    dtype = np.dtype(dtype)
+    f0, f1 = filas if filas is not None else (0, alto)
+    if salida is None:
+        salida = np.empty((f1 - f0, ancho), dtype=dtype)
+    else:
+        dtype = salida.dtype
+    salida.fill(piso_dbm)
+
+    pos, pt, radios, d2_max, enteros = _transmisores(
+        transmisores, ancho, alto, N, Pt_dBm, f_mhz, d0, m_por_px, radio_px, sensibilidad_dbm)
+    if len(pos) == 0:
+        return salida
+    if filas_por_bloque is None:
+        filas_por_bloque = max(1, ELEMENTOS_POR_BLOQUE // max(ancho, 1))
+
+    if metodo == "adaptativo" and muros is None:
+        if radios is not None or agregacion not in ("mejor", "suma"):
+            raise ValueError("el método adaptativo admite solo agregación mejor o suma, "
+                             "sin modo por ventanas")
+        if conviene_adaptativo(len(pos), ancho, alto, N, agregacion, tolerancia_db, m_por_px,
+                               d0):
+            mapa_adaptativo(pos, pt, ancho, f0, f1, salida, N, fspl_d0(f_mhz, d0), d0,
+                            m_por_px, piso_dbm, agregacion, tolerancia_db, informe=informe)
+            return salida
+        # El cálculo exacto es más rápido: se informa como todo evaluado
+        if informe is not None:
+            pixeles = (f1 - f0) * ancho
+            informe["cota_db"] = informe.get("cota_db", 0.0)
+            informe["evaluaciones"] = informe.get("evaluaciones", 0) + pixeles
+            informe["pixeles"] = informe.get("pixeles", 0) + pixeles
+            informe["fraccion_exacta"] = informe["evaluaciones"] / informe["pixeles"]
+        metodo = "lut"
+
+    if muros is not None:
+        if metodo == "adaptativo" or agregacion not in ("mejor", "suma"):
+            raise ValueError("la pérdida por muros admite solo agregación mejor o suma, "
+                             "sin el método adaptativo")
+        mapa_muros(pos, pt, radios, ancho, f0, f1, salida, N, fspl_d0(f_mhz, d0), d0, m_por_px,
+                   piso_dbm, muros, perdida_muro_db, agregacion)
+    elif agregacion != "mejor":
+        if agregacion not in ("suma", "sinr"):
+            raise ValueError(f"agregación desconocida: {agregacion!r}")
+        if agregacion == "sinr" and ruido_dbm is None:
+            ruido_dbm = ruido_termico_dbm()
+        _bloques_lineal(pos, pt, radios, ancho, alto, f0, f1, filas_por_bloque, salida,
+                        agregacion, ruido_dbm, piso_dbm, N, f_mhz, d0, m_por_px,
+                        *_ganancias_lineales(enteros, radios, N, f_mhz, d0, m_por_px,
+                                             ancho, alto, d2_max))
+    elif radios is not None:
+        tabla = lut_perdidas(N, f_mhz, d0, m_por_px, d2_max) if enteros else None
+        _ventanas(pos, pt, radios, ancho, f0, f1, salida, N, f_mhz, d0, m_por_px, tabla)
+        if verificar and tabla is not None:
+            referencia = mapa_cobertura_referencia(
+                pos, ancho, alto, N, pt, f_mhz=f_mhz, d0=d0, m_por_px=m_por_px,
+                piso_dbm=piso_dbm, dtype=dtype, radios_px=radios)[f0:f1]
+            assert np.array_equal(salida, referencia), \
+                "el modo por ventanas no coincide con la fórmula CI"
+    elif enteros and metodo in ("lut", "kernel"):
+        if metodo == "kernel" and kernel_cabe(ancho, alto):
+            _estampar_kernel(pos.astype(np.int64), pt, ancho, f0, f1, salida,
+                             kernel_ganancia(N, f_mhz, d0, m_por_px, ancho, alto))
+        else:
+            _bloques_lut(pos, pt, ancho, alto, f0, f1, filas_por_bloque, salida,
+                         lut_perdidas(N, f_mhz, d0, m_por_px, d2_max))
+        if verificar:
+            referencia = mapa_cobertura_referencia(
+                pos, ancho, alto, N, pt, f_mhz=f_mhz, d0=d0, m_por_px=m_por_px,
+                piso_dbm=piso_dbm, dtype=dtype)[f0:f1]
+            assert np.array_equal(salida, referencia), \
+                "la tabla de pérdidas no coincide con la fórmula CI"
+    else:
+        _bloques_log(pos, pt, ancho, alto, f0, f1, filas_por_bloque, salida,
+                     N, f_mhz, d0, m_por_px, piso_dbm)
+    return salida
+
+
+def _transmisores(transmisores, ancho, alto, N, Pt_dBm, f_mhz, d0, m_por_px,
+                  radio_px=None, sensibilidad_dbm=None):
+    """(pos, pt, radios, d2_max, enteros) comunes a todos los métodos.
+
+    radios es None sin modo por ventanas; enteros indica si se pueden usar
+    la tabla y el kernel (posiciones enteras dentro del plano).
+    """
+    pos = np.asarray(transmisores, dtype=np.float64).reshape(-1, 2)
+    pt = np.broadcast_to(np.asarray(Pt_dBm, dtype=np.float64), (len(pos),))
+    if len(pos) == 0:
+        return pos, pt, None, 0, False
+
+    # d² máximo posible dentro del plano (esquina opuesta)
+    dx_max = np.maximum(pos[:, 0], ancho - 1 - pos[:, 0]).max()
+    dy_max = np.maximum(pos[:, 1], alto - 1 - pos[:, 1]).max()
+    d2_max = int(dx_max ** 2 + dy_max ** 2)
+    enteros = (np.array_equal(pos, np.round(pos)) and d2_max < LUT_MAX_ENTRADAS
+               and (pos >= 0).all() and (pos[:, 0] < ancho).all() and (pos[:, 1] < alto).all())
+
+    radios = None
+    if radio_px is not None or sensibilidad_dbm is not None:
+        radios = np.array(np.broadcast_to(np.inf if radio_px is None else radio_px,
+                                          (len(pos),)), dtype=np.float64)
+        if sensibilidad_dbm is not None:
+            radios = np.minimum(radios, alcance_px(pt, sensibilidad_dbm, N, f_mhz, d0, m_por_px))
+    return pos, pt, radios, d2_max, enteros
+
+
+def alcance_px(Pt_dBm, umbral_dbm, N, f_mhz=3500, d0=1.0, m_por_px=1.0):
+    """Distancia (px) a la que la potencia recibida cae a umbral_dbm."""
+    # Pt - FSPL_d0 - 10 N log10(d / d0) = S  ->  d en metros
+    d = d0 * 10 ** ((np.asarray(Pt_dBm) - umbral_dbm - fspl_d0(f_mhz, d0)) / (10 * N))
+    return d / m_por_px
+
+
+def _ganancias_lineales(enteros, radios, N, f_mhz, d0, m_por_px, ancho, alto, d2_max):
+    """(tabla, kernel) para _bloques_lineal: kernel sin ventanas, tabla con ellas."""
+    if not enteros:
+        return None, None
+    if radios is None and kernel_cabe(ancho, alto):
+        return None, kernel_ganancia_lineal(N, f_mhz, d0, m_por_px, ancho, alto)
+    return lut_ganancia_lineal(N, f_mhz, d0, m_por_px, d2_max), None
+
+
+# === MAPAS DE SERVIDOR: ÍNDICE, RSRP Y SINR ===
+SIN_SERVIDOR = np.iinfo(np.uint16).max     # id_servidor de los píxeles sin señal
+
+
+def mapas_servidor(transmisores, ancho, alto, N, Pt_dBm, f_mhz=3500, d0=1.0,
+                   m_por_px=1.0, piso_dbm=PISO_DBM, ruido_dbm=None, filas=None,
+                   filas_por_bloque=None, radio_px=None, sensibilidad_dbm=None,
+                   dtype=np.float32, salidas=None):
+    """Índice del mejor servidor, su potencia y la SINR en una sola pasada.
+
+    Devuelve un diccionario con:
+    - "id_servidor": índice (uint16) del transmisor con mayor potencia
+      recibida en cada píxel, SIN_SERVIDOR donde no llega ninguno.
+    - "rsrp_dbm": potencia recibida del mejor servidor en dBm.
+    - "sinr_db": mejor servidor / (suma del resto + ruido), en dB.
+
+    ruido_dbm: potencia de ruido en el ancho de banda del canal (por
+    defecto ruido_termico_dbm(), 100 MHz a 3.5 GHz). Se recorre el plano
+    por franjas acumulando en mW como mapa_cobertura(agregacion="sinr"),
+    sin apilar un mapa por transmisor: la memoria no crece con el número
+    de nodos. radio_px y sensibilidad_dbm funcionan como en mapa_cobertura.
+    filas: (r0, r1) para calcular solo esa franja. salidas: diccionario con
+    arrays preasignados (o np.memmap) para alguno de los tres mapas.
+    """
+    f0, f1 = filas if filas is not None else (0, alto)
+    pos, pt, radios, d2_max, enteros = _transmisores(
+        transmisores, ancho, alto, N, Pt_dBm, f_mhz, d0, m_por_px, radio_px, sensibilidad_dbm)
+    if len(pos) >= SIN_SERVIDOR:
+        raise ValueError(f"como máximo {SIN_SERVIDOR - 1} transmisores (índices uint16)")
+    if ruido_dbm is None:
+        ruido_dbm = ruido_termico_dbm()
+    if filas_por_bloque is None:
+        filas_por_bloque = max(1, ELEMENTOS_POR_BLOQUE // max(ancho, 1))
+
+    salidas = salidas or {}
+    forma = (f1 - f0, ancho)
+    mapas = {}
+    for clave, tipo, inicial in (("id_servidor", np.uint16, SIN_SERVIDOR),
+                                 ("rsrp_dbm", dtype, piso_dbm), ("sinr_db", dtype, piso_dbm)):
+        mapas[clave] = salidas[clave] if clave in salidas else np.empty(forma, dtype=tipo)
+        mapas[clave].fill(inicial)
+    if len(pos):
+        _bloques_lineal(pos, pt, radios, ancho, alto, f0, f1, filas_por_bloque,
+                        mapas["sinr_db"], "sinr", ruido_dbm, piso_dbm, N, f_mhz, d0, m_por_px,
+                        *_ganancias_lineales(enteros, radios, N, f_mhz, d0, m_por_px,
+                                             ancho, alto, d2_max),
+                        ids=mapas["id_servidor"], rsrp=mapas["rsrp_dbm"])
+    return mapas
+
+
+def ventana_transmisor(cx, cy, radio, ancho, filas):
+    """(r0, r1, c0, c1) del cuadrado circunscrito al alcance, recortado al plano."""
+    f0, f1 = filas
+    c0, c1 = max(0, int(np.ceil(cx - radio))), min(ancho, int(np.floor(cx + radio)) + 1)
+    r0, r1 = max(f0, int(np.ceil(cy - radio))), min(f1, int(np.floor(cy + radio)) + 1)
+    return r0, r1, c0, c1
+
+
+def senal_ventana(cx, cy, Pt, ventana, N, f_mhz=3500, d0=1.0, m_por_px=1.0,
+                  radio=np.inf, tabla=None):
+    """Potencia recibida (dBm) de un transmisor en la ventana (r0, r1, c0, c1).
+
+    Fuera del radio devuelve -inf. Con tabla (lut_perdidas) la pérdida se lee
+    por d² entero, en otro caso se aplica la fórmula CI.
+    """
+    r0, r1, c0, c1 = ventana
+    d2 = (np.arange(r0, r1) - cy)[:, None] ** 2 + (np.arange(c0, c1) - cx)[None, :] ** 2
+    if tabla is not None:
+        PL = tabla[d2.astype(np.intp)]
+    else:
+        d = np.sqrt(d2) * m_por_px
+        d[d < d0] = d0
+        PL = fspl_d0(f_mhz, d0) + 10 * N * np.log10(d / d0)
+    Pr = np.subtract(Pt, PL, out=PL)
+    if np.isfinite(radio):
+        Pr[d2 > radio * radio] = -np.inf
+    return Pr
+
+
+def _ventanas(pos, pt, radios, ancho, f0, f1, salida, N, f_mhz, d0, m_por_px, tabla):
+    """Actualiza solo la ventana (cuadrado circunscrito al alcance) de cada transmisor."""
+    for (cx, cy), Pt, r in zip(pos, pt, radios):
+        r0, r1, c0, c1 = ventana = ventana_transmisor(cx, cy, r, ancho, (f0, f1))
+        if c0 >= c1 or r0 >= r1:
+            continue
+        Pr = senal_ventana(cx, cy, Pt, ventana, N, f_mhz, d0, m_por_px, r, tabla)
+        destino = salida[r0 - f0:r1 - f0, c0:c1]
+        np.maximum(destino, Pr, out=destino)
+
+
+def _estampar_kernel(pos, pt, ancho, f0, f1, salida, kernel):
+    """Máximo de los recortes del kernel de ganancia, por grupo de potencia."""
+    kernel, fc, cc = kernel
+    acc = np.empty(salida.shape, dtype=kernel.dtype)
+    for Pt in np.unique(pt):
+        acc.fill(-np.inf)
+        for cx, cy in pos[pt == Pt]:
+            r0, c0 = fc - cy + f0, cc - cx
+            np.maximum(acc, kernel[r0:r0 + f1 - f0, c0:c0 + ancho], out=acc)
+        # Pr = Pt + (-PL)
+        acc += Pt
+        np.maximum(salida, acc, out=salida)
+
+
+def _bloques_lut(pos, pt, ancho, alto, f0, f1, filas_por_bloque, salida, tabla):
+    """Mínimo de d² entero por grupo de potencia y lectura en la tabla."""
+    entero = np.int32 if len(tabla) < 2**31 else np.int64
+    cols = eje_coordenadas(ancho, entero)
+    grupos = [(p, pos[pt == p].astype(entero)) for p in np.unique(pt)]
+    dx2 = {p: [(cols - cx) ** 2 for cx, _ in g] for p, g in grupos}
+    filas_buf = min(filas_por_bloque, f1 - f0)
+    buf = np.empty((filas_buf, ancho), dtype=entero)
+    acc = np.empty_like(buf)
+    pr = np.empty((filas_buf, ancho), dtype=tabla.dtype)
+
+    for r0 in range(f0, f1, filas_por_bloque):
+        r1 = min(r0 + filas_por_bloque, f1)
+        b, a, p_r = buf[:r1 - r0], acc[:r1 - r0], pr[:r1 - r0]
+        ys = eje_coordenadas(alto, entero)[r0:r1, None]
+        out = salida[r0 - f0:r1 - f0]
+        for Pt, g in grupos:
+            a.fill(np.iinfo(entero).max)
+            for i, (_, cy) in enumerate(g):
+                np.add(dx2[Pt][i], (ys - cy) ** 2, out=b)
+                np.minimum(a, b, out=a)
+            # Pr = Pt - PL[d²_min], en float64 como la fórmula original
+            np.take(tabla, a, out=p_r)
+            np.subtract(Pt, p_r, out=p_r)
+            np.maximum(out, p_r, out=out)
+
+
+def _bloques_log(pos, pt, ancho, alto, f0, f1, filas_por_bloque, salida,
+                 N, f_mhz, d0, m_por_px, piso_dbm):
+    """Mínimo de k·d² en coma flotante y un único log10 por píxel."""
+    dtype = salida.dtype
+    # Factor por transmisor: min(k_i * d²) identifica al mejor servidor
+    pt_ref = pt.max()
+    k = 10 ** ((pt_ref - pt) / (5 * N)) * (m_por_px ** 2) / (d0 ** 2)
+    d2_min = (d0 / m_por_px) ** 2          # d < d0 se satura a d0
+    cte = pt_ref - fspl_d0(f_mhz, d0)
+
+    # Distancias al cuadrado por eje, precalculadas una sola vez
+    cols = eje_coordenadas(ancho, dtype)
+    dx2 = [(cols - cx) ** 2 for cx, _ in pos]
+
+    buf = np.empty((min(filas_por_bloque, f1 - f0), ancho), dtype=dtype)
+    acc = np.empty_like(buf)
+
+    for r0 in range(f0, f1, filas_por_bloque):
+        r1 = min(r0 + filas_por_bloque, f1)
+        b, a = buf[:r1 - r0], acc[:r1 - r0]
+        ys = eje_coordenadas(alto, dtype)[r0:r1, None]
+        a.fill(np.inf)
+        for i, (_, cy) in enumerate(pos):
+            np.add(dx2[i], (ys - cy) ** 2, out=b)
+            np.maximum(b, d2_min, out=b)
+            if k[i] != 1:
+                b *= k[i]
+            np.minimum(a, b, out=a)
+        # Pr = Pt_ref - FSPL_d0 - 5 N log10(min(k d²))
+        np.log10(a, out=a)
+        a *= -5 * N
+        a += cte
+        np.maximum(a, piso_dbm, out=salida[r0 - f0:r1 - f0])
+
+
+def _bloques_lineal(pos, pt, radios, ancho, alto, f0, f1, filas_por_bloque, salida,
+                    agregacion, ruido_dbm, piso_dbm, N, f_mhz, d0, m_por_px,
+                    tabla=None, kernel=None, ids=None, rsrp=None):
+    """Potencia total o SINR acumulando en mW (float32) y un único log10 por píxel.
+
+    La ganancia lineal de cada transmisor sale de un recorte de
+    kernel_ganancia_lineal() (transmisores enteros sin radio), de
+    lut_ganancia_lineal() indexada por d² (enteros con radio) o de la
+    fórmula CI (posiciones no enteras).
+
+    Para la SINR se lleva, por píxel, el mejor servidor y la suma del resto:
+    resto += min(p, mejor); mejor = max(p, mejor). Así la interferencia no
+    sale de restar dos números parecidos (total - mejor) en float32.
+    ids y rsrp (solo con "sinr") reciben además el índice del mejor
+    servidor y su potencia en dBm. La memoria usada es la de las salidas
+    más unos pocos buffers de una franja, sea cual sea el número de
+    transmisores.
+    """
+    pt_mw = 10 ** (pt / 10)
+    ganancia_d0 = 10 ** (-fspl_d0(f_mhz, d0) / 10)
+    escala2 = (m_por_px / d0) ** 2
+    ruido_mw = 0.0 if ruido_dbm is None else 10 ** (ruido_dbm / 10)
+    tipo_d2 = np.int64 if tabla is not None else np.float64
+    if radios is None:
+        radios = np.full(len(pos), np.inf)
+
+    filas_buf = min(filas_por_bloque, f1 - f0)
+    total = np.empty((filas_buf, ancho), dtype=np.float32)
+    mejor = np.empty_like(total) if agregacion == "sinr" else None
+    buf = np.empty_like(total)
+
+    for r0 in range(f0, f1, filas_por_bloque):
+        r1 = min(r0 + filas_por_bloque, f1)
+        acc = total[:r1 - r0]
+        acc.fill(0)
+        m = id_bloque = None
+        if mejor is not None:
+            m = mejor[:r1 - r0]
+            m.fill(0)
+        if ids is not None:
+            id_bloque = ids[r0 - f0:r1 - f0]
+            id_bloque.fill(np.iinfo(ids.dtype).max)
+        for i, ((cx, cy), Pt, r) in enumerate(zip(pos, pt_mw, radios)):
+            if np.isfinite(r):
+                v0, v1, c0, c1 = ventana_transmisor(cx, cy, r, ancho, (r0, r1))
+            else:
+                v0, v1, c0, c1 = r0, r1, 0, ancho
+            if v0 >= v1 or c0 >= c1:
+                continue
+            if kernel is not None:
+                k, fc, cc = kernel
+                kr, kc = fc - int(cy), cc - int(cx)
+                p = np.multiply(k[kr + v0:kr + v1, kc:kc + ancho], np.float32(Pt),
+                                out=buf[:v1 - v0])
+                _acumular(acc, m, id_bloque, i, p, v0 - r0, v1 - r0, c0, c1)
+                continue
+            ys = eje_coordenadas(alto, tipo_d2)[v0:v1, None]
+            xs = eje_coordenadas(ancho, tipo_d2)[c0:c1]
+            if tabla is not None:
+                cx, cy = int(cx), int(cy)
+            d2 = (ys - cy) ** 2 + (xs - cx) ** 2
+            fuera = d2 > r * r if np.isfinite(r) else None
+            if tabla is not None:
+                p = tabla[d2]
+            else:
+                # 10**(-PL/10) = 10**(-FSPL_d0/10) * (d/d0)**-N, d >= d0
+                d2 *= escala2
+                np.maximum(d2, 1.0, out=d2)
+                p = (ganancia_d0 * d2 ** (-N / 2)).astype(np.float32)
+            p *= np.float32(Pt)
+            if fuera is not None:
+                p[fuera] = 0
+            _acumular(acc, m, id_bloque, i, p, v0 - r0, v1 - r0, c0, c1)
+
+        out = salida[r0 - f0:r1 - f0]
+        sin_senal = (acc if mejor is None else m) <= 0
+        with np.errstate(divide="ignore"):
+            if mejor is None:
+                valor = np.maximum(10 * np.log10(acc), piso_dbm)
+            else:
+                valor = 10 * np.log10(m / (acc + np.float32(ruido_mw)))
+                if rsrp is not None:
+                    rsrp_bloque = rsrp[r0 - f0:r1 - f0]
+                    rsrp_bloque[...] = np.maximum(10 * np.log10(m), piso_dbm)
+        valor[sin_senal] = piso_dbm
+        out[...] = valor
+
+
+def _acumular(total, mejor, ids, i, p, v0, v1, c0, c1):
+    """Suma p (mW) en la ventana; con mejor, total acumula solo la interferencia.
+
+    Con ids se anota además el índice i donde el transmisor pasa a ser el
+    mejor servidor.
+    """
+    a = total[v0:v1, c0:c1]
+    if mejor is None:
+        a += p
+        return
+    m = mejor[v0:v1, c0:c1]
+    a += np.minimum(p, m)
+    if ids is not None:
+        ids[v0:v1, c0:c1][p > m] = i
+    np.maximum(m, p, out=m)
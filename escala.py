@@ -0,0 +1,88 @@
+import numpy as np
+
+# === ESCALA FÍSICA DEL PLANO ===
+# El modelo CI trabaja en metros (d0 = 1 m): las distancias en píxeles se
+# multiplican por m_por_px. La escala se puede calibrar por sede con una
+# cota conocida del plano y la simulación puede hacerse en celdas más
+# gruesas que el píxel (p. ej. 0.25 m), ampliando después los mapas al
+# tamaño de la imagen para graficarlos.
+
+
+def m_por_px_calibrado(calibracion):
+    """Metros por píxel a partir de una cota conocida.
+
+    calibracion: {"puntos": [[x0, y0], [x1, y1]], "metros": L}, dos puntos
+    del plano (en píxeles) separados L metros en la realidad.
+    """
+    (x0, y0), (x1, y1) = calibracion["puntos"]
+    distancia_px = float(np.hypot(x1 - x0, y1 - y0))
+    if distancia_px <= 0 or calibracion["metros"] <= 0:
+        raise ValueError(f"calibración inválida: {calibracion}")
+    return calibracion["metros"] / distancia_px
+
+
+def factor_resolucion(m_por_px, resolucion_m):
+    """Píxeles de la imagen por celda de simulación (1.0 si no hay que engrosar)."""
+    if resolucion_m is None:
+        return 1.0
+    return max(1.0, resolucion_m / m_por_px)
+
+
+def forma_gruesa(ancho, alto, factor):
+    """(ancho, alto) de la grilla de celdas que cubre el plano."""
+    return int(np.ceil(ancho / factor)), int(np.ceil(alto / factor))
+
+
+def a_celdas(posiciones, factor):
+    """Posiciones en píxeles -> coordenadas de celda (el centro de la celda i
+    cae en el píxel (i + 0.5) · factor - 0.5)."""
+    return [((x + 0.5) / factor - 0.5, (y + 0.5) / factor - 0.5) for x, y in posiciones]
+
+
+def _muestreo(n, n_grueso, factor):
+    """Índices vecinos y peso de interpolación en la grilla gruesa para n píxeles."""
+    u = (np.arange(n, dtype=np.float64) + 0.5) / factor - 0.5
+    np.clip(u, 0, n_grueso - 1, out=u)
+    i0 = np.floor(u).astype(np.intp)
+    i1 = np.minimum(i0 + 1, n_grueso - 1)
+    return i0, i1, u - i0
+
+
+def reducir_mascara(mascara, factor):
+    """Máscara del plano -> máscara de celdas: una celda es True si lo es
+    alguno de los píxeles que cubre (p. ej. un muro fino no desaparece)."""
+    alto, ancho = mascara.shape
+    ancho_g, alto_g = forma_gruesa(ancho, alto, factor)
+    filas = np.floor(np.arange(alto_g) * factor).astype(np.intp)
+    columnas = np.floor(np.arange(ancho_g) * factor).astype(np.intp)
+    celdas = np.maximum.reduceat(np.asarray(mascara, dtype=np.uint8), filas, axis=0)
+    return np.maximum.reduceat(celdas, columnas, axis=1).astype(bool)
+
+
+def ampliar(grueso, salida, factor, interpolacion="bilineal", filas_por_bloque=512):
+    """Amplía un mapa de celdas al tamaño de salida (alto, ancho), por franjas de filas.
+
+    "bilineal" interpola en dB (para los mapas de nivel y SINR), en la
+    precisión de salida (float32 o float64);
+    "vecino" copia la celda más cercana (para id_servidor).
+    """
+    alto, ancho = salida.shape
+    alto_g, ancho_g = grueso.shape
+    f0, f1, tf = _muestreo(alto, alto_g, factor)
+    c0, c1, tc = _muestreo(ancho, ancho_g, factor)
+    tipo = np.result_type(salida.dtype, np.float32)
+    tf, tc = tf.astype(tipo), tc.astype(tipo)
+    if interpolacion == "vecino":
+        filas = np.where(tf < 0.5, f0, f1)
+        columnas = np.where(tc < 0.5, c0, c1)
+    for r0 in range(0, alto, filas_por_bloque):
+        r1 = min(alto, r0 + filas_por_bloque)
+        if interpolacion == "vecino":
+            salida[r0:r1] = grueso[filas[r0:r1]][:, columnas]
+            continue
+        a = np.asarray(grueso[f0[r0:r1]], dtype=tipo)
+        b = np.asarray(grueso[f1[r0:r1]], dtype=tipo)
+        franja = a + (b - a) * tf[r0:r1, None]
+        izquierda = franja[:, c0]
+        salida[r0:r1] = izquierda + (franja[:, c1] - izquierda) * tc
+    return salida
@@ -0,0 +1,225 @@
+import os
+
+import numpy as np
+from matplotlib import colormaps, rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+# === RENDERIZADO SIN PYPLOT ===
+# Las figuras se crean como objetos (Figure + FigureCanvasAgg), sin pasar
+# por la máquina de estados de pyplot: no abren ventanas, no quedan
+# registradas (no hay que cerrarlas) y funcionan en procesos del pool.
+DPI_SALIDA = 300
+
+# Formatos que salen del mismo raster Agg, dibujado una sola vez
+FORMATOS_RASTER = (".png", ".npy")
+
+# Transparencia del mapa de calor sobre el plano, por estilo de sede
+ALFA_MAPA = {"outdoor": 0.5, "indoor": 0.65}
+
+# Estilo de la figura por estilo de sede, el de la mayoría de los scripts
+# originales. sede["grafico"] cambia cualquier clave (p. ej. los tamaños
+# de marcador de COParena). En las etiquetas, {Pt_dBm} es la potencia de
+# la capa y {n} el número de nodos; marcas_barra: número de marcas
+# equiespaciadas entre el mínimo y el máximo del mapa (None: automáticas).
+GRAFICO_POR_ESTILO = {
+    "outdoor": {"ejes": ("Pixels (X)", "Pixels (Y)"), "fuente_ejes": None,
+                "fuente_marcas": None, "etiqueta_small_cells": "Small Cell ({Pt_dBm} dBm)",
+                "barra": {}, "marcas_barra": None},
+    "indoor": {"ejes": ("X (px)", "Y (px)"), "fuente_ejes": None, "fuente_marcas": None,
+               "tamano_small_cells": 80, "tamano_rrus": 35,
+               "etiqueta_small_cells": "Small Cells ({Pt_dBm} dBm)",
+               "etiqueta_rrus": "RRUs ({Pt_dBm} dBm) - {n} nodos",
+               "barra": {"shrink": 0.8, "pad": 0.02}, "marcas_barra": None},
+}
+
+_luts = {}
+
+
+def etiqueta_mapa(resultado):
+    return "SINR [dB]" if resultado.get("agregacion") == "sinr" else "Nivel de señal [dBm]"
+
+
+def estilo_grafico(sede):
+    """Estilo de la figura de la sede: el de su estilo con sede["grafico"] encima."""
+    return {**GRAFICO_POR_ESTILO[sede["estilo"]], **(sede.get("grafico") or {})}
+
+
+def dibujar_sede(ax, sede, img, resultado):
+    """Dibuja plano, mapa de calor y nodos en ax con el estilo de los scripts originales.
+
+    El mapa se pasa en dBm con la paleta, como en los scripts, para que el
+    suavizado bilineal de las sedes indoor se haga sobre los datos y no
+    sobre los colores. Devuelve (imagen del mapa, argumentos de la barra
+    de color).
+    """
+    width, height = img.size
+    cmap_plano = "gray" if sede["escala_grises"] else None
+    heatmap = resultado["combined_heatmap_dbm"]
+    grafico = estilo_grafico(sede)
+
+    if sede["estilo"] == "outdoor":
+        ax.imshow(img, cmap=cmap_plano, extent=(0, width, height, 0))
+        capa = ax.imshow(heatmap, cmap="jet", alpha=ALFA_MAPA["outdoor"],
+                         extent=(0, width, height, 0))
+        etiqueta = grafico["etiqueta_small_cells"].format(
+            Pt_dBm=sede["small_cells"].get("Pt_dBm", 33), n=len(resultado["small_cells"]))
+        for (cx, cy) in resultado["small_cells"]:
+            ax.plot(cx, cy, 'wo', markersize=10, markeredgecolor='k', label=etiqueta)
+        handles, labels = ax.get_legend_handles_labels()
+        ax.legend(handles[:1], labels[:1])
+    else:
+        ax.imshow(img, extent=(0, width, 0, height), cmap=cmap_plano)
+        capa = ax.imshow(heatmap, cmap="jet", alpha=ALFA_MAPA["indoor"],
+                         extent=(0, width, 0, height), origin="lower", interpolation="bilinear")
+        for capa_nodos, borde, marcador in (("small_cells", "black", "o"), ("rrus", "red", "s")):
+            nodos = resultado[capa_nodos]
+            if nodos:
+                etiqueta = grafico[f"etiqueta_{capa_nodos}"].format(
+                    Pt_dBm=sede[capa_nodos].get("Pt_dBm", 33), n=len(nodos))
+                ax.scatter(*zip(*nodos), c='white', edgecolors=borde,
+                           s=grafico[f"tamano_{capa_nodos}"], marker=marcador, label=etiqueta)
+        ax.grid(True, linestyle='--', alpha=0.3)
+        ax.legend(loc='upper right')
+
+    ax.set_xlabel(grafico["ejes"][0], fontsize=grafico["fuente_ejes"])
+    ax.set_ylabel(grafico["ejes"][1], fontsize=grafico["fuente_ejes"])
+    if grafico["fuente_marcas"]:
+        ax.tick_params(labelsize=grafico["fuente_marcas"])
+    ax.set_title(sede["titulo"])
+    barra = dict(grafico["barra"])
+    if grafico["marcas_barra"]:
+        barra["ticks"] = np.linspace(np.min(heatmap), np.max(heatmap), grafico["marcas_barra"])
+    return capa, barra
+
+
+class Renderizador:
+    """Figura Agg reutilizable: una por figsize.
+
+    Solo se reutilizan la figura y su canvas; para cada sede se vacía la
+    figura y se crean de nuevo los ejes y la barra de color, de modo que la
+    imagen no depende de qué sedes se dibujaron antes en el proceso.
+    """
+
+    def __init__(self):
+        self._figuras = {}
+
+    def figura(self, sede, img, resultado):
+        figsize = tuple(sede.get("figsize", (10, 6)))
+        fig = self._figuras.get(figsize)
+        if fig is None:
+            fig = self._figuras[figsize] = Figure(figsize=figsize)
+            FigureCanvasAgg(fig)
+        fig.clf()
+        # tight_layout deja sus márgenes en subplotpars: se vuelve a los de rcParams
+        fig.subplots_adjust(**{k: rcParams[f"figure.subplot.{k}"]
+                               for k in ("left", "right", "bottom", "top", "wspace", "hspace")})
+        ax = fig.add_subplot()
+        mapeable, barra = dibujar_sede(ax, sede, img, resultado)
+        cbar = fig.colorbar(mapeable, ax=ax, **barra)
+        cbar.set_label(etiqueta_mapa(resultado))
+        fig.tight_layout()
+        return fig
+
+
+def exportar_figura(fig, rutas, dpi=DPI_SALIDA):
+    """Guarda la figura en cada ruta según su extensión.
+
+    .png y .npy (RGBA crudo) salen de un único dibujado Agg a dpi,
+    recortado como bbox_inches="tight"; el resto (.svg, .pdf, ...) con
+    savefig.
+    """
+    raster = [r for r in rutas if os.path.splitext(r)[1].lower() in FORMATOS_RASTER]
+    if raster and isinstance(fig.canvas, FigureCanvasAgg):
+        rgba = _raster_ajustado(fig, dpi)
+        for ruta in raster:
+            if ruta.lower().endswith(".npy"):
+                np.save(ruta, rgba)
+            else:
+                Image.fromarray(rgba).save(ruta, dpi=(dpi, dpi))
+    else:
+        raster = []
+    for ruta in rutas:
+        if ruta not in raster:
+            fig.savefig(ruta, dpi=dpi, bbox_inches="tight")
+
+
+def _raster_ajustado(fig, dpi):
+    """Buffer RGBA de la figura a dpi, recortado a su caja ajustada."""
+    dpi_original = fig.dpi
+    fig.set_dpi(dpi)
+    try:
+        fig.canvas.draw()
+        buffer = np.asarray(fig.canvas.buffer_rgba())
+        caja = fig.get_tightbbox(fig.canvas.get_renderer())
+    finally:
+        fig.set_dpi(dpi_original)
+    pad = rcParams["savefig.pad_inches"]
+    alto, ancho = buffer.shape[:2]
+    x0 = max(0, int(np.floor((caja.x0 - pad) * dpi)))
+    x1 = min(ancho, int(np.ceil((caja.x1 + pad) * dpi)))
+    # Las cajas de matplotlib miden y desde abajo; el buffer, desde arriba
+    y0 = max(0, alto - int(np.ceil((caja.y1 + pad) * dpi)))
+    y1 = min(alto, alto - int(np.floor((caja.y0 - pad) * dpi)))
+    return buffer[y0:y1, x0:x1].copy()
+
+
+_renderizador = None
+
+
+def renderizar_sede(sede, img, resultado, rutas, dpi=DPI_SALIDA):
+    """Dibuja la sede con la plantilla del proceso y la exporta a rutas."""
+    global _renderizador
+    if _renderizador is None:
+        _renderizador = Renderizador()
+    fig = _renderizador.figura(sede, img, resultado)
+    exportar_figura(fig, rutas, dpi)
+    return fig
+
+
+# === SUPERPOSICIÓN DIRECTA (SIN MATPLOTLIB) ===
+# Para tableros solo hace falta el mapa coloreado sobre el plano, píxel a
+# píxel: se indexa una tabla de 256 colores y se mezcla con el plano en
+# escala de grises usando enteros, sin figura, ejes ni remuestreo.
+def lut_paleta(cmap="jet", n=256):
+    """Tabla (n, 3) uint8 con los colores de la paleta (se calcula una vez)."""
+    if (cmap, n) not in _luts:
+        _luts[cmap, n] = colormaps[cmap].resampled(n)(np.arange(n), bytes=True)[:, :3]
+    return _luts[cmap, n]
+
+
+def indices_paleta(mapa, vmin=None, vmax=None, n=256):
+    """Índice uint8 de cada píxel en la tabla, con la misma cuantización que matplotlib."""
+    vmin = float(np.min(mapa)) if vmin is None else float(vmin)
+    vmax = float(np.max(mapa)) if vmax is None else float(vmax)
+    idx = np.asarray(mapa, dtype=np.float64) - vmin
+    if vmax > vmin:
+        idx /= vmax - vmin
+    idx *= n
+    np.clip(idx, 0, n - 1, out=idx)
+    return idx.astype(np.uint8)
+
+
+def superponer(plano_gris, mapa, alpha=0.65, vmin=None, vmax=None, cmap="jet"):
+    """Mezcla alpha del mapa coloreado sobre el plano gris -> RGB uint8 (alto, ancho, 3).
+
+    plano_gris: imagen PIL en modo "L" o array (alto, ancho) uint8 del
+    mismo tamaño que el mapa. La mezcla se hace en punto fijo (8 bits de
+    fracción) con dos tablas: fondo[gris] + color[índice].
+    """
+    gris = np.asarray(plano_gris, dtype=np.uint8)
+    if gris.shape != np.shape(mapa):
+        raise ValueError(f"el plano {gris.shape} y el mapa {np.shape(mapa)} no coinciden")
+    a = int(round(alpha * 256))
+    fondo = ((np.arange(256, dtype=np.uint16) * (256 - a)) + 128)[:, None]
+    color = lut_paleta(cmap).astype(np.uint16) * a
+    rgb = fondo[gris] + color[indices_paleta(mapa, vmin, vmax)]
+    rgb >>= 8
+    return rgb.astype(np.uint8)
+
+
+def exportar_superposicion(ruta, plano, mapa, alpha=0.65, vmin=None, vmax=None, cmap="jet"):
+    """Escribe con PIL la superposición del mapa sobre el plano (pasado a grises)."""
+    gris = plano.convert("L") if isinstance(plano, Image.Image) else plano
+    Image.fromarray(superponer(gris, mapa, alpha, vmin, vmax, cmap)).save(ruta)
@@ -0,0 +1,166 @@
+"""Cobertura incremental para probar ubicaciones de nodos (what-if).
+
+Guarda por píxel el mejor y el segundo mejor servidor y la potencia total
+en mW, de modo que agregar, mover o quitar un nodo solo recalcula su
+ventana en lugar de volver a simular la sede completa.
+
+Ejemplo (COP Arena):
+
+    from incremental import cobertura_incremental_sede
+    from sedes import cargar_sede
+
+    estado = cobertura_incremental_sede(cargar_sede("COParena"), 820, 640, radio_px=200)
+    rru = estado.agregar(450, 330)
+    estado.mover(rru, 470, 330)
+    estado.quitar(rru)
+    heatmap = estado.mapa_dbm()
+"""
+import numpy as np
+
+from cobertura import PISO_DBM, lut_perdidas, senal_ventana, ventana_transmisor
+from sedes import posiciones_capa
+
+
+class CoberturaIncremental:
+    """Estado de cobertura por píxel: mejor servidor, segundo servidor y potencia total.
+
+    Los identificadores de nodo son enteros crecientes; en los mapas de
+    servidor el valor -1 indica que ningún nodo llega al píxel.
+    radio_px limita el alcance de cada nodo (y con él el tamaño de la
+    ventana que se recalcula); sin radio la ventana es el plano completo.
+    """
+
+    def __init__(self, ancho, alto, N, f_mhz=3500, d0=1.0, m_por_px=1.0,
+                 piso_dbm=PISO_DBM, radio_px=None, dtype=np.float32):
+        self.ancho, self.alto = ancho, alto
+        self.N, self.f_mhz, self.d0, self.m_por_px = N, f_mhz, d0, m_por_px
+        self.piso_dbm = piso_dbm
+        self.radio = np.inf if radio_px is None else float(radio_px)
+        self.mejor = np.full((alto, ancho), -np.inf, dtype=dtype)
+        self.segundo = np.full((alto, ancho), -np.inf, dtype=dtype)
+        self.id_mejor = np.full((alto, ancho), -1, dtype=np.int32)
+        self.id_segundo = np.full((alto, ancho), -1, dtype=np.int32)
+        self.potencia_mw = np.zeros((alto, ancho), dtype=np.float64)
+        self.nodos = {}
+        self._siguiente_id = 0
+        self._tabla = lut_perdidas(N, f_mhz, d0, m_por_px, (alto - 1) ** 2 + (ancho - 1) ** 2)
+
+    # === SEÑAL DE UN NODO ===
+    def _ventana(self, x, y):
+        if not np.isfinite(self.radio):
+            return 0, self.alto, 0, self.ancho
+        return ventana_transmisor(x, y, self.radio, self.ancho, (0, self.alto))
+
+    def _senal(self, x, y, Pt, ventana):
+        # La tabla cubre d² hasta la diagonal del plano: solo nodos enteros dentro de él
+        enteros = (float(x).is_integer() and float(y).is_integer()
+                   and 0 <= x < self.ancho and 0 <= y < self.alto)
+        return senal_ventana(x, y, Pt, ventana, self.N, self.f_mhz, self.d0, self.m_por_px,
+                             self.radio, self._tabla if enteros else None)
+
+    def _aplicar(self, nodo, x, y, Pt, ventana):
+        """Inserta la señal del nodo en mejor/segundo dentro de la ventana."""
+        r0, r1, c0, c1 = ventana
+        if r0 >= r1 or c0 >= c1:
+            return
+        pr = self._senal(x, y, Pt, ventana)
+        pr_dtype = pr.astype(self.mejor.dtype, copy=False)
+        mejor, segundo = self.mejor[r0:r1, c0:c1], self.segundo[r0:r1, c0:c1]
+        id_mejor, id_segundo = self.id_mejor[r0:r1, c0:c1], self.id_segundo[r0:r1, c0:c1]
+
+        gana = pr_dtype > mejor
+        pasa_segundo = ~gana & (pr_dtype > segundo)
+        segundo[gana] = mejor[gana]
+        id_segundo[gana] = id_mejor[gana]
+        mejor[gana] = pr_dtype[gana]
+        id_mejor[gana] = nodo
+        segundo[pasa_segundo] = pr_dtype[pasa_segundo]
+        id_segundo[pasa_segundo] = nodo
+        return pr
+
+    @staticmethod
+    def _interseccion(a, b):
+        r0, r1 = max(a[0], b[0]), min(a[1], b[1])
+        c0, c1 = max(a[2], b[2]), min(a[3], b[3])
+        return r0, r1, c0, c1
+
+    # === OPERACIONES ===
+    def agregar(self, x, y, Pt_dBm=33):
+        """Agrega un nodo y devuelve su identificador."""
+        nodo = self._siguiente_id
+        self._siguiente_id += 1
+        self.nodos[nodo] = (x, y, Pt_dBm)
+        ventana = self._ventana(x, y)
+        pr = self._aplicar(nodo, x, y, Pt_dBm, ventana)
+        if pr is not None:
+            r0, r1, c0, c1 = ventana
+            self.potencia_mw[r0:r1, c0:c1] += 10 ** (pr / 10)
+        return nodo
+
+    def quitar(self, nodo):
+        """Quita un nodo y recalcula solo su ventana."""
+        x, y, Pt = self.nodos.pop(nodo)
+        ventana = r0, r1, c0, c1 = self._ventana(x, y)
+        if r0 >= r1 or c0 >= c1:
+            return
+        pr = self._senal(x, y, Pt, ventana)
+        potencia = self.potencia_mw[r0:r1, c0:c1]
+        potencia -= 10 ** (pr / 10)
+        np.maximum(potencia, 0, out=potencia)
+
+        # Los píxeles servidos (1.º o 2.º) por el nodo se reconstruyen con los
+        # nodos cuya ventana toca la del nodo quitado
+        afectados = ((self.id_mejor[r0:r1, c0:c1] == nodo)
+                     | (self.id_segundo[r0:r1, c0:c1] == nodo))
+        if not afectados.any():
+            return
+        filas = np.flatnonzero(afectados.any(axis=1))
+        cols = np.flatnonzero(afectados.any(axis=0))
+        sub = (r0 + filas[0], r0 + filas[-1] + 1, c0 + cols[0], c0 + cols[-1] + 1)
+        self.recalcular(sub)
+        # Sin ningún nodo al alcance la suma es 0 (no el residuo de la resta)
+        potencia[self.id_mejor[r0:r1, c0:c1] < 0] = 0
+
+    def mover(self, nodo, x, y):
+        """Mueve un nodo conservando su identificador y potencia."""
+        Pt = self.nodos[nodo][2]
+        self.quitar(nodo)
+        self.nodos[nodo] = (x, y, Pt)
+        ventana = self._ventana(x, y)
+        pr = self._aplicar(nodo, x, y, Pt, ventana)
+        if pr is not None:
+            r0, r1, c0, c1 = ventana
+            self.potencia_mw[r0:r1, c0:c1] += 10 ** (pr / 10)
+
+    def recalcular(self, ventana=None):
+        """Reconstruye mejor/segundo servidor en una ventana (r0, r1, c0, c1)."""
+        r0, r1, c0, c1 = ventana or (0, self.alto, 0, self.ancho)
+        self.mejor[r0:r1, c0:c1] = -np.inf
+        self.segundo[r0:r1, c0:c1] = -np.inf
+        self.id_mejor[r0:r1, c0:c1] = -1
+        self.id_segundo[r0:r1, c0:c1] = -1
+        for nodo, (x, y, Pt) in self.nodos.items():
+            parte = self._interseccion((r0, r1, c0, c1), self._ventana(x, y))
+            self._aplicar(nodo, x, y, Pt, parte)
+
+    # === RESULTADOS ===
+    def mapa_dbm(self, agregacion="mejor"):
+        """Heatmap en dBm: "mejor" (mejor servidor) o "suma" (potencia total)."""
+        if agregacion == "suma":
+            with np.errstate(divide="ignore"):
+                mapa = 10 * np.log10(self.potencia_mw)
+        else:
+            mapa = self.mejor.astype(np.float64)
+        return np.maximum(mapa, self.piso_dbm)
+
+
+def cobertura_incremental_sede(sede, width, height, radio_px=None, dtype=np.float32):
+    """Estado incremental con todos los nodos (small cells y RRUs) de una sede."""
+    estado = CoberturaIncremental(width, height, sede["N"], f_mhz=sede["f_mhz"], d0=sede["d0"],
+                                  m_por_px=sede["m_por_px"], piso_dbm=sede["piso_dbm"],
+                                  radio_px=radio_px, dtype=dtype)
+    for capa in ("small_cells", "rrus"):
+        if capa in sede:
+            for x, y in posiciones_capa(sede[capa], width, height, sede["zonas_prohibidas"]):
+                estado.agregar(x, y, sede[capa].get("Pt_dBm", 33))
+    return estado
@@ -0,0 +1,269 @@
+"""Indicadores de cobertura (KPI) por sede: CDF, % del área por umbral y zonas muertas.
+
+Se recorre el mapa una sola vez, por franjas de filas, así que funciona
+igual sobre arrays en memoria, teselas o .npy mapeados en disco (los de
+simular_sedes --mapas) sin cargarlos enteros. Por cada franja:
+
+- histograma del RSRP en pasos de PASO_HISTOGRAMA_DB (np.bincount), del
+  que salen la CDF y los percentiles;
+- píxeles con al menos cada umbral de UMBRALES_DBM (conteo exacto);
+- tramos de zona muerta por fila (píxeles bajo umbral_muerta_dbm fuera de
+  las zonas prohibidas), guardados como (fila, inicio, fin).
+
+Al final los tramos de filas vecinas que se tocan se unen en componentes
+conexas (8-vecindad) con etiquetado por unión de raíces sobre el
+grafo de tramos, sin volver a leer el mapa. Las zonas prohibidas no
+cuentan en ningún indicador.
+
+Uso:
+    python kpi.py mapas/                       # .npy guardados con simular_sedes --mapas
+    python kpi.py mapas/ --umbrales -70,-80,-90,-100 --salida kpi.json
+"""
+import argparse
+import glob
+import json
+import os
+
+import numpy as np
+
+UMBRALES_DBM = (-70.0, -80.0, -90.0, -100.0)
+UMBRAL_MUERTA_DBM = -90.0
+PASO_HISTOGRAMA_DB = 0.5
+RANGO_HISTOGRAMA_DBM = (-200.0, 50.0)
+PERCENTILES_KPI = (5, 10, 50, 90, 95)
+AREA_MIN_ZONA_M2 = 1.0          # zonas muertas más chicas no se listan (sí se cuentan)
+MAX_ZONAS = 20                  # zonas muertas listadas por sede (las de mayor área)
+ELEMENTOS_POR_FRANJA = 1 << 20
+INFORME = "kpi.json"
+
+
+def _tramos(muerto, r0):
+    """Tramos de True por fila de una franja -> (fila, inicio, fin) con fin excluido."""
+    filas, ancho = muerto.shape
+    borde = np.zeros((filas, ancho + 2), dtype=np.int8)
+    borde[:, 1:-1] = muerto
+    cambios = np.diff(borde, axis=1)
+    fila, inicio = np.nonzero(cambios == 1)
+    _, fin = np.nonzero(cambios == -1)
+    return (fila + r0).astype(np.int64), inicio.astype(np.int64), fin.astype(np.int64)
+
+
+def etiquetar_tramos(fila, inicio, fin, ancho, conectividad=8):
+    """Componente conexa (0..C-1) de cada tramo, ordenados por (fila, inicio).
+
+    Dos tramos de filas consecutivas están unidos si se solapan (4-vecindad)
+    o si se tocan en diagonal (8-vecindad). Los pares se obtienen con
+    searchsorted sobre claves fila · (ancho + 2) + columna; cada arista
+    cuelga la raíz mayor de la menor y se saltan punteros hasta que todas
+    las aristas unen tramos con la misma raíz.
+    """
+    n = len(fila)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), 0
+    c = 1 if conectividad == 8 else 0
+    base = ancho + 2
+    clave_inicio = fila * base + inicio
+    clave_fin = fila * base + fin
+    anterior = (fila - 1) * base
+    # Tramos de la fila anterior con fin > inicio - c y con inicio < fin + c
+    lo = np.searchsorted(clave_fin, anterior + inicio - c, side="right")
+    hi = np.searchsorted(clave_inicio, anterior + fin + c, side="left")
+    cuantos = np.maximum(hi - lo, 0)
+    a = np.repeat(np.arange(n), cuantos)
+    b = np.repeat(lo - np.cumsum(cuantos) + cuantos, cuantos) + np.arange(cuantos.sum())
+
+    etiqueta = np.arange(n)
+    while len(a):
+        # Cada arista cuelga la raíz mayor de la menor
+        ra, rb = etiqueta[a], etiqueta[b]
+        np.minimum.at(etiqueta, np.maximum(ra, rb), np.minimum(ra, rb))
+        while True:
+            saltos = etiqueta[etiqueta]
+            if np.array_equal(saltos, etiqueta):
+                break
+            etiqueta = saltos
+        pendientes = etiqueta[a] != etiqueta[b]
+        if not pendientes.any():
+            break
+        a, b = a[pendientes], b[pendientes]
+    raices, compacta = np.unique(etiqueta, return_inverse=True)
+    return compacta, len(raices)
+
+
+def zonas_conexas(fila, inicio, fin, ancho, conectividad=8):
+    """Área (px), caja [x0, y0, x1, y1] y centroide de cada componente, de mayor a menor."""
+    etiqueta, n = etiquetar_tramos(fila, inicio, fin, ancho, conectividad)
+    largo = (fin - inicio).astype(np.float64)
+    area = np.bincount(etiqueta, weights=largo, minlength=n)
+    sx = np.bincount(etiqueta, weights=largo * (inicio + fin - 1) / 2, minlength=n)
+    sy = np.bincount(etiqueta, weights=largo * fila, minlength=n)
+    caja = np.empty((n, 4), dtype=np.int64)
+    caja[:, :2] = np.iinfo(np.int64).max
+    caja[:, 2:] = -1
+    np.minimum.at(caja[:, 0], etiqueta, inicio)
+    np.minimum.at(caja[:, 1], etiqueta, fila)
+    np.maximum.at(caja[:, 2], etiqueta, fin - 1)
+    np.maximum.at(caja[:, 3], etiqueta, fila)
+    orden = np.argsort(-area, kind="stable")
+    return area[orden], caja[orden], np.column_stack([sx, sy])[orden] / area[orden, None]
+
+
+def _percentiles_histograma(cuentas, inicio, paso, percentiles):
+    """Percentiles por interpolación lineal dentro de cada intervalo del histograma."""
+    acumulada = np.cumsum(cuentas)
+    total = acumulada[-1]
+    valores = {}
+    for p in percentiles:
+        objetivo = total * p / 100
+        i = int(np.searchsorted(acumulada, objetivo, side="left"))
+        previo = acumulada[i - 1] if i > 0 else 0
+        fraccion = (objetivo - previo) / cuentas[i] if cuentas[i] else 0.0
+        valores[f"p{p:g}"] = round(float(inicio + (i + fraccion) * paso), 3)
+    return valores
+
+
+def kpi_mapa(mapa, mascara=None, m_por_px=1.0, umbrales=UMBRALES_DBM,
+             umbral_muerta_dbm=UMBRAL_MUERTA_DBM, paso_db=PASO_HISTOGRAMA_DB,
+             rango=RANGO_HISTOGRAMA_DBM, percentiles=PERCENTILES_KPI,
+             area_min_m2=AREA_MIN_ZONA_M2, max_zonas=MAX_ZONAS, conectividad=8,
+             filas_por_franja=None):
+    """Indicadores de un mapa (alto, ancho) en dBm, leído una vez por franjas de filas.
+
+    mapa y mascara (True = zona prohibida) pueden ser np.memmap. Los NaN
+    (p. ej. fuera del plano) no cuentan. Devuelve un dict apto para JSON
+    con el área evaluada, el histograma recortado a los intervalos con
+    datos, percentiles de la CDF, el % del área con al menos cada umbral y
+    las zonas muertas (cantidad, área total y las max_zonas mayores de
+    al menos area_min_m2).
+    """
+    alto, ancho = mapa.shape
+    filas_por_franja = filas_por_franja or max(1, ELEMENTOS_POR_FRANJA // max(ancho, 1))
+    n_bins = int(np.ceil((rango[1] - rango[0]) / paso_db))
+    cuentas = np.zeros(n_bins, dtype=np.int64)
+    umbrales = sorted((float(u) for u in umbrales), reverse=True)
+    por_encima = np.zeros(len(umbrales), dtype=np.int64)
+    total, suma = 0, 0.0
+    minimo, maximo = np.inf, -np.inf
+    tramos = []
+    for r0 in range(0, alto, filas_por_franja):
+        r1 = min(alto, r0 + filas_por_franja)
+        franja = np.asarray(mapa[r0:r1], dtype=np.float64)
+        validos = ~np.isnan(franja)
+        if mascara is not None:
+            validos &= ~np.asarray(mascara[r0:r1], dtype=bool)
+        v = franja[validos]
+        if v.size:
+            indice = np.clip(((v - rango[0]) / paso_db).astype(np.int64), 0, n_bins - 1)
+            cuentas += np.bincount(indice, minlength=n_bins)
+            for i, u in enumerate(umbrales):
+                por_encima[i] += np.count_nonzero(v >= u)
+            total += v.size
+            suma += float(v.sum())
+            minimo, maximo = min(minimo, float(v.min())), max(maximo, float(v.max()))
+        tramos.append(_tramos(validos & (franja < umbral_muerta_dbm), r0))
+
+    area_px = m_por_px ** 2
+    informe = {"pixeles": total, "area_m2": round(total * area_px, 3), "m_por_px": m_por_px}
+    if total == 0:
+        return informe
+    usados = np.flatnonzero(cuentas)
+    primero, ultimo = usados[0], usados[-1] + 1
+    informe.update({
+        "min_dbm": round(minimo, 3), "max_dbm": round(maximo, 3),
+        "media_dbm": round(suma / total, 3),
+        "percentiles_dbm": _percentiles_histograma(cuentas, rango[0], paso_db, percentiles),
+        "por_encima": {f"{u:g}": round(100.0 * int(c) / total, 3)
+                       for u, c in zip(umbrales, por_encima)},
+        "histograma": {"inicio_dbm": rango[0] + primero * paso_db, "paso_db": paso_db,
+                       "cuentas": cuentas[primero:ultimo].tolist()},
+    })
+
+    fila, inicio, fin = (np.concatenate(t) for t in zip(*tramos))
+    area, caja, centro = zonas_conexas(fila, inicio, fin, ancho, conectividad)
+    listadas = np.flatnonzero(area * area_px >= area_min_m2)[:max_zonas]
+    informe["zonas_muertas"] = {
+        "umbral_dbm": umbral_muerta_dbm,
+        "cantidad": len(area),
+        "area_m2": round(float(area.sum()) * area_px, 3),
+        "porcentaje_area": round(100.0 * float(area.sum()) / total, 3),
+        "mayores": [{"area_m2": round(float(area[i]) * area_px, 3),
+                     "caja_px": caja[i].tolist(),
+                     "centroide_px": [round(float(c), 1) for c in centro[i]]}
+                    for i in listadas],
+    }
+    return informe
+
+
+def kpi_resultado(sede, resultado, **opciones):
+    """kpi_mapa del RSRP de un resultado de simular_sede (combinado si no hay rsrp_dbm)."""
+    mapa = resultado.get("rsrp_dbm")
+    if mapa is None:
+        mapa = resultado["combined_heatmap_dbm"]
+    return {"sede": sede["clave"], "titulo": sede.get("titulo"),
+            **kpi_mapa(mapa, resultado.get("mascara_zonas"), sede["m_por_px"], **opciones)}
+
+
+def escribir_informe(informes, ruta):
+    """Escribe {"sedes": [...]} en ruta (JSON, una entrada por sede, ordenadas por clave)."""
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    temporal = ruta + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({"sedes": sorted(informes, key=lambda i: i["sede"])}, f, ensure_ascii=False,
+                  indent=1)
+    os.replace(temporal, ruta)
+
+
+def ruta_informe_sede(directorio, clave):
+    """Informe KPI de una sede dentro de directorio (lo escribe simular_sedes --kpi)."""
+    return os.path.join(directorio, f"{clave}_kpi.json")
+
+
+def unir_informes(directorio, claves, ruta=None):
+    """Junta los informes por sede de directorio en uno solo (por defecto directorio/INFORME)."""
+    informes = []
+    for clave in claves:
+        with open(ruta_informe_sede(directorio, clave), encoding="utf-8") as f:
+            informes.extend(json.load(f)["sedes"])
+    escribir_informe(informes, ruta or os.path.join(directorio, INFORME))
+    return informes
+
+
+def main(argv=None):
+    from sedes import abrir_mapa, ruta_mapa
+
+    parser = argparse.ArgumentParser(description="KPI de cobertura de los mapas guardados "
+                                                 "con simular_sedes --mapas.")
+    parser.add_argument("mapas", help="directorio con <sede>_<mapa>.npy y sus .json")
+    parser.add_argument("sedes", nargs="*", help="claves de sede (por defecto todas)")
+    parser.add_argument("--salida", default=None, help=f"informe JSON (por defecto "
+                                                       f"<mapas>/{INFORME})")
+    parser.add_argument("--umbrales", default=None, metavar="DBM[,DBM...]",
+                        type=lambda t: [float(u) for u in t.split(",") if u])
+    parser.add_argument("--muerta", type=float, default=UMBRAL_MUERTA_DBM, metavar="DBM",
+                        help="umbral de zona muerta")
+    args = parser.parse_args(argv)
+
+    sufijo = "_combined_heatmap_dbm.npy"
+    claves = args.sedes or sorted(os.path.basename(r)[:-len(sufijo)]
+                                  for r in glob.glob(os.path.join(args.mapas, "*" + sufijo)))
+    informes = []
+    for clave in claves:
+        ruta = ruta_mapa(args.mapas, clave, "rsrp_dbm")
+        if not os.path.exists(ruta):
+            ruta = ruta_mapa(args.mapas, clave, "combined_heatmap_dbm")
+        mapa, meta = abrir_mapa(ruta)
+        ruta_mascara = ruta_mapa(args.mapas, clave, "mascara_zonas")
+        mascara = np.load(ruta_mascara, mmap_mode="r") if os.path.exists(ruta_mascara) else None
+        informe = kpi_mapa(mapa, mascara, meta.get("modelo", {}).get("m_por_px") or 1.0,
+                           args.umbrales or UMBRALES_DBM, args.muerta)
+        informes.append({"sede": clave, "titulo": meta.get("titulo"), **informe})
+        zonas = informe.get("zonas_muertas", {})
+        print(f"{clave:<20} {informe.get('por_encima', {})}  zonas muertas "
+              f"{zonas.get('cantidad', 0)} ({zonas.get('porcentaje_area', 0):.1f} %)")
+    escribir_informe(informes, args.salida or os.path.join(args.mapas, INFORME))
+
+
+if __name__ == "__main__":
+    main()
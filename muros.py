@@ -0,0 +1,230 @@
+import numpy as np
+
+# === PÉRDIDA POR MUROS (MODELO MULTI-PARED) ===
+# Los muros salen del plano en escala de grises: los píxeles más oscuros
+# que UMBRAL_MURO forman la máscara de obstáculos. A la pérdida CI de cada
+# transmisor se le suma perdida_db por cada muro que cruza el rayo
+# transmisor -> píxel (como en el modelo multi-pared de COST 231).
+#
+# Los cruces se cuentan con un barrido polar por transmisor: se trazan a
+# la vez todos los rayos (uno por píxel de arco en el borde más lejano),
+# se muestrea la máscara cada medio píxel y las entradas a un muro (libre
+# -> muro) a lo largo de cada rayo dan, para cada distancia, cuántos muros
+# se cruzaron. Cada píxel del plano toma el valor del rayo más cercano a
+# su ángulo. El costo es O(rayos · muestras + píxeles) por transmisor, sin
+# bucles de Python por píxel.
+#
+# Un barrido se guarda compacto: solo las posiciones (rayo, muestra) de
+# las entradas a muros, ordenadas, y el número de muros hasta un píxel es
+# un searchsorted. Así BarridosMuros conserva un barrido por transmisor
+# para toda la simulación (teselas, capas y franjas) ocupando una fracción
+# de la tabla densa rayos x muestras. El número de rayos depende solo del
+# plano completo, de modo que un barrido limitado a los rayos y distancias
+# que llegan a las filas evaluadas (o al alcance del transmisor) da los
+# mismos valores que el barrido completo.
+UMBRAL_MURO = 80            # nivel de gris (0-255) por debajo del cual hay muro
+PERDIDA_MURO_DB = 5.0       # pérdida por muro (tabique / muro liviano a 3.5 GHz)
+PASO_RAYO = 0.5             # paso del muestreo a lo largo de los rayos (px)
+RAYOS_POR_LOTE = 512
+
+
+def mascara_muros(plano, umbral=UMBRAL_MURO):
+    """Máscara (alto, ancho) con True en los píxeles de muro del plano (PIL o array en grises)."""
+    gris = np.asarray(plano.convert("L") if hasattr(plano, "convert") else plano)
+    return gris < umbral
+
+
+def cerrar_diagonales(muros):
+    """Ensancha los muros un píxel a la derecha para que sean 4-conexos.
+
+    Los rayos muestreados cada medio píxel recorren un camino 8-conexo,
+    que puede pasar entre dos píxeles de un muro diagonal; un muro 4-conexo
+    no se puede atravesar sin tocarlo.
+    """
+    cerrada = muros.copy()
+    cerrada[:, 1:] |= muros[:, :-1]
+    return cerrada
+
+
+def ventana_alcance(cx, cy, radio, f0, f1, ancho):
+    """(r0, r1, c0, c1) de las filas f0:f1 al alcance de (cx, cy), o None si no hay ninguna."""
+    r0, r1, c0, c1 = f0, f1, 0, ancho
+    if np.isfinite(radio):
+        c0, c1 = max(0, int(np.ceil(cx - radio))), min(ancho, int(np.floor(cx + radio)) + 1)
+        r0, r1 = max(f0, int(np.ceil(cy - radio))), min(f1, int(np.floor(cy + radio)) + 1)
+    return (r0, r1, c0, c1) if r0 < r1 and c0 < c1 else None
+
+
+class BarridosMuros:
+    """Barridos polares de los transmisores sobre una máscara de muros.
+
+    muros: máscara (alto, ancho) del plano completo (ver mascara_muros);
+    con cerrada=True ya pasó por cerrar_diagonales. filas: (f0, f1) de la
+    simulación (por defecto todo el plano); cada barrido cubre solo los
+    rayos y distancias que llegan a esas filas dentro del alcance del
+    transmisor. Los barridos se guardan por (cx, cy, radio), uno por
+    transmisor para todas las ventanas, mientras quepan en memoria_mb (sin
+    límite si es None); los transmisores que no caben se barren solo para
+    cada ventana pedida, igual que con guardar=False (una franja que se
+    calcula una sola vez). Al serializarse no lleva los barridos guardados.
+    """
+
+    def __init__(self, muros, paso=PASO_RAYO, memoria_mb=None, cerrada=False, guardar=True,
+                 filas=None):
+        muros = np.asarray(muros, dtype=bool)
+        self.muros = muros if cerrada else cerrar_diagonales(muros)
+        self.alto, self.ancho = self.muros.shape
+        self.paso = paso
+        self.memoria_mb = memoria_mb
+        self.guardar = guardar
+        self.filas = (0, self.alto) if filas is None else tuple(filas)
+        self._guardados = {}
+        self._sin_lugar = set()
+        self._usada = 0
+        # Borde sin muros: las muestras fuera del plano se recortan al borde
+        # en lugar de enmascararlas
+        con_borde = np.zeros((self.alto + 2, self.ancho + 2), dtype=bool)
+        con_borde[1:-1, 1:-1] = self.muros
+        self._plano = con_borde.ravel()
+
+    def __getstate__(self):
+        return {"muros": self.muros, "paso": self.paso, "memoria_mb": self.memoria_mb,
+                "guardar": self.guardar, "filas": self.filas}
+
+    def __setstate__(self, estado):
+        self.__init__(estado["muros"], estado["paso"], estado["memoria_mb"], cerrada=True,
+                      guardar=estado["guardar"], filas=estado["filas"])
+
+    def geometria(self, cx, cy, radio=np.inf):
+        """(rayos, muestras) del barrido de un transmisor; el radio solo acorta los rayos."""
+        r_max = max(np.hypot(x - cx, y - cy)
+                    for x in (0, self.ancho - 1) for y in (0, self.alto - 1)) + 1
+        n_rayos = max(8, int(np.ceil(2 * np.pi * r_max)))
+        return n_rayos, int(np.floor(min(r_max, radio + 1) / self.paso)) + 2
+
+    def _rayos(self, cx, cy, xs, ys, n_rayos):
+        """Índice del rayo más cercano al ángulo de cada píxel (xs, ys)."""
+        angulo = np.arctan2(ys - cy, xs - cx)
+        return np.rint(angulo * (n_rayos / (2 * np.pi))).astype(np.intp) % n_rayos
+
+    def barrer(self, cx, cy, ventana, radio=np.inf):
+        """Barrido de los rayos y distancias que llegan a la ventana (r0, r1, c0, c1).
+
+        Devuelve (claves, inicio, n_muestras): claves, ordenadas, son
+        rayo · n_muestras + k por cada entrada a un muro en la muestra k
+        del rayo; inicio[rayo] es la posición de la primera clave del rayo.
+        Un transmisor montado sobre un muro no cuenta ese muro.
+        """
+        r0, r1, c0, c1 = ventana
+        n_rayos, n_muestras = self.geometria(cx, cy, radio)
+        esquinas_x = np.array([c0, c1 - 1, c0, c1 - 1], dtype=np.float64)
+        esquinas_y = np.array([r0, r0, r1 - 1, r1 - 1], dtype=np.float64)
+        d_max = np.hypot(esquinas_x - cx, esquinas_y - cy).max()
+        n_barrer = min(n_muestras, int(np.rint(d_max / self.paso)) + 1)
+        if c0 <= cx <= c1 - 1 and r0 <= cy <= r1 - 1:
+            rayos = np.arange(n_rayos)
+        else:
+            # Desde fuera la ventana abarca menos de media vuelta: sus rayos
+            # son el arco entre los de su borde
+            cols, filas = np.arange(c0, c1, dtype=np.float64), np.arange(r0, r1, dtype=np.float64)
+            xs = np.concatenate([cols, cols, np.full(len(filas), c0), np.full(len(filas), c1 - 1)])
+            ys = np.concatenate([np.full(len(cols), r0), np.full(len(cols), r1 - 1), filas, filas])
+            rayo = self._rayos(cx, cy, xs, ys, n_rayos)
+            relativo = (rayo - rayo[0] + n_rayos // 2) % n_rayos - n_rayos // 2
+            rayos = np.sort((rayo[0] + np.arange(relativo.min(), relativo.max() + 1)) % n_rayos)
+
+        # Coordenadas en float32: sobra precisión para planos de miles de píxeles
+        distancias = np.arange(n_barrer, dtype=np.float32) * np.float32(self.paso)
+        tipo = np.int32 if n_rayos * n_muestras < 2**31 else np.int64
+        claves = []
+        for a0 in range(0, len(rayos), RAYOS_POR_LOTE):
+            lote = rayos[a0:a0 + RAYOS_POR_LOTE]
+            a = (lote * (2 * np.pi / n_rayos))[:, None]
+            xs = np.rint(np.float32(cx + 1) + np.cos(a).astype(np.float32) * distancias)
+            ys = np.rint(np.float32(cy + 1) + np.sin(a).astype(np.float32) * distancias)
+            np.clip(xs, 0, self.ancho + 1, out=xs)
+            np.clip(ys, 0, self.alto + 1, out=ys)
+            indices = ys.astype(np.intp)
+            indices *= self.ancho + 2
+            indices += xs.astype(np.intp)
+            en_muro = self._plano[indices]
+            i, k = np.nonzero(en_muro[:, 1:] & ~en_muro[:, :-1])
+            claves.append((lote[i] * n_muestras + (k + 1)).astype(tipo))
+        claves = np.concatenate(claves) if claves else np.zeros(0, dtype=tipo)
+        inicio = np.searchsorted(claves, np.arange(n_rayos, dtype=tipo) * tipo(n_muestras))
+        return claves, inicio.astype(tipo), n_muestras
+
+    def cruces(self, cx, cy, ventana, radio=np.inf, distancia_px=None):
+        """Muros entre (cx, cy) y cada píxel de la ventana (r0, r1, c0, c1) -> uint16.
+
+        distancia_px: distancias ya calculadas de la ventana al transmisor.
+        """
+        r0, r1, c0, c1 = ventana
+        clave = (float(cx), float(cy), float(radio))
+        barrido = self._guardados.get(clave)
+        if barrido is None:
+            region = None
+            if self.guardar and clave not in self._sin_lugar:
+                region = ventana_alcance(cx, cy, radio, *self.filas, self.ancho)
+            if region is not None and (region[0] <= r0 and r1 <= region[1]
+                                       and region[2] <= c0 and c1 <= region[3]):
+                barrido = self.barrer(cx, cy, region, radio)
+                ocupa = barrido[0].nbytes + barrido[1].nbytes
+                if self.memoria_mb is None or self._usada + ocupa <= self.memoria_mb * 2**20:
+                    self._guardados[clave] = barrido
+                    self._usada += ocupa
+                else:
+                    self._sin_lugar.add(clave)
+            else:
+                barrido = self.barrer(cx, cy, ventana, radio)
+        claves, inicio, n_muestras = barrido
+
+        n_rayos = len(inicio)
+        xs = np.arange(c0, c1, dtype=np.float64)[None, :]
+        ys = np.arange(r0, r1, dtype=np.float64)[:, None]
+        if distancia_px is None:
+            distancia_px = np.hypot(xs - cx, ys - cy)
+        rayo = self._rayos(cx, cy, xs, ys, n_rayos)
+        consulta = np.minimum(np.rint(distancia_px / self.paso).astype(claves.dtype),
+                              n_muestras - 1)
+        consulta += (rayo * n_muestras).astype(claves.dtype)
+        cruces = np.searchsorted(claves, consulta, side="right")
+        cruces -= inicio[rayo]
+        return cruces.astype(np.uint16)
+
+
+def mapa_muros(pos, pt, radios, ancho, f0, f1, salida, N, fspl, d0, m_por_px, piso_dbm, muros,
+               perdida_db=PERDIDA_MURO_DB, agregacion="mejor"):
+    """Mapa CI con pérdida por muros de las filas f0:f1 en salida (mejor servidor o suma).
+
+    pos: (T, 2) en píxeles; pt: (T,) en dBm; radios: (T,) alcance en
+    píxeles o None; muros: máscara del plano completo (ver mascara_muros)
+    o un BarridosMuros para reutilizar los barridos entre llamadas. Con
+    radio cada transmisor solo se evalúa (y se barre) en la ventana de su
+    alcance.
+    """
+    if not isinstance(muros, BarridosMuros):
+        muros = BarridosMuros(muros, filas=(f0, f1))
+    total = np.zeros(salida.shape, dtype=np.float64) if agregacion == "suma" else None
+    for i, ((cx, cy), Pt) in enumerate(zip(pos, pt)):
+        radio = np.inf if radios is None else float(radios[i])
+        ventana = ventana_alcance(cx, cy, radio, f0, f1, ancho)
+        if ventana is None:
+            continue
+        r0, r1, c0, c1 = ventana
+        d_px = np.hypot(np.arange(c0, c1, dtype=np.float64)[None, :] - cx,
+                        np.arange(r0, r1, dtype=np.float64)[:, None] - cy)
+        d = np.maximum(d_px * m_por_px, d0)
+        pr = Pt - fspl - 10 * N * np.log10(d / d0)
+        pr -= perdida_db * muros.cruces(cx, cy, ventana, radio, d_px)
+        if np.isfinite(radio):
+            pr[d_px > radio] = -np.inf
+        if total is None:
+            destino = salida[r0 - f0:r1 - f0, c0:c1]
+            np.maximum(destino, pr, out=destino, casting="unsafe")
+        else:
+            total[r0 - f0:r1 - f0, c0:c1] += np.power(10.0, pr / 10)
+    if total is not None:
+        with np.errstate(divide="ignore"):
+            salida[...] = np.where(total > 0, 10 * np.log10(total), piso_dbm)
+    return salida
@@ -0,0 +1,308 @@
+"""Ubicación automática de nodos con un objetivo de cobertura.
+
+Dado el plano de una sede, su máscara de zonas prohibidas y un objetivo
+(p. ej. 95 % de los píxeles con al menos -90 dBm), busca el menor conjunto
+de nodos de una capa que lo cumple:
+
+1. Cobertura por candidato: cada posición candidata cubre los píxeles a
+   los que llega con al menos el umbral (un disco de radio alcance_px,
+   porque la pérdida CI solo crece con la distancia). Se guarda como
+   bitset empaquetado y como lista de índices.
+2. Cobertura voraz (set cover): se elige una y otra vez el candidato que
+   más píxeles nuevos cubre, contando bits con AND/NOT y una tabla de
+   popcount sobre todos los candidatos a la vez.
+3. Recocido simulado: movimientos de quitar, agregar o reubicar un nodo evaluados
+   de forma incremental con un contador de nodos por píxel, sin recalcular
+   ningún mapa (miles de movimientos por segundo).
+
+Uso:
+    python optimizacion.py CentroAcuatico --umbral -90 --objetivo 0.95
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from cobertura import alcance_px
+from sedes import DIRECTORIO_SEDES, cargar_sede, posiciones_capa
+from zonas import mascara_zonas
+
+# Bits en 1 de cada byte, para contar píxeles cubiertos en los bitsets
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class ProblemaCobertura:
+    """Píxeles a evaluar, candidatos y cobertura de cada candidato.
+
+    Los píxeles se evalúan en una grilla de paso_evaluacion px fuera de
+    las zonas prohibidas; los candidatos, en una grilla de
+    paso_candidatos px también fuera de ellas. fijos: nodos ya ubicados
+    (p. ej. las small cells) como lista de (x, y, Pt_dBm), que cubren
+    desde el principio.
+    """
+
+    def __init__(self, width, height, N, Pt_dBm, umbral_dbm=-90.0, f_mhz=3500, d0=1.0,
+                 m_por_px=1.0, mascara=None, paso_candidatos=20, paso_evaluacion=4,
+                 fijos=(), radio_px=None, candidatos=None):
+        self.width, self.height = width, height
+        libre = np.ones((height, width), dtype=bool) if mascara is None else ~mascara
+
+        # === PÍXELES DE EVALUACIÓN ===
+        ys_e = np.arange(paso_evaluacion // 2, height, paso_evaluacion)
+        xs_e = np.arange(paso_evaluacion // 2, width, paso_evaluacion)
+        validos = libre[np.ix_(ys_e, xs_e)]
+        self.indice = np.full(validos.shape, -1, dtype=np.int64)
+        self.indice[validos] = np.arange(np.count_nonzero(validos))
+        self.xs_e, self.ys_e, self.paso_e = xs_e, ys_e, paso_evaluacion
+        self.n_pixeles = int(np.count_nonzero(validos))
+
+        # === CANDIDATOS ===
+        if candidatos is None:
+            yy, xx = np.mgrid[paso_candidatos // 2:height:paso_candidatos,
+                              paso_candidatos // 2:width:paso_candidatos]
+            ok = libre[yy, xx]
+            candidatos = np.column_stack([xx[ok], yy[ok]])
+        self.candidatos = np.asarray(candidatos, dtype=np.int64).reshape(-1, 2)
+        radio = float(alcance_px(Pt_dBm, umbral_dbm, N, f_mhz, d0, m_por_px))
+        if radio_px is not None:
+            radio = min(radio, radio_px)
+        self.radio = radio
+
+        # Cobertura de cada candidato como lista de índices (formato CSR)
+        listas = [self._pixeles_cubiertos(cx, cy, radio) for cx, cy in self.candidatos]
+        self.inicio = np.zeros(len(listas) + 1, dtype=np.int64)
+        self.inicio[1:] = np.cumsum([len(lista) for lista in listas])
+        self.pixeles = np.concatenate(listas) if listas else np.zeros(0, dtype=np.int64)
+
+        # ... y como bitset empaquetado (una fila de bytes por candidato)
+        self.n_bytes = (self.n_pixeles + 7) // 8
+        self.bits = np.zeros((len(listas), self.n_bytes), dtype=np.uint8)
+        fila = np.zeros(self.n_bytes * 8, dtype=bool)
+        for i, lista in enumerate(listas):
+            fila[:] = False
+            fila[lista] = True
+            self.bits[i] = np.packbits(fila)
+
+        # Cobertura de los nodos fijos (cuántos nodos fijos llegan a cada píxel)
+        self.base = np.zeros(self.n_pixeles, dtype=np.uint16)
+        for x, y, Pt in fijos:
+            r = float(alcance_px(Pt, umbral_dbm, N, f_mhz, d0, m_por_px))
+            if radio_px is not None:
+                r = min(r, radio_px)
+            self.base[self._pixeles_cubiertos(x, y, r)] += 1
+
+    def _pixeles_cubiertos(self, cx, cy, radio):
+        """Índices de los píxeles de evaluación a <= radio de (cx, cy)."""
+        paso = self.paso_e
+        f0 = max(0, int(np.ceil((cy - radio - paso // 2) / paso)))
+        f1 = min(len(self.ys_e), int(np.floor((cy + radio - paso // 2) / paso)) + 1)
+        c0 = max(0, int(np.ceil((cx - radio - paso // 2) / paso)))
+        c1 = min(len(self.xs_e), int(np.floor((cx + radio - paso // 2) / paso)) + 1)
+        if f0 >= f1 or c0 >= c1:
+            return np.zeros(0, dtype=np.int64)
+        d2 = ((self.ys_e[f0:f1, None] - cy) ** 2 + (self.xs_e[None, c0:c1] - cx) ** 2)
+        indices = self.indice[f0:f1, c0:c1][d2 <= radio * radio]
+        return indices[indices >= 0]
+
+    def cubiertos_por(self, i):
+        return self.pixeles[self.inicio[i]:self.inicio[i + 1]]
+
+    def cobertura(self, elegidos):
+        """Fracción de píxeles cubiertos por los fijos más los candidatos elegidos."""
+        conteo = self.base.copy()
+        for i in elegidos:
+            conteo[self.cubiertos_por(i)] += 1
+        return np.count_nonzero(conteo) / max(self.n_pixeles, 1)
+
+
+# === 1. COBERTURA VORAZ ===
+def cobertura_voraz(problema, objetivo=0.95):
+    """Índices de candidatos elegidos por set cover voraz hasta cubrir objetivo."""
+    meta = int(np.ceil(objetivo * problema.n_pixeles))
+    cubierto = np.packbits(np.resize(problema.base > 0, problema.n_bytes * 8))
+    n_cubiertos = int(np.count_nonzero(problema.base))
+    elegidos = []
+    while n_cubiertos < meta:
+        # Píxeles nuevos de cada candidato: popcount(bits & ~cubierto)
+        ganancia = POPCOUNT[problema.bits & ~cubierto].sum(axis=1, dtype=np.int64)
+        i = int(np.argmax(ganancia))
+        if ganancia[i] == 0:
+            break
+        elegidos.append(i)
+        cubierto |= problema.bits[i]
+        n_cubiertos += int(ganancia[i])
+    return elegidos
+
+
+# === 2. RECOCIDO SIMULADO ===
+def recocido(problema, elegidos, objetivo=0.95, iteraciones=20000, temperatura=(1.0, 0.05),
+             penalidad=5.0, radio_movimiento=None, rng=None):
+    """Refina un conjunto de nodos: menos nodos cumpliendo el objetivo.
+
+    Energía = nodos + penalidad por cada punto porcentual que falte para el
+    objetivo. Cada iteración propone quitar un nodo, agregar uno o
+    reubicarlo en otro candidato a menos de radio_movimiento px (por
+    defecto el alcance de un nodo), y se evalúa con el contador de nodos
+    por píxel: quitar el nodo i pierde los píxeles de i con contador 1 y
+    ubicar el j gana los de j con contador 0, así que el costo es
+    proporcional al área de un nodo y no al plano. Devuelve el mejor
+    conjunto que cumple el objetivo (o el de mayor cobertura si ninguno lo
+    cumple) y estadísticas del recorrido.
+    """
+    rng = rng or np.random.default_rng()
+    n_pix = max(problema.n_pixeles, 1)
+    meta = objetivo * n_pix
+    candidatos = problema.candidatos
+    radio_movimiento = radio_movimiento or problema.radio
+
+    conteo = problema.base.astype(np.int32)
+    for i in elegidos:
+        conteo[problema.cubiertos_por(i)] += 1
+    activos = list(elegidos)
+    en_uso = np.zeros(len(candidatos), dtype=bool)
+    en_uso[activos] = True
+    cubiertos = int(np.count_nonzero(conteo))
+
+    def energia(n, cub):
+        return n + penalidad * max(0.0, meta - cub) * 100 / n_pix
+
+    def mejor_que(n, cub, ref):
+        ok, ok_ref = cub >= meta, ref[1] >= meta
+        if ok != ok_ref:
+            return ok
+        return (n, -cub) < (ref[0], -ref[1]) if ok else cub > ref[1]
+
+    mejor = (len(activos), cubiertos, list(activos))
+    e = energia(len(activos), cubiertos)
+    t0, t1 = temperatura
+    aceptados = 0
+    inicio = time.perf_counter()
+    for it in range(iteraciones):
+        T = t0 * (t1 / t0) ** (it / max(iteraciones - 1, 1))
+        tipo = rng.random()
+        k = i = j = -1
+        if activos and tipo >= 0.2:
+            k = int(rng.integers(len(activos)))
+            i = activos[k]
+        if i < 0 or tipo >= 0.6:
+            # Agregar (o reubicar) en un candidato libre, cerca del nodo si se reubica
+            libres = ~en_uso
+            if i >= 0:
+                libres &= ((np.abs(candidatos[:, 0] - candidatos[i, 0]) <= radio_movimiento)
+                           & (np.abs(candidatos[:, 1] - candidatos[i, 1]) <= radio_movimiento))
+            opciones = np.flatnonzero(libres)
+            if len(opciones):
+                j = int(opciones[rng.integers(len(opciones))])
+        if i < 0 and j < 0:
+            continue
+
+        perdidos = ganados = 0
+        if i >= 0:
+            pix_i = problema.cubiertos_por(i)
+            conteo[pix_i] -= 1
+            perdidos = int(np.count_nonzero(conteo[pix_i] == 0))
+        if j >= 0:
+            pix_j = problema.cubiertos_por(j)
+            ganados = int(np.count_nonzero(conteo[pix_j] == 0))
+
+        n_nuevo = len(activos) - (i >= 0) + (j >= 0)
+        cub_nuevo = cubiertos - perdidos + ganados
+        e_nuevo = energia(n_nuevo, cub_nuevo)
+        if e_nuevo <= e or rng.random() < np.exp((e - e_nuevo) / T):
+            aceptados += 1
+            if i >= 0:
+                en_uso[i] = False
+                activos[k] = activos[-1]
+                activos.pop()
+            if j >= 0:
+                conteo[pix_j] += 1
+                activos.append(j)
+                en_uso[j] = True
+            cubiertos, e = cub_nuevo, e_nuevo
+            if mejor_que(len(activos), cubiertos, mejor):
+                mejor = (len(activos), cubiertos, list(activos))
+        elif i >= 0:
+            conteo[pix_i] += 1
+
+    duracion = time.perf_counter() - inicio
+    estadisticas = {"iteraciones": iteraciones, "aceptados": aceptados,
+                    "movimientos_por_s": iteraciones / duracion if duracion > 0 else float("inf")}
+    return mejor[2], estadisticas
+
+
+# === OPTIMIZACIÓN DE UNA CAPA DE UNA SEDE ===
+def optimizar_sede(sede, width, height, capa="rrus", umbral_dbm=-90.0, objetivo=0.95,
+                   paso_candidatos=20, paso_evaluacion=4, iteraciones=20000, semilla=0,
+                   fijos=("small_cells",), radio_px=None):
+    """Menor conjunto de nodos de `capa` que cubre `objetivo` de la sede.
+
+    Las capas en `fijos` se mantienen tal como están definidas y cuentan
+    como cobertura inicial. Devuelve un diccionario con las posiciones,
+    el número de nodos y la cobertura de la solución voraz y de la
+    refinada, y las estadísticas del recocido.
+    """
+    zonas = sede["zonas_prohibidas"]
+    mascara = mascara_zonas(zonas, width, height)
+    nodos_fijos = []
+    for otra in fijos:
+        if otra in sede and otra != capa:
+            Pt = sede[otra].get("Pt_dBm", 33)
+            nodos_fijos += [(x, y, Pt) for x, y in
+                            posiciones_capa(sede[otra], width, height, zonas, mascara)]
+    Pt = sede.get(capa, {}).get("Pt_dBm", 33)
+
+    t0 = time.perf_counter()
+    problema = ProblemaCobertura(width, height, sede["N"], Pt, umbral_dbm, f_mhz=sede["f_mhz"],
+                                 d0=sede["d0"], m_por_px=sede["m_por_px"], mascara=mascara,
+                                 paso_candidatos=paso_candidatos, paso_evaluacion=paso_evaluacion,
+                                 fijos=nodos_fijos, radio_px=radio_px)
+    t_prep = time.perf_counter() - t0
+    voraz = cobertura_voraz(problema, objetivo)
+    refinado, estadisticas = recocido(problema, voraz, objetivo, iteraciones,
+                                      rng=np.random.default_rng(semilla))
+    return {
+        "posiciones": [tuple(map(int, problema.candidatos[i])) for i in refinado],
+        "nodos_voraz": len(voraz), "cobertura_voraz": problema.cobertura(voraz),
+        "nodos": len(refinado), "cobertura": problema.cobertura(refinado),
+        "candidatos": len(problema.candidatos), "pixeles": problema.n_pixeles,
+        "t_preparacion": t_prep, **estadisticas,
+    }
+
+
+def main(argv=None):
+    from simular_sedes import DIRECTORIO_PLANOS, cargar_plano
+
+    parser = argparse.ArgumentParser(description="Ubicación automática de nodos de una sede.")
+    parser.add_argument("sede", help="clave de la sede (config_sedes/<sede>.json)")
+    parser.add_argument("--config", default=DIRECTORIO_SEDES)
+    parser.add_argument("--planos", default=DIRECTORIO_PLANOS)
+    parser.add_argument("--capa", choices=("rrus", "small_cells"), default="rrus")
+    parser.add_argument("--umbral", type=float, default=-90.0, help="umbral de cobertura (dBm)")
+    parser.add_argument("--objetivo", type=float, default=0.95,
+                        help="fracción de píxeles (fuera de zonas prohibidas) a cubrir")
+    parser.add_argument("--paso-candidatos", type=int, default=20)
+    parser.add_argument("--paso-evaluacion", type=int, default=4)
+    parser.add_argument("--iteraciones", type=int, default=20000)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--json", action="store_true",
+                        help="imprimir las posiciones como bloque \"posiciones\" del .json")
+    args = parser.parse_args(argv)
+
+    sede = cargar_sede(args.sede, args.config)
+    width, height = cargar_plano(sede, args.planos).size
+    r = optimizar_sede(sede, width, height, capa=args.capa, umbral_dbm=args.umbral,
+                       objetivo=args.objetivo, paso_candidatos=args.paso_candidatos,
+                       paso_evaluacion=args.paso_evaluacion, iteraciones=args.iteraciones,
+                       semilla=args.semilla)
+    print(f"{sede['clave']}: {r['candidatos']} candidatos, {r['pixeles']} píxeles evaluados "
+          f"(preparación {r['t_preparacion']:.2f} s)")
+    print(f"  voraz:    {r['nodos_voraz']} nodos, cobertura {100 * r['cobertura_voraz']:.1f} %")
+    print(f"  recocido: {r['nodos']} nodos, cobertura {100 * r['cobertura']:.1f} %  "
+          f"({r['movimientos_por_s']:.0f} movimientos/s)")
+    if args.json:
+        print(json.dumps({"posiciones": [list(p) for p in r["posiciones"]]}))
+
+
+if __name__ == "__main__":
+    main()
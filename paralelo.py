@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from cobertura import mapa_cobertura
+from muros import BarridosMuros
+
+# Por debajo de este número de píxeles no compensa repartir el plano
+MIN_PIXELES_PARALELO = 1 << 18
+
+
+def _franja_cobertura(nombre_shm, forma, dtype, r0, r1, transmisores, N, Pt_dBm, parametros,
+                      alto=None, f0=0, muros=None):
+    """Calcula las filas r0:r1 del heatmap directamente sobre la memoria compartida.
+
+    La memoria compartida guarda las filas f0:f0 + forma[0] de un plano de
+    alto filas (por defecto, el plano completo). muros: (nombre, forma,
+    paso) de la máscara de muros ya cerrada en otro bloque compartido; la
+    franja solo barre los rayos que la cruzan.
+    """
+    shm = shared_memory.SharedMemory(name=nombre_shm)
+    shm_muros = None if muros is None else shared_memory.SharedMemory(name=muros[0])
+    try:
+        salida = np.ndarray(forma, dtype=dtype, buffer=shm.buf)
+        if shm_muros is not None:
+            mascara = np.ndarray(muros[1], dtype=bool, buffer=shm_muros.buf)
+            parametros = {**parametros, "muros": BarridosMuros(mascara, muros[2], cerrada=True,
+                                                              guardar=False)}
+        mapa_cobertura(transmisores, forma[1], alto or forma[0], N, Pt_dBm, dtype=dtype,
+                       salida=salida[r0 - f0:r1 - f0], filas=(r0, r1), **parametros)
+        del salida
+        parametros = mascara = None
+    finally:
+        shm.close()
+        if shm_muros is not None:
+            shm_muros.close()
+
+
+def mapa_cobertura_paralelo(transmisores, ancho, alto, N, Pt_dBm, procesos=None,
+                            ejecutor=None, dtype=np.float64, filas=None, salida=None,
+                            **parametros):
+    """mapa_cobertura repartido por franjas de filas entre varios procesos.
+
+    Cada proceso escribe su franja en un bloque de memoria compartida, de modo
+    que ni el plano ni el resultado se serializan entre procesos (solo viajan
+    las posiciones de los transmisores; la máscara de muros, si la hay, va en
+    otro bloque compartido). Como cada píxel depende de todos los
+    transmisores pero de ninguna otra fila, no hace falta combinar resultados.
+
+    procesos: número de franjas (por defecto os.cpu_count()).
+    ejecutor: ProcessPoolExecutor ya creado para reutilizarlo entre sedes.
+    filas, salida: como en mapa_cobertura (una tesela de filas y el array
+    donde copiarla, que puede ser un np.memmap).
+    """
+    procesos = procesos or os.cpu_count() or 1
+    dtype = np.dtype(dtype if salida is None else salida.dtype)
+    f0, f1 = filas if filas is not None else (0, alto)
+    if procesos == 1 or ancho * (f1 - f0) < MIN_PIXELES_PARALELO:
+        return mapa_cobertura(transmisores, ancho, alto, N, Pt_dBm, dtype=dtype,
+                              filas=filas, salida=salida, **parametros)
+
+    transmisores = [tuple(map(float, p)) for p in transmisores]
+    forma = (f1 - f0, ancho)
+    shm = shared_memory.SharedMemory(create=True, size=forma[0] * ancho * dtype.itemsize)
+    shm_muros = muros = None
+    if parametros.get("muros") is not None:
+        barridos = parametros.pop("muros")
+        if not isinstance(barridos, BarridosMuros):
+            barridos = BarridosMuros(barridos)
+        shm_muros = shared_memory.SharedMemory(create=True, size=max(1, barridos.muros.size))
+        np.ndarray(barridos.muros.shape, dtype=bool, buffer=shm_muros.buf)[...] = barridos.muros
+        muros = (shm_muros.name, barridos.muros.shape, barridos.paso)
+    propio = ejecutor is None
+    if propio:
+        ejecutor = ProcessPoolExecutor(procesos)
+    try:
+        limites = np.linspace(f0, f1, min(procesos, f1 - f0) + 1).astype(int)
+        tareas = [ejecutor.submit(_franja_cobertura, shm.name, forma, dtype.str, r0, r1,
+                                  transmisores, N, Pt_dBm, parametros, alto, f0, muros)
+                  for r0, r1 in zip(limites[:-1], limites[1:]) if r1 > r0]
+        for tarea in tareas:
+            tarea.result()
+        compartido = np.ndarray(forma, dtype=dtype, buffer=shm.buf)
+        if salida is None:
+            salida = compartido.copy()
+        else:
+            salida[...] = compartido
+        del compartido
+        return salida
+    finally:
+        if propio:
+            ejecutor.shutdown()
+        shm.close()
+        shm.unlink()
+        if shm_muros is not None:
+            shm_muros.close()
+            shm_muros.unlink()
@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from graficos import superponer
+from teselas import reservar_mapa
+
+# === PIRÁMIDE DE TESELAS XYZ ===
+# Cada sede se exporta como teselas PNG de 256 x 256 en <dir>/{z}/{x}/{y}.png
+# para verlas en un visor web (p. ej. Leaflet con CRS.Simple). En el zoom
+# máximo un píxel de tesela es un píxel del plano; cada nivel anterior
+# reduce 2 x 2 -> 1 el mapa (máximo, o media en potencia lineal) y el plano
+# (media). Se recorre de a un nivel por vez: solo el nivel actual y el
+# siguiente están en memoria (o en memmap con directorio_trabajo).
+TAMANO_TESELA = 256
+REDUCCIONES = ("max", "media")
+MANIFIESTO = "teselas.json"
+
+
+def zoom_maximo(ancho, alto, tamano=TAMANO_TESELA):
+    """Menor z con el plano entero dentro de 2**z teselas por lado."""
+    z = 0
+    while tamano << z < max(ancho, alto):
+        z += 1
+    return z
+
+
+def _reducir_bloque(b, modo):
+    """b: (filas, 2, columnas, 2) con NaN donde no hay datos."""
+    if modo == "max":
+        # fmax ignora los NaN (y no avisa si los cuatro lo son)
+        return np.fmax(np.fmax(b[:, 0, :, 0], b[:, 0, :, 1]),
+                       np.fmax(b[:, 1, :, 0], b[:, 1, :, 1]))
+    validos = ~np.isnan(b)
+    cuenta = validos.sum(axis=(1, 3))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        if modo == "media_potencia":
+            lineal = np.where(validos, np.power(10.0, b / 10.0, dtype=np.float64), 0.0)
+            return (10 * np.log10(lineal.sum(axis=(1, 3)) / cuenta)).astype(np.float32)
+        return (np.where(validos, b, 0).sum(axis=(1, 3)) / cuenta).astype(np.float32)
+
+
+def reducir_nivel(nivel, modo, filas_por_bloque=256, salida=None):
+    """Nivel siguiente de la pirámide (mitad de filas y columnas, redondeando hacia arriba).
+
+    modo: "max", "media_potencia" (dBm promediados en mW) o "media".
+    Se procesa por franjas de filas, así que nivel puede ser un memmap.
+    """
+    alto, ancho = nivel.shape
+    alto2, ancho2 = -(-alto // 2), -(-ancho // 2)
+    if salida is None:
+        salida = np.empty((alto2, ancho2), dtype=np.float32)
+    for r0 in range(0, alto2, filas_por_bloque):
+        r1 = min(alto2, r0 + filas_por_bloque)
+        bloque = np.full((2 * (r1 - r0), 2 * ancho2), np.nan, dtype=np.float32)
+        origen = nivel[2 * r0:min(alto, 2 * r1)]
+        bloque[:len(origen), :ancho] = origen
+        salida[r0:r1] = _reducir_bloque(bloque.reshape(r1 - r0, 2, ancho2, 2), modo)
+    return salida
+
+
+def _tesela(mapa, gris, x, y, tamano, alpha, vmin, vmax, cmap):
+    """RGBA uint8 (tamano, tamano, 4): superposición del nivel, transparente fuera del plano."""
+    filas = slice(y * tamano, (y + 1) * tamano)
+    columnas = slice(x * tamano, (x + 1) * tamano)
+    m = np.asarray(mapa[filas, columnas], dtype=np.float32)
+    g = np.asarray(gris[filas, columnas], dtype=np.float32)
+    validos = ~np.isnan(m)
+    rgba = np.zeros((tamano, tamano, 4), dtype=np.uint8)
+    alto, ancho = m.shape
+    gris8 = np.rint(np.nan_to_num(g, nan=0.0)).astype(np.uint8)
+    rgba[:alto, :ancho, :3] = superponer(gris8, np.where(validos, m, vmin), alpha, vmin, vmax, cmap)
+    rgba[:alto, :ancho, 3] = np.where(validos, 255, 0)
+    return rgba
+
+
+def _leer_manifiesto(directorio):
+    try:
+        with open(os.path.join(directorio, MANIFIESTO), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def exportar_piramide(directorio, mapa, plano, reduccion="max", alpha=0.65, vmin=None,
+                      vmax=None, cmap="jet", zoom_min=0, tamano=TAMANO_TESELA,
+                      procesos=None, directorio_trabajo=None):
+    """Escribe la pirámide XYZ de la sede en directorio y devuelve un resumen.
+
+    mapa: (alto, ancho) en dBm (array o memmap). plano: imagen PIL o array
+    en grises del mismo tamaño. reduccion: "max" (peor caso optimista: el
+    mejor píxel del bloque) o "media" (media de la potencia en mW).
+    vmin/vmax fijan la escala de colores (por defecto, la del mapa
+    completo), igual en todos los niveles.
+
+    Cada nivel se reparte por teselas entre procesos hilos (numpy y la
+    compresión PNG liberan el GIL). En MANIFIESTO se guarda un hash del
+    contenido de cada tesela: al volver a exportar solo se reescriben las
+    que cambiaron y se borran las que ya no existen.
+    """
+    if reduccion not in REDUCCIONES:
+        raise ValueError(f"reduccion debe ser una de {REDUCCIONES}, no {reduccion!r}")
+    alto, ancho = mapa.shape
+    gris = np.asarray(plano.convert("L") if isinstance(plano, Image.Image) else plano)
+    if gris.shape != (alto, ancho):
+        raise ValueError(f"el plano {gris.shape} y el mapa {mapa.shape} no coinciden")
+    vmin = float(np.min(mapa)) if vmin is None else float(vmin)
+    vmax = float(np.max(mapa)) if vmax is None else float(vmax)
+    z_max = zoom_maximo(ancho, alto, tamano)
+    modo = "max" if reduccion == "max" else "media_potencia"
+
+    anterior = _leer_manifiesto(directorio)
+    parametros = {"ancho": ancho, "alto": alto, "tamano": tamano, "zoom_min": zoom_min,
+                  "zoom_max": z_max, "reduccion": reduccion, "alpha": alpha,
+                  "vmin": vmin, "vmax": vmax, "cmap": cmap}
+    hashes_previos = anterior.get("teselas", {})
+    hashes = {}
+    resumen = {"escritas": 0, "sin_cambios": 0, "borradas": 0, "zoom_max": z_max}
+
+    def exportar(nivel_mapa, nivel_gris, z, x, y):
+        rgba = _tesela(nivel_mapa, nivel_gris, x, y, tamano, alpha, vmin, vmax, cmap)
+        clave = f"{z}/{x}/{y}"
+        h = hashlib.blake2b(rgba.tobytes(), digest_size=16).hexdigest()
+        ruta = os.path.join(directorio, str(z), str(x), f"{y}.png")
+        if hashes_previos.get(clave) == h and os.path.exists(ruta):
+            return clave, h, False
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        Image.fromarray(rgba).save(ruta)
+        return clave, h, True
+
+    nivel_mapa, nivel_gris = mapa, gris
+    with ThreadPoolExecutor(procesos) as hilos:
+        for z in range(z_max, zoom_min - 1, -1):
+            filas, columnas = nivel_mapa.shape
+            tareas = [(z, x, y) for y in range(-(-filas // tamano))
+                      for x in range(-(-columnas // tamano))]
+            for clave, h, escrita in hilos.map(lambda t: exportar(nivel_mapa, nivel_gris, *t),
+                                               tareas):
+                hashes[clave] = h
+                resumen["escritas" if escrita else "sin_cambios"] += 1
+            if z > zoom_min:
+                forma = (-(-filas // 2), -(-columnas // 2))
+                rutas = ((None, None) if directorio_trabajo is None else
+                         (os.path.join(directorio_trabajo, f"mapa_z{z - 1}.npy"),
+                          os.path.join(directorio_trabajo, f"plano_z{z - 1}.npy")))
+                nivel_mapa = reducir_nivel(nivel_mapa, modo,
+                                           salida=reservar_mapa(forma, np.float32, rutas[0]))
+                nivel_gris = reducir_nivel(nivel_gris, "media",
+                                           salida=reservar_mapa(forma, np.float32, rutas[1]))
+
+    for clave in set(hashes_previos) - set(hashes):
+        try:
+            os.remove(os.path.join(directorio, *clave.split("/")) + ".png")
+            resumen["borradas"] += 1
+        except OSError:
+            pass
+
+    os.makedirs(directorio, exist_ok=True)
+    temporal = os.path.join(directorio, MANIFIESTO + ".tmp")
+    with open(temporal, "w", encoding="utf-8") as f:
+        json.dump({**parametros, "teselas": hashes}, f)
+    os.replace(temporal, os.path.join(directorio, MANIFIESTO))
+    return resumen
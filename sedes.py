@@ -0,0 +1,422 @@
+import json
+import os
+
+import numpy as np
+
+from adaptativo import TOLERANCIA_DB
+from cobertura import mapa_cobertura, mapas_servidor, ruido_termico_dbm
+from escala import (a_celdas, ampliar, factor_resolucion, forma_gruesa, m_por_px_calibrado,
+                    reducir_mascara)
+from muros import PERDIDA_MURO_DB, BarridosMuros
+from paralelo import mapa_cobertura_paralelo
+from teselas import filas_por_tesela, reservar_mapa, teselas
+from ubicacion import completar_rechazo, filtrar_separacion, muestreo_poisson
+from zonas import dentro_de_zonas, mascara_zonas, puntos_validos
+
+# === UBICACIÓN DE LAS DEFINICIONES DE SEDES ===
+DIRECTORIO_SEDES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config_sedes")
+
+# Valores por defecto del modelo CI (los mismos de los scripts originales)
+PARAMETROS_POR_DEFECTO = {
+    "f_mhz": 3500,          # Frecuencia central 5G en MHz
+    "d0": 1.0,              # Distancia de referencia (1 metro)
+    "m_por_px": 1.0,        # Escala del plano (metros por píxel; ver "calibracion")
+    "resolucion_m": None,   # Lado de la celda de simulación en metros (None: el píxel)
+    "escala_grises": True,  # Image.open(...).convert("L")
+    "piso_dbm": -150.0,     # Nivel de los píxeles sin cobertura
+    "sensibilidad_dbm": None,
+    "ancho_banda_mhz": 100,     # Canal n78 para el ruido térmico de la SINR
+    "figura_ruido_db": 9.0,
+    "ruido_dbm": None,          # Ruido fijo para la SINR (None: kTB + NF)
+    "muros": None,              # {"umbral": 80, "perdida_db": 5.0} para la pérdida por muros
+    "sombra": None,             # {"sigma_db": 8, "correlacion_m": 10} para el Monte Carlo (sombra.py)
+    "usuarios": None,           # {"densidad_m2": 0.1, "demanda_mbps": 5, "zonas": [...]} (capacidad.py)
+    "zonas_prohibidas": [],
+    "salidas": [],
+}
+
+
+def listar_sedes(directorio=DIRECTORIO_SEDES):
+    """Claves de todas las sedes definidas (nombre del archivo sin .json)."""
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(directorio)
+                  if f.endswith(".json"))
+
+
+def cargar_sede(nombre, directorio=DIRECTORIO_SEDES):
+    """Lee la definición de una sede por clave ("CentroAcuatico") o ruta a .json."""
+    ruta = nombre if nombre.endswith(".json") else os.path.join(directorio, nombre + ".json")
+    with open(ruta, encoding="utf-8") as f:
+        sede = json.load(f)
+    sede.setdefault("clave", os.path.splitext(os.path.basename(ruta))[0])
+    # Sin "calibracion" ni "m_por_px" la escala es la de los scripts originales (1 px = 1 m)
+    sede["escala_calibrada"] = "calibracion" in sede or "m_por_px" in sede
+    for clave, valor in PARAMETROS_POR_DEFECTO.items():
+        sede.setdefault(clave, valor)
+    sede["zonas_prohibidas"] = [tuple(map(tuple, z)) for z in sede["zonas_prohibidas"]]
+    if "calibracion" in sede:
+        sede["m_por_px"] = m_por_px_calibrado(sede["calibracion"])
+    for capa in ("small_cells", "rrus"):
+        aleatorias = sede.get(capa, {}).get("completar_aleatorias") or {}
+        if aleatorias.get("metodo") == "poisson" and not aleatorias.get("separacion_min", 0) > 0:
+            raise ValueError(f"{sede['clave']}: {capa}.completar_aleatorias con metodo "
+                             "poisson necesita separacion_min > 0")
+    return sede
+
+
+# === VALIDACIÓN DE POSICIONES ===
+def fuera_de_zonas_prohibidas(x, y, zonas_prohibidas):
+    return not dentro_de_zonas(x, y, zonas_prohibidas)
+
+
+def _valores_eje(eje, limite):
+    """Lista explícita o rango {"inicio", "fin", "paso"}; fin <= 0 se mide desde el borde."""
+    if isinstance(eje, dict):
+        fin = eje["fin"] if eje["fin"] > 0 else limite + eje["fin"]
+        return list(range(eje["inicio"], fin, eje["paso"]))
+    return list(eje)
+
+
+def _puntos_grilla(grilla, width, height):
+    xs = _valores_eje(grilla["x"], width)
+    ys = _valores_eje(grilla["y"], height)
+    if grilla.get("orden", "xy") == "xy":
+        return [(x, y) for x in xs for y in ys]
+    return [(x, y) for y in ys for x in xs]
+
+
+def posiciones_capa(capa, width, height, zonas_prohibidas=(), mascara=None):
+    """Posiciones (x, y) de una capa de nodos (small cells o RRUs).
+
+    Orden de construcción, igual que en los scripts originales:
+    posiciones literales + grillas -> filtro de zonas prohibidas ->
+    separación mínima (voraz) -> máximo de nodos -> relleno aleatorio.
+    La separación se comprueba con una rejilla hash (ver ubicacion.py).
+    completar_aleatorias admite "metodo": "rechazo" (por defecto, el
+    sorteo de los scripts originales) o "poisson" (muestreo de disco de
+    Poisson con np.random.Generator).
+    Las zonas prohibidas se validan contra su máscara rasterizada (se
+    calcula aquí si no se pasa mascara, ver zonas.mascara_zonas).
+    """
+    posiciones = [tuple(p) for p in capa.get("posiciones", [])]
+    for grilla in capa.get("grillas", []):
+        posiciones += _puntos_grilla(grilla, width, height)
+
+    if mascara is None and zonas_prohibidas:
+        mascara = mascara_zonas(zonas_prohibidas, width, height)
+
+    def validas(xs, ys):
+        return puntos_validos(xs, ys, zonas_prohibidas, mascara)
+
+    if capa.get("filtrar_zonas", True) and zonas_prohibidas and posiciones:
+        xs, ys = np.array(posiciones, dtype=np.float64).T
+        posiciones = [p for p, ok in zip(posiciones, validas(xs, ys)) if ok]
+
+    maximo = capa.get("max")
+    separacion = capa.get("separacion_min")
+    if separacion:
+        posiciones = filtrar_separacion(posiciones, separacion, maximo)
+    if maximo is not None:
+        posiciones = posiciones[:maximo]
+
+    # Añadir nodos aleatorios si no se llegó al máximo
+    aleatorias = capa.get("completar_aleatorias")
+    if aleatorias and maximo is not None:
+        margen = aleatorias.get("margen", 0)
+        separacion = aleatorias.get("separacion_min", 0)
+        if aleatorias.get("metodo", "rechazo") == "poisson":
+            rng = np.random.default_rng(aleatorias.get("semilla"))
+            extras = muestreo_poisson(
+                width, height, separacion, rng, maximo=maximo, margen=margen,
+                valida_vec=validas, existentes=posiciones)
+        else:
+            rng = np.random.RandomState(aleatorias.get("semilla"))
+            extras = completar_rechazo(
+                posiciones, maximo, width, height, separacion,
+                lambda x, y: mascara is None or not mascara[y, x], rng, margen)
+        posiciones = posiciones + extras
+    return posiciones
+
+
+# === SIMULACIÓN DE UNA SEDE ===
+AGREGACIONES = ("capas", "mejor", "suma", "sinr")
+
+
+def simular_sede(sede, width, height, dtype=np.float64, procesos=1, ejecutor=None,
+                 metodo="lut", verificar=False, ventanas=False, agregacion="capas",
+                 memoria_mb=None, salidas=None, tolerancia_db=None, muros=None):
+    """Calcula los heatmaps en dBm de una sede sobre un plano de width x height.
+
+    Con procesos > 1 cada capa se reparte por franjas de filas entre
+    procesos (ver paralelo.mapa_cobertura_paralelo). metodo y verificar se
+    pasan a cobertura.mapa_cobertura. Con ventanas=True cada capa solo se
+    evalúa dentro de su "radio_px" y/o hasta la "sensibilidad_dbm" de la sede.
+
+    agregacion decide cómo se combinan los nodos en combined_heatmap_dbm:
+    - "capas": como los scripts originales, mejor servidor dentro de cada
+      capa y suma de potencias entre small cells y RRUs.
+    - "mejor": mejor servidor entre todos los nodos.
+    - "suma": potencia total de todos los nodos (los mapas por capa
+      también son suma de potencias).
+    - "sinr": SINR del mejor servidor frente al resto de nodos más el
+      ruido térmico, en dB. En la misma pasada se obtienen id_servidor
+      (índice uint16 en small_cells + rrus) y rsrp_dbm (ver
+      cobertura.mapas_servidor).
+    "suma" y "sinr" se calculan en mW con un único log10.
+
+    Con memoria_mb el plano se recorre por teselas de filas (ver
+    teselas.filas_por_tesela) y cada mapa se escribe tesela a tesela en
+    salidas[clave] si se da (array preasignado o np.memmap, ver
+    reservar_salidas), de modo que la RAM de trabajo no crece con el plano.
+
+    Con metodo="adaptativo" los mapas de nivel se evalúan de grueso a fino
+    con error <= tolerancia_db (ver adaptativo.py) y resultado["adaptativo"]
+    informa la tolerancia, la mayor cota de error usada y la fracción de
+    píxeles evaluados. La cota vale también para el mapa combinado (el
+    máximo y la suma en mW no amplían el error en dB); la SINR sigue
+    siendo exacta.
+
+    Con muros (máscara (height, width) de obstáculos, ver
+    muros.mascara_muros) cada nodo pierde sede["muros"]["perdida_db"] por
+    muro atravesado (ver muros.py). No admite "sinr" ni el método
+    adaptativo. El barrido de cada nodo se calcula una vez por sede, en
+    forma compacta, y lo reutilizan todas las teselas; los barridos
+    guardados no pasan de memoria_mb (sin tope si es None, ver
+    muros.BarridosMuros). Con "suma" el mapa combinado se suma en mW a
+    partir de los de cada capa.
+
+    Con sede["resolucion_m"] mayor que m_por_px los mapas se calculan en
+    celdas de ese lado (ver escala.py) y se amplían al tamaño del plano:
+    el costo baja con el cuadrado del factor. Las posiciones devueltas
+    siguen en píxeles del plano.
+
+    Devuelve un diccionario con la agregación, las posiciones de cada capa
+    y los mapas heatmap_scs_dbm, heatmap_rrus_dbm (None si la sede no tiene
+    RRUs) y combined_heatmap_dbm (más id_servidor y rsrp_dbm con "sinr"),
+    y la máscara de zonas prohibidas (mascara_zonas, True = prohibida) para
+    excluirlas de las estadísticas.
+    """
+    if agregacion not in AGREGACIONES:
+        raise ValueError(f"agregación desconocida: {agregacion!r}")
+    zonas = sede["zonas_prohibidas"]
+    mascara = mascara_zonas(zonas, width, height)
+    parametros = dict(f_mhz=sede["f_mhz"], d0=sede["d0"], m_por_px=sede["m_por_px"],
+                      piso_dbm=sede["piso_dbm"], metodo=metodo, verificar=verificar)
+    if ventanas:
+        parametros["sensibilidad_dbm"] = sede["sensibilidad_dbm"]
+    if muros is not None:
+        if agregacion == "sinr":
+            raise ValueError("la pérdida por muros no admite la agregación sinr")
+        parametros["perdida_muro_db"] = (sede["muros"] or {}).get("perdida_db", PERDIDA_MURO_DB)
+    informe = None
+    if metodo == "adaptativo":
+        parametros["tolerancia_db"] = TOLERANCIA_DB if tolerancia_db is None else tolerancia_db
+        # Los procesos del pool no devuelven su informe: se usa la cota a priori
+        informe = {"cota_db": parametros["tolerancia_db"]} if procesos > 1 else {}
+        if procesos == 1:
+            parametros["informe"] = informe
+
+    resultado = {"agregacion": agregacion, "mascara_zonas": mascara}
+    capas, nodos, potencias, radios = [], [], [], []
+    for capa, clave_mapa in (("small_cells", "heatmap_scs_dbm"), ("rrus", "heatmap_rrus_dbm")):
+        if capa not in sede:
+            resultado[capa], resultado[clave_mapa] = [], None
+            continue
+        posiciones = posiciones_capa(sede[capa], width, height, zonas, mascara)
+        resultado[capa] = posiciones
+        Pt_dBm = sede[capa].get("Pt_dBm", 33)
+        radio = sede[capa].get("radio_px") if ventanas else None
+        capas.append((clave_mapa, posiciones, Pt_dBm, radio))
+        nodos += posiciones
+        potencias += [Pt_dBm] * len(posiciones)
+        radios += [np.inf if radio is None else radio] * len(posiciones)
+
+    # === MAPAS DE SALIDA ===
+    salidas = salidas or {}
+    claves = [clave_mapa for clave_mapa, *_ in capas]
+    if agregacion == "sinr":
+        claves += ["id_servidor", "rsrp_dbm"]
+    # Sin RRUs el mapa combinado es el de las small cells
+    combinado_propio = (agregacion == "sinr" or len(capas) != 1
+                        or "combined_heatmap_dbm" in salidas)
+    if combinado_propio:
+        claves.append("combined_heatmap_dbm")
+    for clave in claves:
+        tipo = np.uint16 if clave == "id_servidor" else dtype
+        resultado[clave] = salidas[clave] if clave in salidas else \
+            np.empty((height, width), dtype=tipo)
+    if not combinado_propio:
+        resultado["combined_heatmap_dbm"] = resultado[capas[0][0]]
+
+    # === RESOLUCIÓN DE CÁLCULO ===
+    factor = factor_resolucion(sede["m_por_px"], sede.get("resolucion_m"))
+    calculo, sede_calculo, ancho_calculo, alto_calculo = resultado, sede, width, height
+    if factor > 1:
+        ancho_calculo, alto_calculo = forma_gruesa(width, height, factor)
+        sede_calculo = {**sede, "m_por_px": sede["m_por_px"] * factor}
+        parametros["m_por_px"] = sede_calculo["m_por_px"]
+        if muros is not None:
+            muros = reducir_mascara(muros, factor)
+        calculo = {clave: np.empty((alto_calculo, ancho_calculo), dtype=resultado[clave].dtype)
+                   for clave in claves}
+        calculo["heatmap_rrus_dbm"] = calculo.get("heatmap_rrus_dbm")
+        capas = [(clave_mapa, a_celdas(posiciones, factor), Pt_dBm,
+                  None if radio is None else radio / factor)
+                 for clave_mapa, posiciones, Pt_dBm, radio in capas]
+        nodos = a_celdas(nodos, factor)
+        radios = [radio / factor for radio in radios]
+        if not combinado_propio:
+            calculo["combined_heatmap_dbm"] = calculo[capas[0][0]]
+    if muros is not None:
+        # Un solo juego de barridos por sede, compartido por teselas y capas
+        parametros["muros"] = BarridosMuros(muros, memoria_mb=memoria_mb)
+
+    filas = alto_calculo if memoria_mb is None else filas_por_tesela(ancho_calculo, memoria_mb)
+    for r0, r1 in teselas(alto_calculo, filas):
+        _simular_tesela(sede_calculo, ancho_calculo, alto_calculo, r0, r1, calculo, capas, nodos,
+                        potencias, radios, parametros, agregacion, ventanas, procesos, ejecutor,
+                        combinado_propio)
+    for clave in claves:
+        if calculo is not resultado:
+            ampliar(calculo[clave], resultado[clave], factor,
+                    "vecino" if clave == "id_servidor" else "bilineal")
+        if isinstance(resultado[clave], np.memmap):
+            resultado[clave].flush()
+    if informe is not None:
+        resultado["adaptativo"] = {"tolerancia_db": parametros["tolerancia_db"], **informe}
+    return resultado
+
+
+def _simular_tesela(sede, width, height, r0, r1, resultado, capas, nodos, potencias, radios,
+                    parametros, agregacion, ventanas, procesos, ejecutor, combinado_propio):
+    """Calcula las filas r0:r1 de todos los mapas de la sede sobre resultado."""
+    def calcular(posiciones, Pt_dBm, salida, **extra):
+        if procesos > 1:
+            return mapa_cobertura_paralelo(posiciones, width, height, sede["N"], Pt_dBm,
+                                           procesos=procesos, ejecutor=ejecutor,
+                                           filas=(r0, r1), salida=salida,
+                                           **parametros, **extra)
+        return mapa_cobertura(posiciones, width, height, sede["N"], Pt_dBm,
+                              filas=(r0, r1), salida=salida, **parametros, **extra)
+
+    for clave_mapa, posiciones, Pt_dBm, radio in capas:
+        extra = {"radio_px": radio} if ventanas else {}
+        calcular(posiciones, Pt_dBm, resultado[clave_mapa][r0:r1],
+                 agregacion="suma" if agregacion == "suma" else "mejor", **extra)
+    if not combinado_propio:
+        return
+
+    # === COMBINACIÓN DE AMBOS MAPAS EN dBm ===
+    scs, rrus = resultado["heatmap_scs_dbm"], resultado["heatmap_rrus_dbm"]
+    combinado = resultado["combined_heatmap_dbm"][r0:r1]
+    extra = {"radio_px": radios} if ventanas else {}
+    if agregacion == "sinr":
+        ruido_dbm = sede["ruido_dbm"]
+        if ruido_dbm is None:
+            ruido_dbm = ruido_termico_dbm(sede["ancho_banda_mhz"] * 1e6, sede["figura_ruido_db"])
+        mapas_servidor(nodos, width, height, sede["N"], potencias, f_mhz=sede["f_mhz"],
+                       d0=sede["d0"], m_por_px=sede["m_por_px"], piso_dbm=sede["piso_dbm"],
+                       ruido_dbm=ruido_dbm, filas=(r0, r1),
+                       sensibilidad_dbm=parametros.get("sensibilidad_dbm"),
+                       salidas={"id_servidor": resultado["id_servidor"][r0:r1],
+                                "rsrp_dbm": resultado["rsrp_dbm"][r0:r1],
+                                "sinr_db": combinado}, **extra)
+    elif agregacion == "suma" and rrus is not None and "muros" in parametros:
+        # Con muros se suman en mW los mapas de cada capa en lugar de barrer de nuevo
+        piso = parametros["piso_dbm"]
+        total = sum(np.where(mapa[r0:r1] > piso, 10**(mapa[r0:r1] / 10), 0)
+                    for mapa in (scs, rrus))
+        with np.errstate(divide="ignore"):
+            combinado[...] = np.where(total > 0, 10 * np.log10(total), piso)
+    elif agregacion == "suma" and rrus is not None:
+        # Todos los nodos en una sola pasada, acumulando en mW
+        calcular(nodos, potencias, combinado, agregacion="suma", **extra)
+    elif rrus is None:
+        combinado[...] = scs[r0:r1]
+    elif agregacion == "mejor":
+        np.maximum(scs[r0:r1], rrus[r0:r1], out=combinado)
+    else:
+        a, b = scs[r0:r1], rrus[r0:r1]
+        combinado[...] = 10 * np.log10(10**(a / 10) + 10**(b / 10))
+
+
+def ruta_mapa(directorio, clave_sede, mapa):
+    """<directorio>/<clave>_<mapa>.npy (p. ej. CentroAcuatico_combined_heatmap_dbm.npy)."""
+    return os.path.join(directorio, f"{clave_sede}_{mapa}.npy")
+
+
+def reservar_salidas(sede, width, height, dtype=np.float64, agregacion="capas",
+                     directorio=None):
+    """Mapas de salida de simular_sede; con directorio, .npy mapeados en disco.
+
+    Los archivos se llaman <clave>_<mapa>.npy (ver ruta_mapa).
+    """
+    claves = ["heatmap_scs_dbm", "combined_heatmap_dbm"]
+    if "rrus" in sede:
+        claves.append("heatmap_rrus_dbm")
+    if agregacion == "sinr":
+        claves += ["id_servidor", "rsrp_dbm"]
+    salidas = {}
+    for clave in claves:
+        ruta = None if directorio is None else ruta_mapa(directorio, sede["clave"], clave)
+        salidas[clave] = reservar_mapa((height, width),
+                                       np.uint16 if clave == "id_servidor" else dtype, ruta)
+    return salidas
+
+
+# === METADATOS DE LOS MAPAS GUARDADOS ===
+# Junto a cada <clave>_<mapa>.npy se escribe <clave>_<mapa>.json con lo
+# necesario para interpretarlo sin volver a simular: unidades, escala del
+# plano, parámetros del modelo y posiciones de los nodos. Los .npy se abren
+# con abrir_mapa (np.load con mmap_mode="r"), sin copiarlos a memoria, y se
+# pueden leer subregiones con un simple recorte.
+VERSION_MAPAS = 1
+
+UNIDADES = {"id_servidor": "índice en small_cells + rrus", "mascara_zonas": "bool"}
+
+
+def guardar_metadatos(sede, resultado, directorio):
+    """Escribe el .json de cada mapa de resultado presente en directorio (y la máscara de zonas).
+
+    Devuelve las rutas de los .npy descritos.
+    """
+    np.save(ruta_mapa(directorio, sede["clave"], "mascara_zonas"), resultado["mascara_zonas"])
+    comun = {
+        "version": VERSION_MAPAS,
+        "sede": sede["clave"],
+        "titulo": sede["titulo"],
+        "plano": sede["plano"],
+        "agregacion": resultado["agregacion"],
+        "origen": "píxel (0, 0) arriba a la izquierda; filas = y, columnas = x",
+        "modelo": {k: sede.get(k) for k in ("N", "f_mhz", "d0", "m_por_px", "resolucion_m",
+                                            "piso_dbm", "sensibilidad_dbm", "ruido_dbm",
+                                            "ancho_banda_mhz", "figura_ruido_db", "muros")},
+        "nodos": {capa: {"Pt_dBm": sede[capa].get("Pt_dBm", 33),
+                         "posiciones": [list(map(float, p)) for p in resultado[capa]]}
+                  for capa in ("small_cells", "rrus") if capa in sede},
+    }
+    rutas = []
+    for mapa in ("heatmap_scs_dbm", "heatmap_rrus_dbm", "combined_heatmap_dbm",
+                 "id_servidor", "rsrp_dbm", "mascara_zonas"):
+        ruta = ruta_mapa(directorio, sede["clave"], mapa)
+        if resultado.get(mapa) is None or not os.path.exists(ruta):
+            continue
+        unidad = UNIDADES.get(mapa, "dB" if resultado["agregacion"] == "sinr"
+                              and mapa == "combined_heatmap_dbm" else "dBm")
+        arr = resultado[mapa]
+        meta = {**comun, "mapa": mapa, "unidad": unidad, "forma": list(arr.shape),
+                "dtype": np.dtype(arr.dtype).name}
+        with open(os.path.splitext(ruta)[0] + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        rutas.append(ruta)
+    return rutas
+
+
+def abrir_mapa(ruta):
+    """(mapa de solo lectura mapeado en disco, metadatos) de un .npy guardado por simular_sedes."""
+    mapa = np.load(ruta, mmap_mode="r")
+    try:
+        with open(os.path.splitext(ruta)[0] + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except OSError:
+        meta = {}
+    return mapa, meta
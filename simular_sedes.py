@@ -0,0 +1,300 @@
+"""Simulación 5G por lotes de las sedes definidas en config_sedes/.
+
+Carga las definiciones de sede, simula la cobertura con el modelo CI y
+exporta los mapas de calor, todo en un único proceso: cada plano se abre
+una sola vez y las figuras se dibujan sin pyplot, reutilizando una
+plantilla por estilo (ver graficos.py).
+
+Uso:
+    python simular_sedes.py                      # todas las sedes
+    python simular_sedes.py --procesos 32        # una sede por proceso
+    python simular_sedes.py CentroAcuatico COParena --planos planos/ --salida resultados/
+"""
+import argparse
+import os
+import time
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from PIL import Image
+
+from cache_cobertura import DIRECTORIO_CACHE, CacheMapas, clave_sede
+from muros import UMBRAL_MURO, mascara_muros
+from graficos import (ALFA_MAPA, dibujar_sede, etiqueta_mapa, exportar_figura,
+                      exportar_superposicion, renderizar_sede)
+from kpi import escribir_informe, kpi_resultado, ruta_informe_sede, unir_informes
+from piramide import REDUCCIONES, exportar_piramide
+from sedes import (AGREGACIONES, DIRECTORIO_SEDES, cargar_sede, guardar_metadatos,
+                   listar_sedes, reservar_salidas, simular_sede)
+from zonas import cobertura_fuera_de_zonas
+
+# Directorio de planos por defecto (se puede cambiar con --planos o PLANOS_5G)
+DIRECTORIO_PLANOS = os.environ.get("PLANOS_5G", "planos")
+
+# Umbral del porcentaje de cobertura que se informa por sede
+UMBRAL_COBERTURA_DBM = -90.0
+
+_planos = {}
+
+
+def cargar_plano(sede, directorio_planos=DIRECTORIO_PLANOS):
+    """Abre el plano de la sede, reutilizando los que ya se cargaron."""
+    ruta = os.path.join(directorio_planos, sede["plano"])
+    clave = (ruta, sede["escala_grises"])
+    if clave not in _planos:
+        img = Image.open(ruta)
+        _planos[clave] = img.convert("L") if sede["escala_grises"] else img
+    return _planos[clave]
+
+
+# === VISUALIZACIÓN ===
+def graficar_sede(plt, sede, img, resultado):
+    """Figura de pyplot de la sede, para mostrarla con plt.show() (--mostrar).
+
+    Sin --mostrar se usa graficos.renderizar_sede, que no necesita pyplot.
+    """
+    fig = plt.figure(figsize=sede.get("figsize", (10, 6)))
+    ax = fig.add_subplot()
+    mapeable, barra = dibujar_sede(ax, sede, img, resultado)
+    cbar = fig.colorbar(mapeable, ax=ax, **barra)
+    cbar.set_label(etiqueta_mapa(resultado))
+    fig.tight_layout()
+    return fig
+
+
+def rutas_salida(clave, sede, salida, formatos=None):
+    """Archivos a exportar: las salidas de la sede o, con formatos, una por formato."""
+    if not formatos:
+        return [os.path.join(salida, nombre) for nombre in sede["salidas"]]
+    base = os.path.splitext(sede["salidas"][0])[0] if sede["salidas"] else clave
+    return [os.path.join(salida, f"{base}.{formato.lstrip('.')}") for formato in formatos]
+
+
+def ruta_superposicion(clave, sede, salida):
+    base = os.path.splitext(sede["salidas"][0])[0] if sede["salidas"] else clave
+    return os.path.join(salida, f"{base}_superposicion.png")
+
+
+def procesar_sede(clave, config, planos, salida, dtype=np.float64, procesos=1,
+                  ejecutor=None, plt=None, cerrar=True, metodo="lut", verificar=False, ventanas=False,
+                  sensibilidad_dbm=None, agregacion="capas", memoria_mb=None, cache=None,
+                  formatos=None, superposicion=False, teselas=None, reduccion="max",
+                  mapas=None, resolucion_m=None, tolerancia_db=None, muros=False,
+                  kpi=None):
+    """Simula y exporta una sede; devuelve la línea de resumen.
+
+    Se usa tanto en el proceso principal como en los procesos del pool.
+    ejecutor: ProcessPoolExecutor de procesos workers, creado una sola vez
+    en main y compartido por todas las capas y teselas de la sede (sin él,
+    mapa_cobertura_paralelo crea y cierra un pool en cada llamada).
+    Sin plt la figura se dibuja sin pyplot (graficos.renderizar_sede, con
+    la plantilla de figura del proceso); con plt (--mostrar) se crea una
+    figura de pyplot, que con cerrar=False queda abierta para plt.show().
+    cache: directorio de la caché de mapas (ver cache_cobertura); si el
+    plano, los nodos y los parámetros no cambiaron, no se vuelve a simular.
+    formatos: extensiones a exportar (png, svg, npy = RGBA crudo, ...) en
+    lugar de las salidas de la sede.
+    superposicion: exportar solo el mapa coloreado sobre el plano en grises,
+    píxel a píxel y sin matplotlib (graficos.exportar_superposicion); la
+    figura se exporta además solo si se piden formatos.
+    teselas: directorio de la pirámide XYZ (piramide.exportar_piramide); la
+    sede va en teselas/<clave>/ y solo se reescriben las teselas que cambian.
+    mapas: directorio donde guardar los heatmaps como .npy mapeados en disco
+    (sedes.reservar_salidas), cada uno con su .json de metadatos; se
+    abren con sedes.abrir_mapa.
+    resolucion_m: lado de la celda de simulación en metros (reemplaza el
+    "resolucion_m" de la sede); los mapas se amplían al tamaño del plano.
+    tolerancia_db: error máximo del método "adaptativo" (vista previa
+    rápida); la cota obtenida se informa en la línea de resumen.
+    muros: restar la pérdida por muros aunque la sede no defina "muros"
+    (con los valores por defecto de muros.py); la máscara sale del plano.
+    kpi: directorio donde escribir <clave>_kpi.json con los indicadores de
+    cobertura de la sede (kpi.kpi_resultado; lee los mapas por franjas,
+    también si están mapeados en disco).
+    """
+    t0 = time.perf_counter()
+    sede = cargar_sede(clave, config)
+    if sensibilidad_dbm is not None:
+        sede["sensibilidad_dbm"] = sensibilidad_dbm
+    if resolucion_m is not None:
+        sede["resolucion_m"] = resolucion_m
+    if muros and sede["muros"] is None:
+        sede["muros"] = {}
+    img = cargar_plano(sede, planos)
+    width, height = img.size
+    mascara = None
+    if sede["muros"] is not None:
+        mascara = mascara_muros(img, sede["muros"].get("umbral", UMBRAL_MURO))
+    resultado = clave_cache = None
+    if cache and not verificar:
+        cache = CacheMapas(cache)
+        opciones = dict(dtype=np.dtype(dtype).name, metodo=metodo, ventanas=ventanas,
+                        agregacion=agregacion)
+        if metodo == "adaptativo":
+            opciones["tolerancia_db"] = tolerancia_db
+        clave_cache = clave_sede(os.path.join(planos, sede["plano"]), sede, width, height,
+                                 **opciones)
+        resultado = cache.cargar(clave_cache)
+    origen = "caché" if resultado is not None else "sim"
+    salidas = None
+    if mapas:
+        os.makedirs(mapas, exist_ok=True)
+        salidas = reservar_salidas(sede, width, height, dtype, agregacion, directorio=mapas)
+    if resultado is None:
+        resultado = simular_sede(sede, width, height, dtype=dtype, procesos=procesos,
+                                 ejecutor=ejecutor, metodo=metodo, verificar=verificar, ventanas=ventanas,
+                                 agregacion=agregacion, memoria_mb=memoria_mb, salidas=salidas,
+                                 tolerancia_db=tolerancia_db, muros=mascara)
+        if clave_cache is not None:
+            cache.guardar(clave_cache, resultado)
+    elif salidas:
+        for clave_mapa, salida_mapa in salidas.items():
+            if resultado.get(clave_mapa) is not None:
+                salida_mapa[:] = resultado[clave_mapa]
+                salida_mapa.flush()
+    if mapas:
+        guardar_metadatos(sede, resultado, mapas)
+    t_sim = time.perf_counter() - t0
+    if kpi:
+        escribir_informe([kpi_resultado(sede, resultado)], ruta_informe_sede(kpi, clave))
+
+    if superposicion:
+        exportar_superposicion(ruta_superposicion(clave, sede, salida), img,
+                               resultado["combined_heatmap_dbm"], ALFA_MAPA[sede["estilo"]])
+    if teselas:
+        exportar_piramide(os.path.join(teselas, clave), resultado["combined_heatmap_dbm"], img,
+                          reduccion, ALFA_MAPA[sede["estilo"]], procesos=procesos)
+    rutas = [] if superposicion and not formatos else rutas_salida(clave, sede, salida, formatos)
+    if plt is not None:
+        fig = graficar_sede(plt, sede, img, resultado)
+        exportar_figura(fig, rutas)
+        if cerrar:
+            plt.close(fig)
+    elif rutas:
+        renderizar_sede(sede, img, resultado, rutas)
+    # Cobertura útil: sin contar piletas, tatamis, pistas, etc.
+    mapa = resultado.get("rsrp_dbm", resultado["combined_heatmap_dbm"])
+    cobertura = cobertura_fuera_de_zonas(mapa, resultado["mascara_zonas"], UMBRAL_COBERTURA_DBM)
+    error = ""
+    if resultado.get("adaptativo"):
+        error = f"±{resultado['adaptativo']['cota_db']:.2f} dB  "
+    return (f"{clave:<20} {width}x{height}  {len(resultado['small_cells'])} SCs  "
+            f"{len(resultado['rrus'])} RRUs  >= {UMBRAL_COBERTURA_DBM:g} dBm {cobertura:.1f} %  "
+            f"{error}{origen} {t_sim:.2f} s  "
+            f"total {time.perf_counter() - t0:.2f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación 5G por lotes de las sedes.")
+    parser.add_argument("sedes", nargs="*",
+                        help="claves de sede (por defecto todas las de config_sedes/)")
+    parser.add_argument("--config", default=DIRECTORIO_SEDES,
+                        help="directorio con las definiciones .json")
+    parser.add_argument("--planos", default=DIRECTORIO_PLANOS,
+                        help="directorio con los planos (PNG)")
+    parser.add_argument("--salida", default=".", help="directorio de salida")
+    parser.add_argument("--float32", action="store_true",
+                        help="calcular los heatmaps en float32")
+    parser.add_argument("--metodo", choices=("lut", "kernel", "log", "adaptativo"),
+                        default="lut",
+                        help="cálculo del modelo CI (ver cobertura.mapa_cobertura); "
+                             "adaptativo = vista previa de grueso a fino con error acotado")
+    parser.add_argument("--tolerancia", type=float, default=None, metavar="DB",
+                        help="error máximo del método adaptativo en dB (por defecto 0.5)")
+    parser.add_argument("--verificar", action="store_true",
+                        help="comprobar bit a bit la tabla de pérdidas contra la fórmula CI")
+    parser.add_argument("--ventanas", action="store_true",
+                        help="evaluar cada nodo solo dentro de su radio_px / sensibilidad")
+    parser.add_argument("--sensibilidad", type=float, default=None, metavar="DBM",
+                        help="sensibilidad para el modo por ventanas (p. ej. -110); "
+                             "implica --ventanas")
+    parser.add_argument("--agregacion", choices=AGREGACIONES, default="capas",
+                        help="combinación de los nodos: capas (scripts originales), "
+                             "mejor servidor, suma de potencias o sinr")
+    parser.add_argument("--resolucion", type=float, default=None, metavar="M",
+                        help="simular en celdas de M metros (p. ej. 0.25) y ampliar al plano; "
+                             "la escala sale de m_por_px o de la calibración de la sede")
+    parser.add_argument("--muros", action="store_true",
+                        help="restar la pérdida por cada muro atravesado (muros = píxeles "
+                             "oscuros del plano; ver \"muros\" en la sede)")
+    parser.add_argument("--memoria", type=float, default=None, metavar="MB",
+                        help="calcular por teselas de filas con esta memoria de trabajo")
+    parser.add_argument("--cache", nargs="?", const=DIRECTORIO_CACHE, default=None,
+                        metavar="DIR", help="reutilizar los mapas ya simulados (caché en disco, "
+                                            f"por defecto {DIRECTORIO_CACHE} o CACHE_5G)")
+    parser.add_argument("--formatos", type=lambda t: [f for f in t.split(",") if f],
+                        default=None, metavar="EXT[,EXT...]",
+                        help="formatos a exportar en lugar de las salidas de la sede, "
+                             "p. ej. png,svg,npy (npy = imagen RGBA cruda)")
+    parser.add_argument("--superposicion", action="store_true",
+                        help="exportar <salida>_superposicion.png: mapa sobre el plano en "
+                             "grises, píxel a píxel y sin matplotlib (sin la figura, "
+                             "salvo que se pidan --formatos)")
+    parser.add_argument("--mapas", default=None, metavar="DIR",
+                        help="guardar los heatmaps como .npy (memmap) con metadatos .json en DIR")
+    parser.add_argument("--kpi", default=None, metavar="DIR",
+                        help="indicadores de cobertura (CDF, %% del área por umbral, zonas "
+                             "muertas) por sede en DIR/<sede>_kpi.json y juntos en DIR/kpi.json")
+    parser.add_argument("--teselas", default=None, metavar="DIR",
+                        help="exportar además una pirámide de teselas XYZ por sede en DIR/<sede>/")
+    parser.add_argument("--reduccion", choices=REDUCCIONES, default="max",
+                        help="reducción 2x2 de los niveles de la pirámide: máximo o media "
+                             "en potencia lineal")
+    parser.add_argument("--procesos", type=int, default=1,
+                        help="procesos en paralelo: reparte las sedes entre ellos, "
+                             "o las filas del plano si se simula una sola sede")
+    parser.add_argument("--mostrar", action="store_true",
+                        help="mostrar las figuras con plt.show()")
+    args = parser.parse_args(argv)
+
+    claves = args.sedes or listar_sedes(args.config)
+    dtype = np.float32 if args.float32 else np.float64
+    ventanas = args.ventanas or args.sensibilidad is not None
+    if ventanas and args.metodo == "adaptativo":
+        parser.error("el método adaptativo no admite --ventanas ni --sensibilidad")
+    opciones = dict(metodo=args.metodo, verificar=args.verificar, ventanas=ventanas,
+                    sensibilidad_dbm=args.sensibilidad, agregacion=args.agregacion,
+                    memoria_mb=args.memoria, cache=args.cache, formatos=args.formatos,
+                    superposicion=args.superposicion, teselas=args.teselas,
+                    reduccion=args.reduccion, mapas=args.mapas,
+                    resolucion_m=args.resolucion,
+                    tolerancia_db=args.tolerancia, muros=args.muros, kpi=args.kpi)
+    os.makedirs(args.salida, exist_ok=True)
+
+    # === VARIAS SEDES EN PARALELO (un proceso por sede) ===
+    if args.procesos > 1 and len(claves) > 1 and not args.mostrar:
+        with ProcessPoolExecutor(min(args.procesos, len(claves))) as ejecutor:
+            tareas = [ejecutor.submit(procesar_sede, clave, args.config,
+                                      args.planos, args.salida, dtype, **opciones)
+                      for clave in claves]
+            for tarea in as_completed(tareas):
+                print(tarea.result())
+        if args.kpi:
+            unir_informes(args.kpi, claves)
+        return
+
+    plt = None
+    if args.mostrar:
+        import matplotlib.pyplot as plt
+
+    # === UNA SEDE (o --mostrar): las filas del plano entre los procesos ===
+    # El pool se crea una sola vez y lo comparten todas las capas y teselas.
+    procesos = args.procesos if len(claves) == 1 else 1
+    with ExitStack() as pila:
+        ejecutor = None
+        if procesos > 1:
+            ejecutor = pila.enter_context(ProcessPoolExecutor(procesos))
+        for clave in claves:
+            print(procesar_sede(clave, args.config, args.planos, args.salida, dtype=dtype,
+                                procesos=procesos, ejecutor=ejecutor, plt=plt,
+                                cerrar=not args.mostrar, **opciones))
+    if args.kpi:
+        unir_informes(args.kpi, claves)
+
+    if args.mostrar:
+        plt.show()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""Monte Carlo de desvanecimiento por sombra (shadowing log-normal).
+
+El modelo CI da la pérdida media; en la realidad cada enlace sufre un
+desvanecimiento log-normal X ~ N(0, σ²) en dB, correlacionado en el espacio
+(modelo de Gudmundson: ρ(Δ) = exp(-Δ / d_corr)). Cada realización sortea un
+campo de sombra por transmisor, suma σ·X al mapa determinista de cada nodo
+y combina los nodos como en sedes.simular_sede. Las K realizaciones se
+reducen sobre la marcha (ReductorMonteCarlo): probabilidad de cobertura,
+media, desvío y percentiles por píxel, sin guardar los K mapas.
+
+Los campos se generan filtrando ruido blanco gaussiano en frecuencia
+(embebido circulante): ruido por la raíz del espectro de ρ sobre una
+grilla con margen de 4·d_corr (para que el borde periódico no correlacione
+lados opuestos del plano), y FFT inversa. La FFT de ruido blanco complejo
+es otra vez ruido blanco complejo, así que el ruido se sortea directamente
+en frecuencia (sin FFT directa) y cada FFT inversa, en complex64, da dos
+campos independientes (parte real e imaginaria).
+
+Reproducibilidad: de la semilla de la corrida se derivan K SeedSequence
+hijas (SeedSequence.spawn) y la realización k usa siempre
+np.random.default_rng(hijas[k]). El resultado es el mismo en serie o con
+cualquier número de procesos: los procesos calculan realizaciones y el
+proceso principal las reduce en orden.
+
+Uso:
+    python sombra.py CentroAcuatico --realizaciones 200 --sigma 8 --correlacion 10
+    python sombra.py PolideportivoCEO --procesos 4 --semilla 7 --salida montecarlo/
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from cobertura import mapa_cobertura
+from escala import a_celdas, ampliar, factor_resolucion, forma_gruesa
+from graficos import exportar_superposicion
+from sedes import DIRECTORIO_SEDES, cargar_sede, posiciones_capa
+from zonas import mascara_zonas
+
+# === PARÁMETROS POR DEFECTO (3GPP TR 38.901, InH / UMi en NLOS) ===
+SIGMA_DB = 8.0                # desvío del shadowing
+CORRELACION_M = 10.0          # distancia de decorrelación
+CORRELACION_SITIOS = 0.0      # correlación entre los campos de distintos nodos
+REALIZACIONES = 100
+PERCENTILES = (5, 50, 95)
+CAMPOS_POR_LOTE = 8           # campos de sombra generados por cada FFT por lotes
+MAX_ORDEN_EXACTO = 24         # valores extremos guardados por píxel para un percentil exacto
+
+AGREGACIONES_MONTECARLO = ("capas", "mejor", "suma")
+
+
+def tamano_fft(n):
+    """Menor tamaño >= n de la forma 2^a 3^b 5^c (rápido para la FFT)."""
+    mejor = 1 << int(np.ceil(np.log2(max(n, 1))))
+    p5 = 1
+    while p5 < mejor:
+        p35 = p5
+        while p35 < mejor:
+            p = p35
+            while p < n:
+                p *= 2
+            mejor = min(mejor, p)
+            p35 *= 3
+        p5 *= 5
+    return mejor
+
+
+def filtro_correlacion(alto, ancho, correlacion_px):
+    """Raíz del espectro de ρ(Δ) = exp(-Δ / correlacion_px) sobre la grilla con margen.
+
+    Devuelve un array (alto_fft, ancho_fft) float32, escalado por la raíz
+    del número de celdas para aplicarlo a ruido blanco en frecuencia: los
+    campos se recortan luego a (alto, ancho) y su varianza es ρ(0) = 1.
+    """
+    margen = int(np.ceil(4 * correlacion_px))
+    alto_fft, ancho_fft = tamano_fft(alto + margen), tamano_fft(ancho + margen)
+    dy = np.minimum(np.arange(alto_fft), alto_fft - np.arange(alto_fft))[:, None]
+    dx = np.minimum(np.arange(ancho_fft), ancho_fft - np.arange(ancho_fft))[None, :]
+    rho = np.exp(-np.hypot(dx, dy) / max(correlacion_px, 1e-9))
+    espectro = np.fft.fft2(rho).real
+    # El embebido circulante de la exponencial puede dar valores negativos
+    # mínimos por redondeo; se recortan a 0
+    return np.sqrt(np.maximum(espectro, 0.0) * rho.size).astype(np.float32)
+
+
+def campos_sombra(rng, n, alto, ancho, filtro):
+    """n campos gaussianos (n, alto, ancho) float32 de varianza 1 y correlación del filtro."""
+    campos = np.empty((n, alto, ancho), dtype=np.float32)
+    for i in range(0, n, 2 * CAMPOS_POR_LOTE):
+        m = min(n - i, 2 * CAMPOS_POR_LOTE)
+        ruido = rng.standard_normal((2, (m + 1) // 2) + filtro.shape, dtype=np.float32)
+        ruido *= filtro
+        espectro = np.empty(ruido.shape[1:], dtype=np.complex64)
+        espectro.real, espectro.imag = ruido
+        z = np.fft.ifft2(espectro)[:, :alto, :ancho]
+        campos[i:i + m:2] = z.real
+        campos[i + 1:i + m:2] = z.imag[:m // 2]
+    return campos
+
+
+# === PERCENTILES EN UNA PASADA (ALGORITMO P²) ===
+class CuantilesP2:
+    """Estimación P² (Jain y Chlamtac, 1985) de un cuantil por píxel, en una pasada.
+
+    Cinco marcadores por píxel (alturas q y posiciones n) que se ajustan con
+    interpolación parabólica a cada nuevo mapa; memoria O(píxeles) sea cual
+    sea el número de realizaciones. Todas las operaciones son sobre el
+    plano entero.
+    """
+
+    def __init__(self, p, forma):
+        self.p = p
+        self.q = np.empty((5,) + tuple(forma), dtype=np.float64)
+        self.n = np.tile(np.arange(1, 6, dtype=np.float32).reshape((5,) + (1,) * len(forma)),
+                         (1,) + tuple(forma))
+        self.deseadas = np.array([1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5], dtype=np.float64)
+        self.incrementos = np.array([0, p / 2, p, (1 + p) / 2, 1], dtype=np.float64)
+        self.cuenta = 0
+
+    def agregar(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if self.cuenta < 5:
+            self.q[self.cuenta] = x
+            self.cuenta += 1
+            if self.cuenta == 5:
+                self.q.sort(axis=0)
+            return
+        q, n = self.q, self.n
+        self.cuenta += 1
+        np.minimum(q[0], x, out=q[0])
+        np.maximum(q[4], x, out=q[4])
+        # Los marcadores por encima de la celda de x se corren un lugar
+        for i in range(1, 5):
+            n[i] += x < q[i] if i < 4 else 1
+        self.deseadas += self.incrementos
+        for i in (1, 2, 3):
+            d = self.deseadas[i] - n[i]
+            sube = (d >= 1) & (n[i + 1] - n[i] > 1)
+            baja = (d <= -1) & (n[i - 1] - n[i] < -1)
+            mover = sube | baja
+            if not mover.any():
+                continue
+            s = np.where(sube, 1.0, -1.0)
+            parabolica = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                + (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+            vecino_q = np.where(sube, q[i + 1], q[i - 1])
+            vecino_n = np.where(sube, n[i + 1], n[i - 1])
+            lineal = q[i] + s * (vecino_q - q[i]) / (vecino_n - n[i])
+            valida = (q[i - 1] < parabolica) & (parabolica < q[i + 1])
+            q[i] = np.where(mover, np.where(valida, parabolica, lineal), q[i])
+            n[i] += np.where(mover, s, 0.0)
+
+    def valor(self):
+        """Cuantil estimado por píxel (con menos de 5 mapas, el exacto de los vistos)."""
+        if self.cuenta < 5:
+            return np.quantile(self.q[:self.cuenta], self.p, axis=0)
+        return self.q[2].copy()
+
+
+class CuantilExacto:
+    """Cuantil exacto por píxel para percentiles extremos, con K conocido de antemano.
+
+    El cuantil p de K valores (interpolación lineal, como np.quantile) solo
+    depende de los floor((K - 1) · p) + 2 menores (o mayores, si p > 0.5):
+    se guardan ordenados en un buffer (orden, alto, ancho) float32 (la
+    precisión de las realizaciones) y cada mapa nuevo se inserta con una
+    pasada de mínimos y máximos.
+    """
+
+    def __init__(self, p, forma, realizaciones):
+        self.p, self.realizaciones = p, realizaciones
+        self.mayores = p > 0.5
+        posicion = (realizaciones - 1) * (1 - p if self.mayores else p)
+        self.orden = min(int(np.floor(posicion)) + 2, realizaciones)
+        self.buffer = np.full((self.orden,) + tuple(forma), np.inf, dtype=np.float32)
+        self.cuenta = 0
+
+    def agregar(self, x):
+        x = np.asarray(x, dtype=np.float32)
+        b = self.buffer
+        # Con mayores se guardan los valores negados (los mayores son los menores)
+        np.minimum(b[-1], -x if self.mayores else x, out=b[-1])
+        for i in range(self.orden - 1, 0, -1):
+            menor = np.minimum(b[i - 1], b[i])
+            np.maximum(b[i - 1], b[i], out=b[i])
+            b[i - 1] = menor
+        self.cuenta += 1
+
+    def valor(self):
+        ordenados = (-self.buffer if self.mayores else self.buffer).astype(np.float64)
+        posicion = (self.cuenta - 1) * (1 - self.p if self.mayores else self.p)
+        i = int(np.floor(posicion))
+        t = posicion - i
+        if i + 1 >= self.orden:
+            return ordenados[i].copy()
+        return ordenados[i] + t * (ordenados[i + 1] - ordenados[i])
+
+
+class ReductorMonteCarlo:
+    """Estadísticas por píxel de una secuencia de mapas en dBm, sin guardarlos.
+
+    Acumula el número de realizaciones con al menos umbral_dbm (uint32),
+    media y varianza (Welford, float64) y un estimador por percentil: con
+    realizaciones (K) conocido, CuantilExacto si le alcanzan
+    MAX_ORDEN_EXACTO valores por píxel (p. ej. 5 y 95 con K <= 440), si no
+    CuantilesP2.
+    """
+
+    def __init__(self, forma, umbral_dbm=-90.0, percentiles=PERCENTILES, realizaciones=None):
+        self.cubiertas = np.zeros(forma, dtype=np.uint32)
+        self.media = np.zeros(forma, dtype=np.float64)
+        self.m2 = np.zeros(forma, dtype=np.float64)
+        self.cuantiles = {}
+        for p in percentiles:
+            extremo = min(p, 100 - p) / 100
+            if realizaciones and (realizaciones - 1) * extremo + 2 <= MAX_ORDEN_EXACTO:
+                self.cuantiles[p] = CuantilExacto(p / 100, forma, realizaciones)
+            else:
+                self.cuantiles[p] = CuantilesP2(p / 100, forma)
+        self.umbral_dbm = umbral_dbm
+        self.k = 0
+
+    def agregar(self, mapa):
+        self.k += 1
+        self.cubiertas += mapa >= self.umbral_dbm
+        delta = mapa - self.media
+        self.media += delta / self.k
+        self.m2 += delta * (mapa - self.media)
+        for cuantil in self.cuantiles.values():
+            cuantil.agregar(mapa)
+
+    def resultado(self, dtype=np.float32):
+        """{"probabilidad_cobertura", "media_dbm", "desvio_db", "percentil_<p>_dbm"...}."""
+        k = max(self.k, 1)
+        mapas = {"probabilidad_cobertura": (self.cubiertas / k).astype(dtype),
+                 "media_dbm": self.media.astype(dtype),
+                 "desvio_db": np.sqrt(self.m2 / max(self.k - 1, 1)).astype(dtype)}
+        for p, cuantil in self.cuantiles.items():
+            mapas[f"percentil_{p:g}_dbm"] = cuantil.valor().astype(dtype)
+        return mapas
+
+
+# === REALIZACIONES ===
+_contexto = None
+
+
+def _iniciar(contexto):
+    """Prepara en el proceso los mapas deterministas por nodo y el filtro de correlación."""
+    global _contexto
+    ancho, alto = contexto["ancho"], contexto["alto"]
+    deterministas = np.empty((len(contexto["nodos"]), alto, ancho), dtype=np.float32)
+    for j, ((x, y), Pt) in enumerate(zip(contexto["nodos"], contexto["potencias"])):
+        mapa_cobertura([(x, y)], ancho, alto, contexto["N"], Pt, salida=deterministas[j],
+                       **contexto["parametros"])
+    _contexto = {**contexto, "deterministas": deterministas,
+                 "filtro": filtro_correlacion(alto, ancho, contexto["correlacion_px"])}
+
+
+def _realizacion(semilla):
+    """Mapa combinado (alto, ancho) float32 de una realización, a partir de su SeedSequence."""
+    c = _contexto
+    rng = np.random.default_rng(semilla)
+    alto, ancho = c["alto"], c["ancho"]
+    sigma, rho = c["sigma_db"], c["correlacion_sitios"]
+    comun = campos_sombra(rng, 1, alto, ancho, c["filtro"])[0] if rho > 0 else None
+    capas = c["capas"]
+    mejores = np.full((max(capas, default=-1) + 1, alto, ancho), -np.inf, dtype=np.float32)
+    total = np.zeros((alto, ancho), dtype=np.float64) if c["agregacion"] == "suma" else None
+    nodos = len(capas)
+    for j0 in range(0, nodos, 2 * CAMPOS_POR_LOTE):
+        campos = campos_sombra(rng, min(nodos - j0, 2 * CAMPOS_POR_LOTE), alto, ancho,
+                               c["filtro"])
+        for i, campo in enumerate(campos):
+            j = j0 + i
+            if comun is not None:
+                campo = np.sqrt(1 - rho) * campo + np.sqrt(rho) * comun
+            nivel = c["deterministas"][j] + sigma * campo
+            if total is not None:
+                total += np.power(10.0, nivel / 10)
+            else:
+                np.maximum(mejores[capas[j]], nivel, out=mejores[capas[j]])
+    if total is not None:
+        return (10 * np.log10(total)).astype(np.float32)
+    if c["agregacion"] == "mejor" or len(mejores) == 1:
+        return mejores.max(axis=0)
+    return (10 * np.log10(np.power(10.0, mejores / 10).sum(axis=0))).astype(np.float32)
+
+
+def montecarlo_sede(sede, width, height, realizaciones=REALIZACIONES, semilla=0,
+                    sigma_db=None, correlacion_m=None, correlacion_sitios=None,
+                    umbral_dbm=-90.0, percentiles=PERCENTILES, agregacion="capas",
+                    procesos=1, dtype=np.float32):
+    """Monte Carlo de sombra de una sede: K realizaciones reducidas sobre la marcha.
+
+    sigma_db, correlacion_m y correlacion_sitios reemplazan los de
+    sede["sombra"] (o los valores por defecto de este módulo). agregacion:
+    "capas", "mejor" o "suma", como en sedes.simular_sede. Con procesos > 1
+    las realizaciones se reparten entre procesos y se reducen en orden en
+    este proceso, con el mismo resultado que en serie. Respeta
+    sede["resolucion_m"] (las estadísticas se amplían al plano).
+
+    Devuelve los mapas de ReductorMonteCarlo.resultado(), la probabilidad
+    de cobertura del área (media de la probabilidad fuera de las zonas
+    prohibidas), las posiciones de los nodos, la máscara de zonas y los
+    parámetros usados.
+    """
+    if agregacion not in AGREGACIONES_MONTECARLO:
+        raise ValueError(f"agregación desconocida: {agregacion!r}")
+    sombra = sede.get("sombra") or {}
+    sigma_db = sombra.get("sigma_db", SIGMA_DB) if sigma_db is None else sigma_db
+    correlacion_m = sombra.get("correlacion_m", CORRELACION_M) if correlacion_m is None \
+        else correlacion_m
+    correlacion_sitios = sombra.get("correlacion_sitios", CORRELACION_SITIOS) \
+        if correlacion_sitios is None else correlacion_sitios
+    zonas = sede["zonas_prohibidas"]
+    mascara = mascara_zonas(zonas, width, height)
+    resultado = {"mascara_zonas": mascara}
+    nodos, potencias, capas = [], [], []
+    for indice, capa in enumerate(("small_cells", "rrus")):
+        resultado[capa] = []
+        if capa in sede:
+            resultado[capa] = posiciones_capa(sede[capa], width, height, zonas, mascara)
+            nodos += resultado[capa]
+            potencias += [sede[capa].get("Pt_dBm", 33)] * len(resultado[capa])
+            capas += [indice] * len(resultado[capa])
+    if agregacion == "mejor":
+        capas = [0] * len(capas)
+
+    factor = factor_resolucion(sede["m_por_px"], sede.get("resolucion_m"))
+    ancho, alto = forma_gruesa(width, height, factor) if factor > 1 else (width, height)
+    m_por_px = sede["m_por_px"] * factor
+    contexto = {"ancho": ancho, "alto": alto, "N": sede["N"],
+                "nodos": a_celdas(nodos, factor) if factor > 1 else nodos,
+                "potencias": potencias, "capas": capas, "agregacion": agregacion,
+                "sigma_db": sigma_db, "correlacion_px": correlacion_m / m_por_px,
+                "correlacion_sitios": correlacion_sitios,
+                "parametros": dict(f_mhz=sede["f_mhz"], d0=sede["d0"], m_por_px=m_por_px,
+                                   piso_dbm=sede["piso_dbm"])}
+
+    reductor = ReductorMonteCarlo((alto, ancho), umbral_dbm, percentiles, realizaciones)
+    semillas = np.random.SeedSequence(semilla).spawn(realizaciones)
+    if procesos > 1 and realizaciones > 1:
+        with ProcessPoolExecutor(procesos, initializer=_iniciar,
+                                 initargs=(contexto,)) as ejecutor:
+            # Como mucho 2 realizaciones pendientes por proceso
+            pendientes = [ejecutor.submit(_realizacion, s) for s in semillas[:2 * procesos]]
+            for k in range(realizaciones):
+                mapa = pendientes.pop(0).result()
+                if k + 2 * procesos < realizaciones:
+                    pendientes.append(ejecutor.submit(_realizacion, semillas[k + 2 * procesos]))
+                reductor.agregar(mapa)
+    else:
+        _iniciar(contexto)
+        for s in semillas:
+            reductor.agregar(_realizacion(s))
+
+    for clave, mapa in reductor.resultado(np.float64 if factor > 1 else dtype).items():
+        if factor > 1:
+            mapa = ampliar(mapa, np.empty((height, width), dtype=dtype), factor)
+        resultado[clave] = mapa
+    libre = ~mascara
+    resultado["probabilidad_area"] = float(resultado["probabilidad_cobertura"][libre].mean()) \
+        if libre.any() else 0.0
+    resultado["parametros"] = {"realizaciones": realizaciones, "semilla": semilla,
+                               "sigma_db": sigma_db, "correlacion_m": correlacion_m,
+                               "correlacion_sitios": correlacion_sitios,
+                               "umbral_dbm": umbral_dbm, "agregacion": agregacion}
+    return resultado
+
+
+def main(argv=None):
+    from simular_sedes import DIRECTORIO_PLANOS, UMBRAL_COBERTURA_DBM, cargar_plano
+
+    parser = argparse.ArgumentParser(description="Monte Carlo de desvanecimiento por sombra.")
+    parser.add_argument("sede", help="clave de la sede (config_sedes/<sede>.json)")
+    parser.add_argument("--config", default=DIRECTORIO_SEDES)
+    parser.add_argument("--planos", default=DIRECTORIO_PLANOS)
+    parser.add_argument("--salida", default=None, metavar="DIR",
+                        help="guardar los mapas (.npy) y la probabilidad de cobertura sobre "
+                             "el plano (<sede>_probabilidad.png)")
+    parser.add_argument("--realizaciones", type=int, default=REALIZACIONES)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--sigma", type=float, default=None, metavar="DB",
+                        help=f"desvío del shadowing (por defecto {SIGMA_DB:g} dB)")
+    parser.add_argument("--correlacion", type=float, default=None, metavar="M",
+                        help=f"distancia de decorrelación (por defecto {CORRELACION_M:g} m)")
+    parser.add_argument("--correlacion-sitios", type=float, default=None, metavar="RHO",
+                        help="correlación entre los campos de distintos nodos (0 a 1)")
+    parser.add_argument("--umbral", type=float, default=UMBRAL_COBERTURA_DBM, metavar="DBM")
+    parser.add_argument("--agregacion", choices=AGREGACIONES_MONTECARLO, default="capas")
+    parser.add_argument("--procesos", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    sede = cargar_sede(args.sede, args.config)
+    img = cargar_plano(sede, args.planos)
+    width, height = img.size
+    t0 = time.perf_counter()
+    r = montecarlo_sede(sede, width, height, args.realizaciones, args.semilla, args.sigma,
+                        args.correlacion, args.correlacion_sitios, args.umbral,
+                        agregacion=args.agregacion, procesos=args.procesos)
+    print(f"{sede['clave']}: {args.realizaciones} realizaciones, "
+          f"σ = {r['parametros']['sigma_db']:g} dB, d_corr = {r['parametros']['correlacion_m']:g} m  "
+          f"P(>= {args.umbral:g} dBm) = {100 * r['probabilidad_area']:.1f} %  "
+          f"{time.perf_counter() - t0:.2f} s")
+    if args.salida:
+        os.makedirs(args.salida, exist_ok=True)
+        claves = [k for k, v in r.items() if isinstance(v, np.ndarray) and k != "mascara_zonas"]
+        for clave in claves:
+            np.save(os.path.join(args.salida, f"{sede['clave']}_{clave}.npy"), r[clave])
+        exportar_superposicion(os.path.join(args.salida, f"{sede['clave']}_probabilidad.png"),
+                               img, r["probabilidad_cobertura"], vmin=0.0, vmax=1.0)
+        with open(os.path.join(args.salida, f"{sede['clave']}_montecarlo.json"), "w",
+                  encoding="utf-8") as f:
+            json.dump({"sede": sede["clave"], "mapas": claves,
+                       "probabilidad_area": r["probabilidad_area"], **r["parametros"]}, f,
+                      ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+import numpy as np
+
+from cobertura import mapa_cobertura
+
+# Memoria de trabajo estimada por píxel de una tesela: buffers de las capas
+# y temporales float64 de la combinación de mapas.
+BYTES_POR_PIXEL = 48
+
+
+def filas_por_tesela(ancho, memoria_mb, bytes_por_pixel=BYTES_POR_PIXEL):
+    """Alto de tesela para que el trabajo de una tesela quepa en memoria_mb."""
+    return max(1, int(memoria_mb * 2**20) // (max(ancho, 1) * bytes_por_pixel))
+
+
+def teselas(alto, filas):
+    """(r0, r1) de cada tesela de filas del plano."""
+    return [(r0, min(r0 + filas, alto)) for r0 in range(0, alto, filas)]
+
+
+def reservar_mapa(forma, dtype=np.float64, ruta=None):
+    """Array de salida: en memoria o, con ruta, un .npy mapeado en disco (np.memmap)."""
+    if ruta is None:
+        return np.empty(forma, dtype=dtype)
+    return np.lib.format.open_memmap(ruta, mode="w+", dtype=dtype, shape=forma)
+
+
+def mapa_cobertura_teselas(transmisores, ancho, alto, N, Pt_dBm, memoria_mb=256,
+                           salida=None, ruta=None, dtype=np.float64, **parametros):
+    """mapa_cobertura por teselas de filas, con memoria de trabajo acotada.
+
+    Cada tesela se calcula y se escribe en salida (un array preasignado o
+    un np.memmap) antes de pasar a la siguiente, así que la RAM usada no
+    depende del tamaño del plano: un plano de 10000 x 8000 se procesa con
+    el mismo presupuesto que uno de 1000 x 800. Con ruta (y sin salida)
+    el resultado se escribe en un .npy mapeado en disco.
+    """
+    if salida is None:
+        salida = reservar_mapa((alto, ancho), dtype, ruta)
+    for r0, r1 in teselas(alto, filas_por_tesela(ancho, memoria_mb)):
+        mapa_cobertura(transmisores, ancho, alto, N, Pt_dBm, salida=salida[r0:r1],
+                       filas=(r0, r1), **parametros)
+    if isinstance(salida, np.memmap):
+        salida.flush()
+    return salida
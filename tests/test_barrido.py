@@ -0,0 +1,32 @@
+"""Barridos de N, potencia y frecuencia frente a simular cada escenario por separado."""
+import numpy as np
+import pytest
+
+from barrido import barrer_capas, barrer_cobertura, escenarios
+from cobertura import mapa_cobertura
+
+ANCHO, ALTO = 120, 90
+SCS = [(10, 10), (100, 70)]
+RRUS = [(60, 45), (30.5, 80), (115, 5)]
+TABLA = escenarios([2.0, 2.5, 3.2, 4.0], [27, 33], [3500, 28000])
+
+
+@pytest.mark.parametrize("agregacion", ["mejor", "suma"])
+def test_barrer_cobertura_igual_a_cada_escenario(agregacion):
+    mapas = barrer_cobertura(RRUS, ANCHO, ALTO, TABLA["N"], TABLA["Pt_dBm"], TABLA["f_mhz"],
+                             agregacion=agregacion, dtype=np.float64)
+    for s, (N, Pt, f) in enumerate(zip(TABLA["N"], TABLA["Pt_dBm"], TABLA["f_mhz"])):
+        directo = mapa_cobertura(RRUS, ANCHO, ALTO, N, Pt, f_mhz=f, agregacion=agregacion,
+                                 piso_dbm=-150.0)
+        np.testing.assert_allclose(mapas[s], directo, rtol=0, atol=1e-4)
+
+
+def test_barrer_capas_suma_el_mejor_servidor_de_cada_capa():
+    Pt_scs = TABLA["Pt_dBm"] - 3
+    mapas = barrer_capas([(SCS, Pt_scs), (RRUS, TABLA["Pt_dBm"])], ANCHO, ALTO, TABLA["N"],
+                         TABLA["f_mhz"], agregacion="capas", dtype=np.float64)
+    for s, (N, Pt, f) in enumerate(zip(TABLA["N"], TABLA["Pt_dBm"], TABLA["f_mhz"])):
+        scs = mapa_cobertura(SCS, ANCHO, ALTO, N, Pt - 3, f_mhz=f)
+        rrus = mapa_cobertura(RRUS, ANCHO, ALTO, N, Pt, f_mhz=f)
+        directo = 10 * np.log10(10 ** (scs / 10) + 10 ** (rrus / 10))
+        np.testing.assert_allclose(mapas[s], np.maximum(directo, -150.0), rtol=0, atol=1e-4)
@@ -0,0 +1,98 @@
+"""mapa_cobertura (todos los métodos) frente a la fórmula CI de referencia."""
+import numpy as np
+import pytest
+
+from adaptativo import TOLERANCIA_DB
+from cobertura import mapa_cobertura, mapa_cobertura_referencia
+from paralelo import mapa_cobertura_paralelo
+
+ANCHO, ALTO = 160, 120
+NODOS = [(10, 15), (80, 60), (159, 0), (40, 110)]
+POTENCIAS = [33, 30, 27, 33]
+
+
+def suma_referencia(nodos, ancho, alto, potencias, radio=None, **parametros):
+    """Potencia total en dBm sumando en mW los mapas de referencia de cada nodo."""
+    total = np.zeros((alto, ancho))
+    for nodo, Pt in zip(nodos, potencias):
+        mapa = mapa_cobertura_referencia([nodo], ancho, alto, 3.2, Pt, piso_dbm=-np.inf,
+                                         radios_px=radio, **parametros)
+        total += 10 ** (mapa / 10)
+    with np.errstate(divide="ignore"):
+        return np.maximum(10 * np.log10(total), -150.0)
+
+
+# === MEJOR SERVIDOR ===
+@pytest.mark.parametrize("metodo", ["lut", "kernel"])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("m_por_px", [1.0, 0.5])
+def test_lut_y_kernel_identicos_a_la_referencia(metodo, dtype, m_por_px):
+    ref = mapa_cobertura_referencia(NODOS, ANCHO, ALTO, 3.2, POTENCIAS, dtype=dtype,
+                                    m_por_px=m_por_px)
+    mapa = mapa_cobertura(NODOS, ANCHO, ALTO, 3.2, POTENCIAS, dtype=dtype, metodo=metodo,
+                          m_por_px=m_por_px, verificar=True)
+    assert np.array_equal(mapa, ref)
+
+
+def test_log_con_nodos_fuera_de_la_grilla():
+    nodos = [(10.5, 15.25), (80, 60), (-20, 130)]
+    ref = mapa_cobertura_referencia(nodos, ANCHO, ALTO, 3.2, 33)
+    mapa = mapa_cobertura(nodos, ANCHO, ALTO, 3.2, 33, metodo="lut")
+    np.testing.assert_allclose(mapa, ref, rtol=0, atol=1e-9)
+
+
+def test_ventanas_identicas_a_la_referencia_con_radio():
+    ref = mapa_cobertura_referencia(NODOS, ANCHO, ALTO, 3.2, POTENCIAS, radios_px=50)
+    mapa = mapa_cobertura(NODOS, ANCHO, ALTO, 3.2, POTENCIAS, radio_px=50, verificar=True)
+    assert np.array_equal(mapa, ref)
+
+
+@pytest.mark.parametrize("metodo", ["lut", "kernel"])
+def test_teselas_de_filas(metodo):
+    ref = mapa_cobertura_referencia(NODOS, ANCHO, ALTO, 3.2, POTENCIAS)
+    mapa = mapa_cobertura(NODOS, ANCHO, ALTO, 3.2, POTENCIAS, metodo=metodo, filas=(30, 71),
+                          filas_por_bloque=7)
+    assert np.array_equal(mapa, ref[30:71])
+
+
+# === SUMA DE POTENCIAS ===
+@pytest.mark.parametrize("radio", [None, 50])
+def test_suma_igual_a_sumar_la_referencia_en_mw(radio):
+    ref = suma_referencia(NODOS, ANCHO, ALTO, POTENCIAS, radio)
+    mapa = mapa_cobertura(NODOS, ANCHO, ALTO, 3.2, POTENCIAS, agregacion="suma", radio_px=radio)
+    np.testing.assert_allclose(mapa, ref, rtol=0, atol=1e-3)
+
+
+# === ADAPTATIVO ===
+@pytest.mark.parametrize("agregacion, ancho, alto, n_nodos", [("suma", 640, 480, 5),
+                                                               ("mejor", 1280, 960, 80)])
+def test_adaptativo_dentro_de_la_cota_informada(agregacion, ancho, alto, n_nodos):
+    # Tamaños en los que conviene_adaptativo elige de verdad el método adaptativo
+    rng = np.random.default_rng(0)
+    nodos = np.column_stack([rng.integers(0, ancho, n_nodos), rng.integers(0, alto, n_nodos)])
+    exacto = mapa_cobertura(nodos, ancho, alto, 3.2, 33, agregacion=agregacion)
+    informe = {}
+    mapa = mapa_cobertura(nodos, ancho, alto, 3.2, 33, agregacion=agregacion,
+                          metodo="adaptativo", informe=informe)
+    assert informe["fraccion_exacta"] < 1 and informe["cota_db"] <= TOLERANCIA_DB
+    assert np.abs(mapa - exacto).max() <= informe["cota_db"] + 1e-3
+
+
+def test_adaptativo_usa_el_calculo_exacto_si_es_mas_barato():
+    informe = {}
+    mapa = mapa_cobertura(NODOS, ANCHO, ALTO, 3.2, POTENCIAS, metodo="adaptativo",
+                          informe=informe)
+    assert np.array_equal(mapa, mapa_cobertura_referencia(NODOS, ANCHO, ALTO, 3.2, POTENCIAS))
+    assert informe["fraccion_exacta"] == 1
+
+
+# === PROCESOS ===
+@pytest.mark.parametrize("agregacion", ["mejor", "suma"])
+def test_paralelo_igual_a_serie(agregacion):
+    # 640x480 supera MIN_PIXELES_PARALELO: se reparte de verdad entre procesos
+    ancho, alto = 640, 480
+    nodos = [(40, 30), (600, 60), (320, 240.5)]
+    serie = mapa_cobertura(nodos, ancho, alto, 3.2, 33, agregacion=agregacion)
+    paralelo = mapa_cobertura_paralelo(nodos, ancho, alto, 3.2, 33, procesos=2,
+                                       agregacion=agregacion)
+    assert np.array_equal(paralelo, serie)
@@ -0,0 +1,48 @@
+"""CoberturaIncremental tras agregar, mover y quitar nodos frente a recalcular de cero."""
+import numpy as np
+import pytest
+
+from cobertura import mapa_cobertura, mapa_cobertura_referencia
+from incremental import CoberturaIncremental
+
+ANCHO, ALTO = 200, 150
+
+
+def estado_final(radio_px):
+    """Estado tras una secuencia de operaciones y otro con los mismos nodos, agregados de cero."""
+    estado = CoberturaIncremental(ANCHO, ALTO, 3.2, radio_px=radio_px)
+    nodos = [estado.agregar(x, y, Pt) for x, y, Pt in
+             [(20, 20, 33), (100, 75, 30), (180, 130, 33), (60, 120, 27), (150, 30, 33)]]
+    estado.mover(nodos[1], 110, 70)
+    estado.quitar(nodos[3])
+    estado.mover(nodos[0], 30.5, 25)
+    estado.quitar(nodos[4])
+    estado.agregar(5, 140, 30)
+
+    nuevo = CoberturaIncremental(ANCHO, ALTO, 3.2, radio_px=radio_px)
+    for x, y, Pt in estado.nodos.values():
+        nuevo.agregar(x, y, Pt)
+    return estado, nuevo
+
+
+@pytest.mark.parametrize("radio_px", [None, 60])
+def test_mejor_y_segundo_igual_que_recalcular(radio_px):
+    estado, nuevo = estado_final(radio_px)
+    assert np.array_equal(estado.mejor, nuevo.mejor)
+    assert np.array_equal(estado.segundo, nuevo.segundo)
+    # Los identificadores difieren (se renumeran), pero no qué píxeles tienen servidor
+    assert np.array_equal(estado.id_mejor < 0, nuevo.id_mejor < 0)
+    np.testing.assert_allclose(estado.potencia_mw, nuevo.potencia_mw, rtol=1e-9, atol=1e-30)
+
+
+@pytest.mark.parametrize("radio_px", [None, 60])
+def test_mapas_igual_que_la_simulacion_completa(radio_px):
+    estado, _ = estado_final(radio_px)
+    posiciones = [(x, y) for x, y, _ in estado.nodos.values()]
+    potencias = [Pt for _, _, Pt in estado.nodos.values()]
+    ref = mapa_cobertura_referencia(posiciones, ANCHO, ALTO, 3.2, potencias, dtype=np.float32,
+                                    radios_px=radio_px)
+    assert np.array_equal(estado.mapa_dbm("mejor"), ref.astype(np.float64))
+    suma = mapa_cobertura(posiciones, ANCHO, ALTO, 3.2, potencias, agregacion="suma",
+                          radio_px=radio_px)
+    np.testing.assert_allclose(estado.mapa_dbm("suma"), suma, rtol=0, atol=1e-3)
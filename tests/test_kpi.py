@@ -0,0 +1,61 @@
+"""Componentes conexas por tramos (union-find vectorizado) frente a un BFS por píxel."""
+from collections import deque
+
+import numpy as np
+import pytest
+
+from kpi import _tramos, etiquetar_tramos, zonas_conexas
+
+
+def componentes_bfs(mascara, conectividad):
+    """Etiqueta (-1 fuera de la máscara) y número de componentes con un BFS clásico."""
+    alto, ancho = mascara.shape
+    vecinos = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if conectividad == 8:
+        vecinos += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+    etiqueta = np.full(mascara.shape, -1)
+    n = 0
+    for y, x in zip(*np.nonzero(mascara)):
+        if etiqueta[y, x] >= 0:
+            continue
+        etiqueta[y, x] = n
+        cola = deque([(y, x)])
+        while cola:
+            cy, cx = cola.popleft()
+            for dy, dx in vecinos:
+                vy, vx = cy + dy, cx + dx
+                if (0 <= vy < alto and 0 <= vx < ancho and mascara[vy, vx]
+                        and etiqueta[vy, vx] < 0):
+                    etiqueta[vy, vx] = n
+                    cola.append((vy, vx))
+        n += 1
+    return etiqueta, n
+
+
+@pytest.mark.parametrize("conectividad", [4, 8])
+@pytest.mark.parametrize("semilla", range(5))
+def test_etiquetar_tramos_igual_que_bfs(conectividad, semilla):
+    rng = np.random.default_rng(semilla)
+    mascara = rng.random((40, 60)) < 0.45
+    fila, inicio, fin = _tramos(mascara, 0)
+    etiqueta, n = etiquetar_tramos(fila, inicio, fin, mascara.shape[1], conectividad)
+    bfs, n_bfs = componentes_bfs(mascara, conectividad)
+    assert n == n_bfs
+    # Misma partición: cada tramo cae entero en una componente BFS, y la
+    # correspondencia entre etiquetas es biyectiva
+    pares = {(int(e), int(bfs[f, i])) for e, f, i in zip(etiqueta, fila, inicio)}
+    assert len(pares) == n == len({b for _, b in pares})
+    for e, f, i, j in zip(etiqueta, fila, inicio, fin):
+        assert len(set(bfs[f, i:j])) == 1
+
+
+def test_zonas_conexas_areas_y_cajas():
+    mascara = np.zeros((10, 12), dtype=bool)
+    mascara[1:4, 1:5] = True            # 12 px
+    mascara[6:9, 8:10] = True           # 6 px
+    mascara[4, 5] = True                # toca la primera solo en diagonal
+    area, caja, _ = zonas_conexas(*_tramos(mascara, 0), 12, conectividad=8)
+    assert area.tolist() == [13, 6]
+    assert caja.tolist() == [[1, 1, 5, 4], [8, 6, 9, 8]]
+    area, _, _ = zonas_conexas(*_tramos(mascara, 0), 12, conectividad=4)
+    assert area.tolist() == [12, 6, 1]
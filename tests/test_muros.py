@@ -0,0 +1,62 @@
+"""Pérdida por muros: cruces esperados y barridos compactos frente al barrido completo."""
+import numpy as np
+import pytest
+
+from cobertura import mapa_cobertura, mapa_cobertura_referencia
+from muros import PERDIDA_MURO_DB, BarridosMuros
+from paralelo import mapa_cobertura_paralelo
+
+ANCHO, ALTO = 240, 180
+NODOS = [(50, 60), (200, 150), (120.5, 20.25)]
+
+
+def plano_con_muros():
+    muros = np.zeros((ALTO, ANCHO), dtype=bool)
+    muros[:, 100] = True
+    muros[90, 20:220] = True
+    for k in range(60):
+        muros[110 + k, 130 + k] = True          # muro en diagonal (se cierra)
+    return muros
+
+
+def test_sin_muros_igual_a_la_referencia():
+    vacio = np.zeros((ALTO, ANCHO), dtype=bool)
+    mapa = mapa_cobertura(NODOS, ANCHO, ALTO, 3.2, 33, muros=vacio)
+    ref = mapa_cobertura_referencia(NODOS, ANCHO, ALTO, 3.2, 33)
+    np.testing.assert_allclose(mapa, ref, rtol=0, atol=1e-9)
+
+
+def test_un_muro_resta_su_perdida_del_otro_lado():
+    muros = np.zeros((ALTO, ANCHO), dtype=bool)
+    muros[:, 100] = True
+    mapa = mapa_cobertura([(50, 60)], ANCHO, ALTO, 3.2, 33, muros=muros)
+    ref = mapa_cobertura_referencia([(50, 60)], ANCHO, ALTO, 3.2, 33)
+    np.testing.assert_allclose(mapa[:, :100], ref[:, :100], rtol=0, atol=1e-9)
+    np.testing.assert_allclose(mapa[:, 101:], ref[:, 101:] - PERDIDA_MURO_DB, rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("agregacion", ["mejor", "suma"])
+@pytest.mark.parametrize("radio_px", [None, 90])
+def test_barridos_guardados_teselas_y_memoria(agregacion, radio_px):
+    muros = plano_con_muros()
+    completo = mapa_cobertura(NODOS, ANCHO, ALTO, 3.2, 33, agregacion=agregacion,
+                              radio_px=radio_px, muros=muros)
+    # Con y sin lugar para guardar los barridos, y con el plano en teselas
+    for memoria_mb in (None, 1e-4):
+        barridos = BarridosMuros(muros, memoria_mb=memoria_mb)
+        teselas = np.vstack([mapa_cobertura(NODOS, ANCHO, ALTO, 3.2, 33, agregacion=agregacion,
+                                            radio_px=radio_px, muros=barridos, filas=(r, r + 45))
+                             for r in range(0, ALTO, 45)])
+        assert np.array_equal(teselas, completo)
+
+
+def test_paralelo_con_muros_igual_a_serie():
+    ancho, alto = 640, 480
+    muros = np.zeros((alto, ancho), dtype=bool)
+    muros[::60, :] = True
+    muros[:, ::80] = True
+    nodos = [(333, 222), (600.5, 450)]
+    serie = mapa_cobertura(nodos, ancho, alto, 3.2, 33, muros=muros)
+    paralelo = mapa_cobertura_paralelo(nodos, ancho, alto, 3.2, 33, procesos=2,
+                                       muros=BarridosMuros(muros))
+    assert np.array_equal(paralelo, serie)
@@ -0,0 +1,152 @@
+import numpy as np
+
+# === ÍNDICE ESPACIAL PARA LA SEPARACIÓN MÍNIMA ENTRE NODOS ===
+# Rejilla hash con celdas de lado = separación: dos nodos a menos de la
+# separación caen en celdas vecinas, así que cada consulta mira solo las
+# 3 x 3 celdas alrededor del punto en lugar de todos los nodos ya ubicados.
+
+
+class RejillaEspaciado:
+    """Conjunto de puntos con consulta "¿hay alguno a menos de separacion?" en O(1)."""
+
+    def __init__(self, separacion, puntos=()):
+        self.separacion = float(separacion)
+        self.lado = max(self.separacion, 1e-9)
+        self.celdas = {}
+        for x, y in puntos:
+            self.agregar(x, y)
+
+    def _celda(self, x, y):
+        return int(np.floor(x / self.lado)), int(np.floor(y / self.lado))
+
+    def agregar(self, x, y):
+        self.celdas.setdefault(self._celda(x, y), []).append((x, y))
+
+    def vecinos(self, x, y, alcance=1):
+        """Puntos en las celdas a distancia <= alcance (en celdas) de (x, y)."""
+        i, j = self._celda(x, y)
+        return [p for di in range(-alcance, alcance + 1) for dj in range(-alcance, alcance + 1)
+                for p in self.celdas.get((i + di, j + dj), ())]
+
+    def libre(self, x, y):
+        """True si ningún punto está a menos de la separación (misma prueba que np.hypot)."""
+        if self.separacion <= 0:
+            return True
+        return not any(np.hypot(x - rx, y - ry) < self.separacion for rx, ry in self.vecinos(x, y))
+
+
+def filtrar_separacion(posiciones, separacion, maximo=None, existentes=()):
+    """Selección voraz en orden: conserva cada posición a >= separacion de las elegidas."""
+    rejilla = RejillaEspaciado(separacion, existentes)
+    elegidas = []
+    for x, y in posiciones:
+        if maximo is not None and len(elegidas) >= maximo:
+            break
+        if rejilla.libre(x, y):
+            elegidas.append((x, y))
+            rejilla.agregar(x, y)
+    return elegidas
+
+
+# === MUESTREO ALEATORIO ===
+def completar_rechazo(existentes, maximo, width, height, separacion, valida, rng, margen=0,
+                      intentos_max=100000):
+    """Relleno aleatorio de los scripts originales (RandomState y prueba de rechazo).
+
+    Sortea posiciones enteras en [margen, width - margen) x [margen,
+    height - margen) hasta llegar a maximo nodos; descarta las que no
+    cumplen valida(x, y) o quedan a menos de separacion de otro nodo.
+    Con la misma semilla da exactamente los mismos nodos que antes.
+    Lanza ValueError tras intentos_max sorteos seguidos sin éxito (el
+    plano ya no admite más nodos con esa separación).
+    """
+    rejilla = RejillaEspaciado(separacion, existentes)
+    extras, fallos = [], 0
+    while len(existentes) + len(extras) < maximo:
+        x = rng.randint(margen, width - margen)
+        y = rng.randint(margen, height - margen)
+        if valida(x, y) and rejilla.libre(x, y):
+            extras.append((x, y))
+            rejilla.agregar(x, y)
+            fallos = 0
+        else:
+            fallos += 1
+            if fallos >= intentos_max:
+                raise ValueError(f"no caben {maximo} nodos con separación {separacion} px "
+                                 f"(se ubicaron {len(existentes) + len(extras)})")
+    return extras
+
+
+def muestreo_poisson(width, height, separacion, rng, maximo=None, margen=0,
+                     valida_vec=None, existentes=(), candidatos=30):
+    """Muestreo de disco de Poisson (Bridson) en píxeles enteros.
+
+    Desde un punto activo se generan a la vez `candidatos` puntos en el
+    anillo [separacion, 2·separacion) y se prueban todos juntos, con numpy,
+    contra los vecinos de la rejilla; se acepta el primero libre y, si
+    ninguno lo está, el punto deja de estar activo. El costo es lineal en
+    el número de nodos y termina solo cuando el plano se llena (o se
+    llega a maximo), sin el bucle de rechazo de completar_rechazo.
+
+    valida_vec(xs, ys) -> máscara booleana (p. ej. fuera de zonas
+    prohibidas). existentes: nodos ya ubicados, que se respetan y sirven
+    de semilla. rng: np.random.Generator. Devuelve solo los nodos nuevos.
+    Lanza ValueError si separacion <= 0: sin separación el anillo de
+    candidatos es un punto y el plano no se llena nunca (usar
+    completar_rechazo).
+    """
+    if not separacion > 0:
+        raise ValueError(f"el muestreo de Poisson necesita separación > 0 (se pidió {separacion})")
+    rejilla = RejillaEspaciado(separacion, existentes)
+    x_min, x_max = margen, width - margen - 1
+    y_min, y_max = margen, height - margen - 1
+    nuevos = []
+    total = len(existentes)
+    # Los candidatos están a < 2·sep (+ redondeo) del activo y sus vecinos a < sep
+    alcance = int(np.ceil((3 * separacion + 1) / rejilla.lado))
+
+    def aceptables(xs, ys):
+        ok = (xs >= x_min) & (xs <= x_max) & (ys >= y_min) & (ys <= y_max)
+        if valida_vec is not None and ok.any():
+            ok[ok] = valida_vec(xs[ok], ys[ok])
+        return ok
+
+    # Semilla: un punto válido al azar si no hay nodos previos
+    activos = [tuple(p) for p in existentes]
+    if not activos:
+        for _ in range(1000):
+            xs = rng.integers(x_min, x_max + 1, candidatos)
+            ys = rng.integers(y_min, y_max + 1, candidatos)
+            ok = np.flatnonzero(aceptables(xs, ys))
+            if len(ok):
+                p = (int(xs[ok[0]]), int(ys[ok[0]]))
+                rejilla.agregar(*p)
+                nuevos.append(p)
+                activos.append(p)
+                total += 1
+                break
+
+    while activos and (maximo is None or total < maximo):
+        i = int(rng.integers(len(activos)))
+        px, py = activos[i]
+        radio = rng.uniform(separacion, 2 * separacion, candidatos)
+        angulo = rng.uniform(0, 2 * np.pi, candidatos)
+        xs = np.rint(px + radio * np.cos(angulo)).astype(np.int64)
+        ys = np.rint(py + radio * np.sin(angulo)).astype(np.int64)
+        ok = aceptables(xs, ys)
+        vecinos = np.asarray(rejilla.vecinos(px, py, alcance), dtype=np.float64).reshape(-1, 2)
+        if len(vecinos) and ok.any():
+            d2 = ((xs[:, None] - vecinos[None, :, 0]) ** 2
+                  + (ys[:, None] - vecinos[None, :, 1]) ** 2)
+            ok &= (d2 >= separacion ** 2).all(axis=1)
+        libres = np.flatnonzero(ok)
+        if len(libres):
+            p = (int(xs[libres[0]]), int(ys[libres[0]]))
+            rejilla.agregar(*p)
+            nuevos.append(p)
+            activos.append(p)
+            total += 1
+        else:
+            activos[i] = activos[-1]
+            activos.pop()
+    return nuevos
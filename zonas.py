@@ -0,0 +1,92 @@
+import numpy as np
+
+# === ZONAS PROHIBIDAS ===
+# Cada zona es un rectángulo ((x0, y0), (x1, y1)), con bordes incluidos como
+# en los scripts originales, o un polígono [(x, y), ...] de 3 o más vértices
+# (regla par-impar). Se rasterizan una vez por sede en una máscara booleana
+# (True = zona prohibida) que sirve para validar candidatos con una sola
+# indexación y para excluir esas áreas de las estadísticas de cobertura.
+
+
+def es_rectangulo(zona):
+    return len(zona) == 2
+
+
+def _dentro_poligono(xs, ys, vertices):
+    """Prueba par-impar vectorizada: True para los puntos dentro del polígono."""
+    dentro = np.zeros(np.broadcast(xs, ys).shape, dtype=bool)
+    vx, vy = np.asarray(vertices, dtype=np.float64).T
+    for xa, ya, xb, yb in zip(vx, vy, np.roll(vx, 1), np.roll(vy, 1)):
+        if ya == yb:
+            continue
+        cruza = (ya > ys) != (yb > ys)
+        x_corte = xa + (ys - ya) * (xb - xa) / (yb - ya)
+        dentro ^= cruza & (xs < x_corte)
+    return dentro
+
+
+def dentro_de_zonas(xs, ys, zonas):
+    """Máscara de los puntos (xs, ys) que caen en alguna zona prohibida."""
+    xs, ys = np.asarray(xs), np.asarray(ys)
+    dentro = np.zeros(np.broadcast(xs, ys).shape, dtype=bool)
+    for zona in zonas:
+        if es_rectangulo(zona):
+            (x0, y0), (x1, y1) = zona
+            dentro |= (x0 <= xs) & (xs <= x1) & (y0 <= ys) & (ys <= y1)
+        else:
+            dentro |= _dentro_poligono(xs, ys, zona)
+    return dentro
+
+
+def mascara_zonas(zonas, width, height):
+    """Máscara (height, width) con True en los píxeles dentro de alguna zona.
+
+    Cada zona solo se evalúa dentro de su rectángulo envolvente, con la
+    misma prueba que dentro_de_zonas(), así que para píxeles enteros
+    mascara[y, x] coincide siempre con la prueba punto a punto.
+    """
+    mascara = np.zeros((height, width), dtype=bool)
+    for zona in zonas:
+        xs, ys = np.asarray(zona, dtype=np.float64).T
+        c0, c1 = max(0, int(np.ceil(xs.min()))), min(width, int(np.floor(xs.max())) + 1)
+        r0, r1 = max(0, int(np.ceil(ys.min()))), min(height, int(np.floor(ys.max())) + 1)
+        if c0 >= c1 or r0 >= r1:
+            continue
+        if es_rectangulo(zona):
+            mascara[r0:r1, c0:c1] = True
+        else:
+            yy = np.arange(r0, r1, dtype=np.float64)[:, None]
+            xx = np.arange(c0, c1, dtype=np.float64)[None, :]
+            mascara[r0:r1, c0:c1] |= _dentro_poligono(xx, yy, zona)
+    return mascara
+
+
+def puntos_validos(xs, ys, zonas, mascara=None):
+    """True para los puntos fuera de las zonas prohibidas.
+
+    Los puntos enteros dentro del plano se resuelven con una indexación en
+    la máscara; el resto (coordenadas no enteras o fuera del plano) con la
+    prueba geométrica.
+    """
+    xs = np.asarray(xs)
+    ys = np.asarray(ys)
+    if mascara is None:
+        return ~dentro_de_zonas(xs, ys, zonas)
+    alto, ancho = mascara.shape
+    validos = np.empty(np.broadcast(xs, ys).shape, dtype=bool)
+    xs, ys = np.broadcast_arrays(xs, ys)
+    en_mascara = ((xs == np.round(xs)) & (ys == np.round(ys))
+                  & (xs >= 0) & (xs < ancho) & (ys >= 0) & (ys < alto))
+    validos[en_mascara] = ~mascara[ys[en_mascara].astype(np.intp), xs[en_mascara].astype(np.intp)]
+    resto = ~en_mascara
+    if resto.any():
+        validos[resto] = ~dentro_de_zonas(xs[resto], ys[resto], zonas)
+    return validos
+
+
+def cobertura_fuera_de_zonas(mapa_dbm, mascara=None, umbral_dbm=-90.0):
+    """Porcentaje de píxeles con al menos umbral_dbm, sin contar las zonas prohibidas."""
+    valores = mapa_dbm if mascara is None else mapa_dbm[~mascara]
+    if valores.size == 0:
+        return 0.0
+    return 100.0 * np.count_nonzero(valores >= umbral_dbm) / valores.size